@@ -2,21 +2,28 @@
 # -*- coding: utf-8 -*-
 
 """
-run scripts sdr_fs.py and total_spectrum_analyzer_qt5.py for all unprocessed experiments
+run sdr_fs.py and total_spectrum_analyzer_qt5.py processing for all unprocessed experiments
 """
 import os
 import sys
 import argparse
-import json
+from functools import lru_cache
 import logging
+from multiprocessing import Pool
 import coloredlogs
-import h5py
-from parsers.configparser_ import ConfigParser
+from parsers.configparser_ import load_config
+from sdr_fs import process_iteration
+from total_spectrum_analyzer import analyze_output_files
+from utils.vlsr import load_earth_velocity_table, EARTH_VELOCITY_TABLE_FILE_NAME
+from utils.processing_state import ProcessingState, get_file_fingerprint, is_sdr_stage_needed, \
+    PROCESSING_STATE_FILE_NAME, SDR_STAGE, ANALYSIS_STAGE
+from utils.result_store import ResultStore
 
 coloredlogs.install(level='PRODUCTION')
 LOGGER = logging.getLogger('Main')
 
 
+@lru_cache(maxsize=None)
 def parse_arguments():
     """
     :return: dict with passed args to script
@@ -27,6 +34,8 @@ def parse_arguments():
     parser.add_argument("line", help="frequency", type=int)
     parser.add_argument("-c", "--config", help="Configuration "
                                                "cfg file", type=str, default="config/config.cfg")
+    parser.add_argument("-b", "--batch", help="Process SDR iterations without GUI", action="store_true")
+    parser.add_argument("-j", "--jobs", help="Number of parallel processes for batch mode", type=int, default=1)
     parser.add_argument("-v", "--version", action="version", version='%(prog)s - Version 3.0')
     args = parser.parse_args()
     return args
@@ -49,7 +58,7 @@ def get_configs(section, key):
     :return: configuration file section key value
     """
     config_file_path = get_args("config")
-    config = ConfigParser(config_file_path)
+    config = load_config(config_file_path)
     return config.get_config(section, key)
 
 
@@ -79,44 +88,53 @@ def create_iteration_list(path, source, line):
     :param path: input file path
     :return: iterations list
     """
-    stations = list(set(create_station_list(path, source, line)))
     iterations_for_source_and_line = [file for file in os.listdir(path)
                                       if source + "_" in file and line in file and os.path.isdir(path + file)]
-    iterations_for_station = {station: [] for station in
-                              stations}  # {get_station(iteration):get_iteration(iteration) for iteration in os.listdir(path) if  source in iteration and line in iteration and os.path.isdir(path + iteration)}
+    iterations_for_station = dict()
     for iteration in iterations_for_source_and_line:
-        iterations_for_station[get_station(iteration)].append(get_iteration(iteration))
+        iterations_for_station.setdefault(get_station(iteration), []).append(get_iteration(iteration))
 
-    for station in stations:
+    for station in iterations_for_station:
         iterations_for_station[station].sort(key=int, reverse=False)
 
     return iterations_for_station
 
 
-def create_station_list(path, source, line):
+def create_log_file_list(path, source, line):
     """
 
     :param line: frequency
+    :param path: log file path
     :param source: source
-    :param path: input file path
-    :return: stations list
+    :return: all log files for source
     """
-    iterations = [file for file in os.listdir(path) if
-                  source + "_" in file and line in file and os.path.isdir(path + file)]
-    iterations.sort(key=get_iteration, reverse=False)
-    stations = [get_station(iteration) for iteration in iterations]
-    return stations
+    return [log for log in os.listdir(path) if log.startswith(source + "_") and line in log]
 
 
-def create_log_file_list(path, source, line):
+def init_worker(config_file_path):
     """
 
-    :param line: frequency
-    :param path: log file path
-    :param source: source
-    :return: all log files for source
+    :param config_file_path: configuration file path
+    :return: None
     """
-    return [log for log in os.listdir(path) if log.startswith(source + "_") and line in log]
+    cache_path = load_config(config_file_path).get_config("paths", "cacheFilePath")
+    load_earth_velocity_table(cache_path + EARTH_VELOCITY_TABLE_FILE_NAME)
+
+
+def process_iteration_job(job):
+    """
+
+    :param job: source, line, station, iteration, log file, configuration file path and batch mode
+    :return: station, iteration, output file name and error message or None if iteration is processed
+    """
+    source, line, station, iteration, log_file, config_file_path, batch = job
+    LOGGER.info("Processing iteration " + iteration + " with log file " + log_file)
+    try:
+        output_file_name = process_iteration(source, line, iteration, log_file, config_file_path, batch)
+    except Exception as error:
+        # one broken iteration must not stop processing of the others
+        return station, iteration, None, str(error)
+    return station, iteration, output_file_name, None
 
 
 def main():
@@ -125,6 +143,8 @@ def main():
     """
     source_name = get_args("source")
     line = get_args("line")
+    config_file_path = get_args("config")
+    batch = get_args("batch") == "True"
     data_files_path = get_configs('paths', "dataFilePath")
     result_path = get_configs('paths', "resultFilePath")
     log_path = get_configs('paths', "logPath")
@@ -133,82 +153,75 @@ def main():
     if os.path.exists(data_files_path):
         sdr_iterations = create_iteration_list(data_files_path, source_name, line)
     else:
-        sdr_iterations = []
+        sdr_iterations = dict()
 
     log_path = log_path + "SDR/"
-    logfile_list = create_log_file_list(log_path, source_name, line)
-    result_file_name = result_path + source_name + "_" + get_args("line") + ".json"
-
-    if os.path.isfile(result_file_name):
-        pass
-    else:
-        os.system("touch " + result_file_name)
-        result_file = open(result_file_name, "w")
-        result_file.write("{ \n" + "\n}")
-        result_file.close()
-
-    with open(result_file_name, "r") as result_data:
-        result = json.load(result_data)
-
-    stations = list(set(create_station_list(data_files_path, source_name, line)))
-    processed_iteration = {station: [] for station in stations}
-    processed_iteration2 = {station: [] for station in stations}
-    for experiment in result:
-        if get_station(experiment) == "IRBENE16":
-            station = "ib"
-        else:
-            station = "ir"
-
-        iteration_in_result = experiment.split("_")[-1]
-        if iteration_in_result in sdr_iterations[station] and \
-                iteration_in_result not in \
-                processed_iteration[station] and result[experiment]["type"] == "SDR":
-            processed_iteration[station].append(get_iteration(experiment))
-
-        if iteration_in_result in processed_iteration[station] and \
-                result[experiment]["type"] == "SDR" and result[experiment]["flag"]:
-            processed_iteration[station].remove(iteration_in_result)
-
-        if iteration_in_result not in processed_iteration2[station] and result[experiment]["type"] == "SDR":
-            processed_iteration2[station].append(iteration_in_result)
-
-    for station in stations:
-        processed_iteration[station].sort(key=int, reverse=False)
-        processed_iteration2[station].sort(key=int, reverse=False)
-
-    for station in stations:
+    source_output_path = os.path.normpath(output_path + "/" + line + "/" + source_name)
+
+    result_store = ResultStore(result_path)
+    state = ProcessingState(result_path + PROCESSING_STATE_FILE_NAME)
+    state.sync_results(source_name, line, result_store)
+    state.sync_outputs(source_name, line, source_output_path)
+    analyzed_iterations = state.get_stages(source_name, line, ANALYSIS_STAGE)
+    sdr_stages = state.get_stages(source_name, line, SDR_STAGE)
+
+    jobs = []
+    fingerprints = dict()
+    for station in sdr_iterations:
         for iteration in sdr_iterations[station]:
-            if iteration not in processed_iteration[station]:
-                log_file = source_name + "_" + "f" + line + "_" + station + "_" + iteration + ".log"
-                sdr_fs_parameter = source_name + " " + line + " " + iteration + " " + log_file
-                LOGGER.info("Executing python3 " + "sdr_fs.py " + sdr_fs_parameter)
-                os.system("python3 " + "sdr_fs.py " + sdr_fs_parameter)
-
-                if not os.path.exists(log_path + "/" + log_file):
-                    LOGGER.warning("Warning log file " + log_file + " do not exist")
-
-    output_files = os.listdir(output_path + "/" + line + "/" + source_name)
-    for output_file in output_files:
-        output_file_station = output_file.split("_")[-2].split(".")[0]
-        output_file_iteration = output_file.split("_")[-1].split(".")[0]
-        if output_file_station == "IRBENE16":
-            station = "ib"
-        else:
-            station = "ir"
-
-        if output_file_iteration not in processed_iteration2[station]:
-            if output_file.startswith(source_name):
-                with h5py.File(get_configs("paths", "outputFilePath") + get_args("line") +
-                               "/" + get_args("source") + "/" + output_file, "r") as input_data_file:
-                    input_file_keys = list(input_data_file.keys())
-                    input_data_file.close()
-                    if "amplitude" in input_file_keys:
-                        LOGGER.info("Executing python3 " +
-                                    "total_spectrum_analyzer_qt5.py " + output_file + " " + line)
-                        os.system("python3 " +
-                                  "total_spectrum_analyzer_qt5.py " + output_file + " " + line)
+            log_file = source_name + "_" + "f" + line + "_" + station + "_" + iteration + ".log"
+            data_dir = data_files_path + source_name + "_f" + line + "_" + station + "_" + iteration
+            fingerprint = get_file_fingerprint(data_dir, log_path + log_file)
+            if not is_sdr_stage_needed(sdr_stages.get((station, iteration)),
+                                       analyzed_iterations.get((station, iteration)), fingerprint):
+                continue
+
+            fingerprints[(station, iteration)] = fingerprint
+            jobs.append((source_name, line, station, iteration, log_file, config_file_path, batch))
+
+            if not os.path.exists(log_path + "/" + log_file):
+                LOGGER.warning("Warning log file " + log_file + " do not exist")
+
+    processes = int(get_args("jobs"))
+    if processes > 1 and not batch:
+        LOGGER.warning("Option --jobs is used only with option --batch, iterations are processed one by one")
+
+    if processes > 1 and batch and len(jobs) > 1:
+        with Pool(processes=min(processes, len(jobs)), initializer=init_worker,
+                  initargs=(config_file_path,)) as pool:
+            job_results = list(pool.imap_unordered(process_iteration_job, jobs))
+    else:
+        job_results = [process_iteration_job(job) for job in jobs]
+
+    for station, iteration, output_file_name, error in job_results:
+        if error is not None:
+            LOGGER.error("Processing of iteration " + iteration + " failed: " + error)
+        elif output_file_name is not None:
+            state.mark_done(source_name, line, station, iteration, SDR_STAGE,
+                            fingerprints[(station, iteration)], os.path.normpath(output_file_name))
+
+    state.sync_outputs(source_name, line, source_output_path)
+    sdr_stages = state.get_stages(source_name, line, SDR_STAGE)
+    output_file_names = [sdr_stages[key][1] for key in sorted(sdr_stages, key=lambda key: (key[0], int(key[1])))
+                         if key not in analyzed_iterations and os.path.isfile(sdr_stages[key][1])]
+    if batch:
+        LOGGER.info("Analyzing " + str(len(output_file_names)) + " output files")
+        errors = analyze_output_files(output_file_names, line, config_file_path, processes=processes)
+        for output_file_name, error in errors.items():
+            if error is not None:
+                LOGGER.error("Analysis of output file " + output_file_name + " failed: " + error)
+    else:
+        for output_file_name in output_file_names:
+            # GUI is imported only when needed, batch processing must work without PyQt5
+            from total_spectrum_analyzer_qt5 import analyze_output_file
+            LOGGER.info("Analyzing output file " + output_file_name)
+            analyze_output_file(os.path.basename(output_file_name), line, config_file_path)
+
+    state.sync_results(source_name, line, result_store)
+    state.close()
+    result_store.close()
 
 
 if __name__ == "__main__":
     main()
-    sys.exit(0)
\ No newline at end of file
+    sys.exit(0)
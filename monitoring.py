@@ -7,23 +7,37 @@ Monitoring tool
 import sys
 import os
 import argparse
-import json
+from functools import lru_cache
+from multiprocessing import get_context
 import numpy as np
 from matplotlib import ticker
-from astropy.timeseries import LombScargle
+from matplotlib.colors import LogNorm
 from astropy.io import ascii
 from astropy.time import Time
-import matplotlib.tri as mtri
-import h5py
 from PyQt5.QtWidgets import QApplication, QWidget, QDesktopWidget, \
     QGridLayout, QLabel, QLineEdit, QComboBox, QPushButton, QGroupBox
 from PyQt5.QtGui import QIcon
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
 from utils.ploting_qt5 import Plot
 from utils.help import find_nearest_index
-from parsers.configparser_ import ConfigParser
-
-
+from utils.decimation import decimate_min_max
+from utils.result_store import ResultStore
+from utils.flag_journal import FlagJournal
+from utils.monitoring_file import create_monitoring_data, save_monitoring_data, get_monitoring_file_name
+from utils.dynamic_spectrum import load_dynamic_spectrum, get_cell_edges
+from utils.period_search import load_periodogram_job
+from utils.spectrum_cache import get_spectrum
+from parsers.configparser_ import load_config
+
+# milliseconds between writes of flag changes
+FLAG_FLUSH_INTERVAL = 5000
+# bins of monitoring plot decimation before plot is shown
+DEFAULT_PLOT_WIDTH = 2000
+# period search runs one false alarm probability at a time
+PERIOD_SEARCH_PROCESSES = 1
+
+
+@lru_cache(maxsize=None)
 def parse_arguments():
     """
 
@@ -55,7 +69,7 @@ def get_configs(section, key):
     :return: configuration file section key value
     """
     config_file_path = get_args("config")
-    config = ConfigParser(config_file_path)
+    config = load_config(config_file_path)
     return config.get_config(section, key)
 
 
@@ -179,16 +193,19 @@ class MonitoringView(PlottingView):
         self.multiple_spectre = True
         self.spectrum_set = set()
         self.specter_plots_files = set()
-        self.lines = []
         self.flagged_points = []
         self.flags = []
         self.un_flags = []
 
-        result_path = get_configs("paths", "resultFilePath")
-        result_file_name = self.source + "_" + self.line + ".json"
+        result_store = ResultStore(get_configs("paths", "resultFilePath"))
+        result_data = result_store.get_results(self.source, self.line)
+        result_store.close()
 
-        with open(result_path + "/" + result_file_name) as result_file:
-            result_data = json.load(result_file)
+        # flag changes are written in batches
+        self.flag_journal = FlagJournal(get_configs("paths", "resultFilePath"), self.source, self.line, result_data)
+        self.flag_timer = QTimer(self)
+        self.flag_timer.timeout.connect(self.flush_flags)
+        self.flag_timer.start(FLAG_FLUSH_INTERVAL)
 
         self.experiments = [MonitoringView.Experiment(**result_data[experiment])
                             for experiment in result_data]
@@ -201,46 +218,100 @@ class MonitoringView(PlottingView):
         self.monitoring_plot.creatPlot(self.grid, "Time", "Flux density (Jy)",
                                        get_configs("Full_source_name", source), (1, 0), "log")
 
-        symbols = ["*", "o", "v", "^", "<", ">", "1", "2", "3", "4"]
-        colors = ['b', 'g', 'r', 'c', 'm', 'y', 'k', 'w']
         self.dates = [np.float(e.modifiedJulianDays) for e in self.experiments]
         self.source_velocities = get_configs('velocities', self.source + "_" + self.line).split(",")
         self.source_velocities = [x.strip() for x in self.source_velocities]
-        monitoring_results = [np.array([self.dates])]
         self.iterations = [e.Iteration_number for e in self.experiments]
-
+        self.labels = labels2
+
+        component_count = len(self.source_velocities)
+        self.date_array = np.array(self.dates, dtype=float)
+        self.amplitudes = {
+            "left": np.array([[e.polarizationU1[i][1] for i in range(component_count)]
+                              for e in self.experiments], dtype=float).reshape(-1, component_count),
+            "right": np.array([[e.polarizationU9[i][1] for i in range(component_count)]
+                               for e in self.experiments], dtype=float).reshape(-1, component_count),
+            "avg": np.array([[e.polarizationAVG[i][1] for i in range(component_count)]
+                             for e in self.experiments], dtype=float).reshape(-1, component_count)}
+
+        # lines are created when polarization is shown for first time
         self.line_dict = {"left": list(),
                           "right": list(),
                           "avg": list()}
-        for i in range(0, len(self.source_velocities)):
-            l1 = self.monitoring_plot.plot(self.dates,
-                                           [e.polarizationU1[i][1] for e in self.experiments],
-                                           symbols[i] + colors[i],
-                                           fontsize=8, visible=False, picker=False)
-            l2 = self.monitoring_plot.plot(self.dates,
-                                           [e.polarizationU9[i][1] for e in self.experiments],
-                                           symbols[i] + colors[i],
-                                           fontsize=8, visible=False, picker=False)
-            l3 = self.monitoring_plot.plot(self.dates,
-                                           [e.polarizationAVG[i][1] for e in self.experiments],
-                                           symbols[i] + colors[i], fontsize=8,
-                                           label="Velocity " + self.source_velocities[i],
-                                           visible=True, picker=5)
-            monitoring_results.append(np.array([e.polarizationAVG[i][1] for e in self.experiments]))
-
-            self.lines.append(l1)
-            self.lines.append(l2)
-            self.lines.append(l3)
-            self.line_dict["left"].append(l1)
-            self.line_dict["right"].append(l2)
-            self.line_dict["avg"].append(l3)
-
-        np.save(get_configs("paths", "monitoringFilePath") +
-                self.source + "_" + str(self.line), np.transpose(monitoring_results))
-        self.monitoring_plot.addCursor(labels2)
+        # indexes of experiments drawn by each line
+        self.drawn_indexes = dict()
+        self.create_lines("avg")
+
+        monitoring_data = create_monitoring_data(
+            self.dates, [e.location for e in self.experiments], self.iterations,
+            self.amplitudes["left"], self.amplitudes["right"], self.amplitudes["avg"])
+        save_monitoring_data(get_monitoring_file_name(get_configs("paths", "monitoringFilePath"),
+                                                      self.source, self.line), monitoring_data)
         self.monitoring_plot.addPickEvent(self.choose_spectrum)
+        self.monitoring_plot.addZoomEvent(self.update_lines)
         self.add_widget(self.monitoring_plot, 0, 0)
 
+    def create_lines(self, polarization):
+        """
+
+        :param polarization: left, right or avg
+        :return: None
+        """
+        if len(self.line_dict[polarization]) > 0:
+            return
+
+        symbols = ["*", "o", "v", "^", "<", ">", "1", "2", "3", "4"]
+        colors = ['b', 'g', 'r', 'c', 'm', 'y', 'k', 'w']
+        x_min, x_max, bins = self.get_view()
+        for i in range(0, len(self.source_velocities)):
+            indexes = decimate_min_max(self.date_array, self.amplitudes[polarization][:, i], x_min, x_max, bins)
+            options = dict()
+            if polarization == "avg":
+                options["label"] = "Velocity " + self.source_velocities[i]
+            line = self.monitoring_plot.plot(self.date_array[indexes], self.amplitudes[polarization][indexes, i],
+                                             symbols[i] + colors[i], fontsize=8, picker=5, **options)[0]
+            self.line_dict[polarization].append(line)
+            self.drawn_indexes[line] = indexes
+
+        self.monitoring_plot.addCursor(self.labels, self.get_experiment_index, list(self.drawn_indexes.keys()))
+
+    def get_view(self):
+        """
+
+        :return: x limits of monitoring plot and its width in pixels,
+        whole time range if nothing is plotted yet
+        """
+        if len(self.drawn_indexes) == 0:
+            if len(self.dates) == 0:
+                return 0, 0, 1
+            return self.date_array[0], self.date_array[-1], DEFAULT_PLOT_WIDTH
+        x_min, x_max = self.monitoring_plot.get_xlim()
+        return x_min, x_max, max(int(self.monitoring_plot.graph.get_window_extent().width), 1)
+
+    def update_lines(self, *_):
+        """
+        Visible lines are decimated to resolution of current view
+
+        :return: None
+        """
+        x_min, x_max, bins = self.get_view()
+        for polarization in self.line_dict:
+            for i, line in enumerate(self.line_dict[polarization]):
+                if line.get_visible():
+                    indexes = decimate_min_max(self.date_array, self.amplitudes[polarization][:, i],
+                                               x_min, x_max, bins)
+                    line.set_data(self.date_array[indexes], self.amplitudes[polarization][indexes, i])
+                    self.drawn_indexes[line] = indexes
+
+    def get_experiment_index(self, line, index):
+        """
+
+        :param line: monitoring line
+        :param index: index of point in line
+        :return: index of experiment
+        """
+        return int(self.drawn_indexes[line][int(index)])
+
     class Experiment:
         """
         Experiment class
@@ -273,16 +344,12 @@ class MonitoringView(PlottingView):
             this_line = event.artist
             xdata = this_line.get_xdata()
             ydata = this_line.get_ydata()
-            result_path = get_configs("paths", "resultFilePath")
-            result_file_name = self.source + "_" + self.line + ".json"
-            iteration = self.iterations[ind]
-            time = [e.time for e in self.experiments][ind]
-            date = [e.Date for e in self.experiments][ind]
-            mjd = [e.modifiedJulianDays for e in self.experiments][ind]
-            station = [e.location for e in self.experiments][ind]
-
-            with open(result_path + result_file_name) as result_data:
-                results = json.load(result_data)
+            experiment = self.experiments[self.get_experiment_index(this_line, ind)]
+            iteration = experiment.Iteration_number
+            time = experiment.time
+            date = experiment.Date
+            mjd = experiment.modifiedJulianDays
+            station = experiment.location
 
             if event.mouseevent.button == 1:
                 output_file = get_configs("paths", "outputFilePath") + self.line + "/" + self.source + "/" + \
@@ -322,16 +389,8 @@ class MonitoringView(PlottingView):
                         self.flags.pop(unflag_index)
                         self.monitoring_plot.canvasShow()
 
-                        for experiment in results:
-                            if experiment.endswith("_" + str(iteration)) and \
-                                    results[experiment]["time"].replace(":", "_") + "_" + \
-                                    results[experiment]["Date"] == time.replace(":", "_") + "_" + date:
-                                results[experiment]["flag"] = False
-                                print(experiment, "is un flag")
-
-                        with open(get_configs("paths", "resultFilePath") +
-                                  result_file_name, "w") as result_data:
-                            result_data.write(json.dumps(results, indent=2))
+                        for experiment in self.flag_journal.set_flag(station, iteration, date, time, False):
+                            print(experiment, "is un flag")
 
                         self.un_flags.append((xdata[ind], ydata[ind]))
 
@@ -348,18 +407,24 @@ class MonitoringView(PlottingView):
                             index_tmp -= 1
                         self.un_flags.pop(index_tmp)
 
-                    for experiment in results:
-                        if experiment.endswith("_" + str(iteration)) and \
-                                results[experiment]["time"].replace(":", "_") + "_" + \
-                                results[experiment]["Date"] == time.replace(":", "_") + "_" + date:
-                            results[experiment]["flag"] = True
-                            print(experiment, "is flag")
+                    for experiment in self.flag_journal.set_flag(station, iteration, date, time, True):
+                        print(experiment, "is flag")
 
-                    with open(get_configs("paths", "resultFilePath") +
-                              result_file_name, "w") as result_data:
-                        result_data.write(json.dumps(results, indent=2))
                     self.flags.append((xdata[ind], ydata[ind]))
 
+    def flush_flags(self):
+        """
+
+        :return: None
+        """
+        if self.flag_journal.has_pending():
+            print(self.flag_journal.flush(), "flag changes are saved")
+
+    def closeEvent(self, event):
+        self.flag_timer.stop()
+        self.flush_flags()
+        event.accept()
+
     def keyPressEvent(self, event):
         if event.key() == Qt.Key_Shift:
             self.new_spectre = True
@@ -401,50 +466,16 @@ class MonitoringView(PlottingView):
         return group_box
 
     def change_visible_lines(self, polarization):
-        if polarization == "ALL":
-            for line in self.lines:
-                line[0].set_picker(5)
-                line[0].set_visible(True)
-
-        elif polarization == "polarization AVG":
-            for line in self.line_dict["avg"]:
-                line[0].set_picker(5)
-                line[0].set_visible(True)
-
-            for line in self.line_dict["left"]:
-                line[0].set_picker(False)
-                line[0].set_visible(False)
-
-            for line in self.line_dict["right"]:
-                line[0].set_picker(False)
-                line[0].set_visible(False)
-
-        elif polarization == "polarization left":
-            for line in self.line_dict["left"]:
-                line[0].set_picker(5)
-                line[0].set_visible(True)
-
-            for line in self.line_dict["avg"]:
-                line[0].set_picker(False)
-                line[0].set_visible(False)
-
-            for line in self.line_dict["right"]:
-                line[0].set_picker(False)
-                line[0].set_visible(False)
-
-        elif polarization == "polarization right":
-            for line in self.line_dict["right"]:
-                line[0].set_picker(5)
-                line[0].set_visible(True)
-
-            for line in self.line_dict["left"]:
-                line[0].set_picker(False)
-                line[0].set_visible(False)
-
-            for line in self.line_dict["avg"]:
-                line[0].set_picker(False)
-                line[0].set_visible(False)
-
+        shown_polarizations = {"ALL": ["left", "right", "avg"], "polarization AVG": ["avg"],
+                               "polarization left": ["left"], "polarization right": ["right"]}[polarization]
+        for line_polarization in self.line_dict:
+            if line_polarization in shown_polarizations:
+                self.create_lines(line_polarization)
+            for line in self.line_dict[line_polarization]:
+                line.set_picker(5 if line_polarization in shown_polarizations else False)
+                line.set_visible(line_polarization in shown_polarizations)
+
+        self.update_lines()
         self.monitoring_plot.canvasShow()
 
     def create_period_view(self):
@@ -455,7 +486,7 @@ class MonitoringView(PlottingView):
             symbols = ["*", "o", "v", "^", "<", ">", "1", "2", "3", "4"]
             colors = ['b', 'g', 'r', 'c', 'm', 'y', 'k', 'w']
             plot_simbol = symbols[component_index] + colors[component_index]
-            self.period_view = PeriodView(self.dates, amplitude, plot_simbol, component)
+            self.period_view = PeriodView(self.dates, amplitude, plot_simbol, component, self.source, self.line)
             self.period_view.show()
         else:
             print("wrong velocity selected")
@@ -476,10 +507,12 @@ class SpecterView(PlottingView):
         self.grid.setSpacing(10)
         self.setLayout(self.grid)
         self.setWindowTitle("Spectre")
-        self.spectre_files = list(set(spectre_files))
+        # files are kept in order of adding, each file is plotted once
+        self.spectre_files = []
+        self.plot_set = set()
+        self.add_spectre_files(spectre_files)
         self.source = source
         self.polarization = polarization
-        self.plot_set = set()
         source_name = get_configs("Full_source_name", self.source)
 
         self.specter_plot = Plot()
@@ -506,29 +539,36 @@ class SpecterView(PlottingView):
             amplitude_colon = 2
         elif self.polarization == "polarization AVG" or self.polarization == "ALL":
             amplitude_colon = 3
-        for spectre_file in self.spectre_files:
-            index = self.spectre_files.index(spectre_file)
-            data_file = h5py.File(spectre_file, 'r')
-            if "amplitude_corrected_not_smooht" in data_file:
-                data = data_file['amplitude_corrected_not_smooht'][()]
+        for index, spectre_file in enumerate(self.spectre_files):
+            if spectre_file in self.plot_set:
+                continue
+            data = get_spectrum(spectre_file)
+            if data is not None:
                 x = data[:, 0]
                 y = data[:, amplitude_colon]
-                plot_name = ".".join([spectre_file.split("/")[-1].split(".")[0],
-                                      spectre_file.split("/")[-1].split(".")[1]])
-                if plot_name not in self.plot_set:
-                    self.specter_plot.plot(x, y, symbols[index], label=plot_name)
-                    self.plot_set.add(plot_name)
+                plot_name = ".".join(os.path.basename(spectre_file).split(".")[0:2])
+                self.specter_plot.plot(x, y, symbols[index % len(symbols)], label=plot_name)
+                self.plot_set.add(spectre_file)
             else:
                 print("Output " + spectre_file + " file has no amplitude_corrected_not_smooht colomm")
 
+    def add_spectre_files(self, spectre_files):
+        """
+
+        :param spectre_files: output files
+        :return: None
+        """
+        for spectre_file in sorted(spectre_files):
+            if spectre_file not in self.spectre_files:
+                self.spectre_files.append(spectre_file)
+
     def set_specter_plots_files(self, specter_plots_files):
         """
 
         :param specter_plots_files: total_spectrum_analyser_qt5.py output files
         :return: None
         """
-        self.spectre_files.extend(specter_plots_files)
-        self.spectre_files = list(set(self.spectre_files))
+        self.add_spectre_files(specter_plots_files)
         self.plot()
         self.specter_plot.draw()
         self.specter_plot.canvasShow()
@@ -536,71 +576,50 @@ class SpecterView(PlottingView):
 
 class PeriodView(PlottingView):
     """
-    Period View
+    Period View, period search runs in worker process and view is updated when it is done
     """
-    def __init__(self, time, amplitude, plot_simbol, velocity_name):
+    def __init__(self, time, amplitude, plot_simbol, velocity_name, source, line):
         PlottingView.__init__(self)
         self.grid = QGridLayout()
         self.grid.setSpacing(10)
         self.setLayout(self.grid)
-        self.setWindowTitle("Periods in days ")
+        self.setWindowTitle("Periods in days, searching ...")
         self.time = time
         self.amplitude = amplitude
         self.plot_simbol = plot_simbol
         self.velocity_name = velocity_name
 
-        error = np.array(self.amplitude) * 0.1
-        ls = LombScargle(self.time, self.amplitude, error, fit_mean=True)
-
-        def date_delta(d1, d2):
-            return abs(d1 - d2)
-
-        def get_max_date_delta():
-            max_delta = list()
-            for x in range(0, len(self.time) - 1):
-                max_delta.append(date_delta(self.time[x], self.time[x + 1]))
-
-            return np.max(max_delta)
-
-        def get_min_date_delta():
-            min_delta = list()
-            for x in range(0, len(self.time) - 1):
-                tmp_delta = date_delta(self.time[x], self.time[x + 1])
-                if tmp_delta > 0:
-                    min_delta.append(tmp_delta)
-            return np.min(min_delta)
-
-        nyquist_factor = 2 * get_max_date_delta()
-        minimum_frequency = (1 / (date_delta(self.time[-1], self.time[0])/2))
-        maximum_frequency = 1 / (2 * get_min_date_delta())
-
-        print("nyquist_factor", nyquist_factor)
-        print("minimum_frequency", minimum_frequency)
-        print("maximum_frequency", maximum_frequency)
-        frequency, power = ls.autopower(method='fastchi2', normalization='model',
-                                        nyquist_factor=nyquist_factor,
-                                        minimum_frequency=minimum_frequency,
-                                        maximum_frequency=maximum_frequency,
-                                        samples_per_peak=20)
+        self.period_plot = Plot()
+        self.period_plot.creatPlot(self.grid, "Period (days)", "Power", None, (1, 0), "linear")
+        self.add_widget(self.period_plot, 0, 0)
 
-        false_alarm = ls.false_alarm_probability(power.max(), method="bootstrap",
-                                                 nyquist_factor=nyquist_factor,
-                                                 minimum_frequency=minimum_frequency,
-                                                 maximum_frequency=maximum_frequency,
-                                                 samples_per_peak=20)
+        job = (get_configs("paths", "cacheFilePath"), source, line, velocity_name, self.time, self.amplitude)
+        self.period_search = get_period_search_pool().apply_async(load_periodogram_job, (job,))
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.show_periodogram)
+        self.timer.start(100)
 
-        print("max power", power.max(), "false_alarm", false_alarm)
+    def show_periodogram(self):
+        """
 
-        period_days = 1. / frequency
-        best_period = period_days[np.argmax(power)]
-        print("Best period: {0:.2f} days".format(best_period))
+        :return: None
+        """
+        if not self.period_search.ready():
+            return
 
-        self.period_plot = Plot()
-        self.period_plot.creatPlot(self.grid, "Period (days)", "Power", None, (1, 0), "linear")
-        self.add_widget(self.period_plot, 0, 0)
-        self.period_plot.plot(period_days, power, self.plot_simbol,
+        self.timer.stop()
+        self.setWindowTitle("Periods in days ")
+        _, _, periodogram, error = self.period_search.get()
+        if error is not None:
+            print("Period search failed", error)
+            return
+
+        print("max power", periodogram["max_power"], "false_alarm", periodogram["false_alarm"])
+        print("Best period: {0:.2f} days".format(float(periodogram["best_period"])))
+        self.period_plot.plot(1. / periodogram["frequency"], periodogram["power"], self.plot_simbol,
                               label="polarization AVG " + "Velocity " + self.velocity_name,
                               rasterized=True)
+        self.period_plot.canvasShow()
 
 
 class MapsView(PlottingView):
@@ -616,69 +635,54 @@ class MapsView(PlottingView):
         self.mjd = mjd
         self.source = source
         self.line = line
-        self.output_files = os.listdir(get_configs("paths", "outputFilePath") + self.line + "/" + self.source)
-        self.output_files = [of for of in self.output_files if of.startswith(self.source)]
 
-        days = self.mjd[-1] - self.mjd[0]
         sources_vrange = ascii.read('DB_vrange.csv')
         source_vrange_index = sources_vrange['name'].tolist().index(self.source)
-        vmin = dict(sources_vrange)["vmin"][source_vrange_index]
-        vmax = dict(sources_vrange)["vmax"][source_vrange_index]
+        vmin = sources_vrange["vmin"][source_vrange_index]
+        vmax = sources_vrange["vmax"][source_vrange_index]
+        vmin = None if np.ma.is_masked(vmin) else float(vmin)
+        vmax = None if np.ma.is_masked(vmax) else float(vmax)
 
-        if vmin is None or vmax is None:
-            vmin, vmax, velocity, observed_flux, observed_time = self.get_max_min_velocity(vmin, vmax)
-
-        else:
-            _, _, velocity, observed_flux, observed_time = self.get_max_min_velocity(vmin, vmax)
-
-        observed_flux = list(np.array(observed_flux).clip(min=1.5))
-        triang = mtri.Triangulation(velocity, observed_time)
+        observed_time, velocity, observed_flux = load_dynamic_spectrum(get_configs("paths", "outputFilePath"),
+                                                                       get_configs("paths", "cacheFilePath"),
+                                                                       self.source, self.line, vmin, vmax)
+        observed_flux = np.ma.masked_invalid(observed_flux.clip(min=1.5))
 
         self.map_plot = Plot()
         self.map_plot.creatPlot(self.grid, 'Velocity (km sec$^{-1}$)', "MJD", None, (1, 0), "log")
-        lvls = np.linspace(int(np.min(observed_flux)), int(np.max(observed_flux)), 1000)
-        cs = self.map_plot.graph.tricontourf(triang, observed_flux, levels=lvls,
-                                             antialiased=False, locator=ticker.LogLocator, cmap="jet")
-
-        cs.set_clim(vmin=1.5)
+        cs = self.map_plot.graph.pcolormesh(get_cell_edges(velocity), get_cell_edges(observed_time), observed_flux,
+                                            norm=LogNorm(vmin=1.5, vmax=observed_flux.max()),
+                                            cmap="jet", rasterized=True)
         cbar = self.map_plot.colorbar(cs, spacing="proportional", label=r'$Flux~(\mathrm{Jy})$', extendrect=False)
         cbar.locator = ticker.LogLocator()
         self.add_widget(self.map_plot, 0, 0)
 
         self.map_plot.save_fig("cepa_maps.pdf", format="pdf", dpi=150)
 
-    def get_max_min_velocity(self, vmin, vmax):
-        max_velocitys = []
-        min_velocitys = []
-        velocity_ = []
-        observed_flux = []
-        observed_time = []
-
-        for file in self.output_files:
-            data_file = h5py.File(get_configs("paths", "outputFilePath") +
-                                  self.line + "/" +
-                                  self.source + "/" + file, "r")
-            if "amplitude_corrected_not_smooht" in data_file:
-                data = data_file["amplitude_corrected_not_smooht"][()]
-                velocity = data[:, 0]
-                amplitude = data[:, 3]
-                mjd = file.split("_")[1]
-
-                max_velocitys.append(max(velocity))
-                min_velocitys.append(min(velocity))
-
-                for i in range(0, len(velocity)):
-                    if vmin or vmax:
-                        if vmin <= velocity[i] <= vmax:
-                            velocity_.append(velocity[i])
-                            observed_flux.append(amplitude[i])
-                            observed_time.append(np.float(mjd))
-                    else:
-                        velocity_.append(velocity[i])
-                        observed_flux.append(amplitude[i])
-                        observed_time.append(np.float(mjd))
 
-        return max(max_velocitys), min(min_velocitys), velocity_, observed_flux, observed_time
+@lru_cache(maxsize=None)
+def get_period_search_pool():
+    """
+    Workers are started when the first period search is requested,
+    they are spawned, so they do not inherit threads of running Qt application
+
+    :return: worker processes for period search
+    """
+    return get_context("spawn").Pool(processes=PERIOD_SEARCH_PROCESSES)
+
+
+def close_period_search_pool():
+    """
+    Running period search is finished, so its periodogram is cached
+
+    :return: None
+    """
+    if get_period_search_pool.cache_info().currsize == 0:
+        return
+    pool = get_period_search_pool()
+    pool.close()
+    pool.join()
+    get_period_search_pool.cache_clear()
 
 
 def main():
@@ -687,6 +691,7 @@ def main():
     :return: None
     """
     q_app = QApplication(sys.argv)
+    q_app.aboutToQuit.connect(close_period_search_pool)
     application = Monitoring()
     application.show()
     sys.exit(q_app.exec_())
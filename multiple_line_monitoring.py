@@ -6,8 +6,8 @@ Display monitoring for multiple sources
 """
 import sys
 import argparse
+from functools import lru_cache
 import re
-import json
 from sympy import lambdify
 from tabulate import tabulate
 import numpy as np
@@ -17,10 +17,13 @@ from matplotlib.widgets import Slider, TextBox, Button
 from pandas import DataFrame
 from scipy import stats
 
-from parsers.configparser_ import ConfigParser
+from parsers.configparser_ import load_config
 from utils.help import find_nearest_index
+from utils.result_store import ResultStore
+from utils.monitoring_file import load_monitoring_data, get_monitoring_file_name
 
 
+@lru_cache(maxsize=None)
 def parse_arguments():
     """
 
@@ -54,7 +57,7 @@ def get_configs(section, key):
     :return: configuration file section key value
     """
     config_file_path = get_args("config")
-    config = ConfigParser(config_file_path)
+    config = load_config(config_file_path)
     return config.get_config(section, key)
 
 
@@ -111,8 +114,8 @@ def read_monitoring_files(monitoring_files, sources):
         velocities_to_plot_for_source[source] = get_velocities_tmp(source)
 
     for file in monitoring_files:
-        data = np.load(file, allow_pickle=True)
-        date = data[0][0]
+        data = load_monitoring_data(file)
+        date = data["mjd"]
         source = file.split("/")[-1].split(".")[0].split("_")[0]
         lines_to_plot = velocities_to_plot_for_source[source]
         tmp = get_configs("velocities", source + "_" + get_args("line")).split(",")
@@ -126,7 +129,7 @@ def read_monitoring_files(monitoring_files, sources):
 
         for c in range(1, column_nr+1):
             if c - 1 in idexie_for_lines_to_plot:
-                tmp = data[c] / np.mean(data[c])
+                tmp = data["avg"][:, c - 1] / np.mean(data["avg"][:, c - 1])
                 lines[source]["y_data"].append(tmp)
 
     return lines
@@ -135,24 +138,22 @@ def read_monitoring_files(monitoring_files, sources):
 def get_iterations_from_mjd(star_time, stop_time):
     iterations = dict()
     source_list = ["g32p745", "w51", "g59p783", "on1", "s252", "ngc7538", "w3oh"]
-    result_file_path = get_configs("paths", "resultFilePath")
+    result_store = ResultStore(get_configs("paths", "resultFilePath"))
 
     for source in source_list:
-        result_file = result_file_path + source + "_" + get_args("line") + ".json"
-
-        with open(result_file) as result_data:
-            result = json.load(result_data)
-            modified_julian_days = []
-            iteration_numbers = []
-            for observation in result:
-                modified_julian_days.append(result[observation]["modifiedJulianDays"])
-                iteration_numbers.append(result[observation]["Iteration_number"])
-
-            if len(modified_julian_days) > 0:
-                left_index = find_nearest_index(modified_julian_days, star_time)
-                right_index = find_nearest_index(modified_julian_days, stop_time)
-                iterations[source] = iteration_numbers[min(right_index,left_index):max(right_index,left_index)]
-
+        result = result_store.get_results(source, get_args("line"))
+        modified_julian_days = []
+        iteration_numbers = []
+        for observation in result:
+            modified_julian_days.append(result[observation]["modifiedJulianDays"])
+            iteration_numbers.append(result[observation]["Iteration_number"])
+
+        if len(modified_julian_days) > 0:
+            left_index = find_nearest_index(modified_julian_days, star_time)
+            right_index = find_nearest_index(modified_julian_days, stop_time)
+            iterations[source] = iteration_numbers[min(right_index,left_index):max(right_index,left_index)]
+
+    result_store.close()
     return iterations
 
 
@@ -163,7 +164,7 @@ def main():
     monitoring_dir = get_configs("paths", "monitoringFilePath")
 
     for source in sources:
-        monitoring_files.append(monitoring_dir + source + "_" + get_args("line") + ".npy")
+        monitoring_files.append(get_monitoring_file_name(monitoring_dir, source, get_args("line")))
 
     lines = read_monitoring_files(monitoring_files, sources)
 
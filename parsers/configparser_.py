@@ -1,6 +1,7 @@
 """
 parse configure files
 """
+import os
 import configparser
 
 
@@ -45,3 +46,175 @@ class ConfigParser(metaclass=Singleton):
         :return: all items from section of configuration file
         """
         return dict(self._config.items(section))
+
+
+CONFIGS = {}
+
+
+def get_modification_time(config_file_path):
+    """
+
+    :param config_file_path: configuration file path
+    :return: modification time of configuration file or None if file do not exist
+    """
+    try:
+        return os.stat(config_file_path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class Config:
+    """
+    configuration file parsed once with typed accessors
+    """
+
+    def __init__(self, config_file_path):
+        self.config_file_path = config_file_path
+        self._config = None
+        self._modification_time = None
+        self._values = {}
+        self.reload()
+
+    def reload(self):
+        """
+
+        :return: None
+        """
+        self._modification_time = get_modification_time(self.config_file_path)
+        self._config = configparser.RawConfigParser()
+        self._config.read(self.config_file_path)
+        self._values = {}
+
+    def reload_if_changed(self):
+        """
+
+        :return: True if configuration file is changed and reloaded
+        """
+        if get_modification_time(self.config_file_path) != self._modification_time:
+            self.reload()
+            return True
+        return False
+
+    def get_config(self, section, key):
+        """
+
+        :param section: configuration file section
+        :param key: key of section
+        :return: configuration file value from section with key param key
+        """
+        return self._config.get(section, key)
+
+    def get_items(self, section):
+        """
+
+        :param section: section of configuration file
+        :return: all items from section of configuration file
+        """
+        return dict(self._config.items(section))
+
+    def get_path(self, key):
+        """
+
+        :param key: key of section paths
+        :return: path
+        """
+        return self._config.get("paths", key)
+
+    def get_int(self, section, key):
+        """
+
+        :param section: configuration file section
+        :param key: key of section
+        :return: value as int
+        """
+        return self._config.getint(section, key)
+
+    def get_float(self, section, key):
+        """
+
+        :param section: configuration file section
+        :param key: key of section
+        :return: value as float
+        """
+        return self._config.getfloat(section, key)
+
+    def get_list(self, section, key):
+        """
+
+        :param section: configuration file section
+        :param key: key of section
+        :return: comma separated values as tuple of stripped strings
+        """
+        if (section, key) not in self._values:
+            self._values[(section, key)] = tuple(value.strip() for value in self._config.get(section, key).split(","))
+        return self._values[(section, key)]
+
+    def get_cuts(self, source, line):
+        """
+
+        :param source: source
+        :param line: frequency
+        :return: velocity ranges of signal as tuple of (start, stop) float pairs
+        """
+        key = ("cuts", source + "_" + str(line))
+        if key not in self._values:
+            self._values[key] = tuple(tuple(float(value) for value in cut.split(","))
+                                      for cut in self._config.get(*key).split(";"))
+        return self._values[key]
+
+    def get_velocities(self, source, line):
+        """
+
+        :param source: source
+        :param line: frequency
+        :return: velocities of maser components as strings, they are used as keys in result file
+        """
+        return self.get_list("velocities", source + "_" + str(line))
+
+    def get_gauss_lines(self, source, line):
+        """
+
+        :param source: source
+        :param line: frequency
+        :return: initial velocities of gaussian lines as strings
+        """
+        return self.get_list("gauss_lines", source + "_" + str(line))
+
+    def get_source_coordinates(self, source):
+        """
+
+        :param source: source
+        :return: right ascension, declination and epoch strings
+        """
+        return self.get_list("sources", source)
+
+    def get_station_coordinates(self, station):
+        """
+
+        :param station: station name
+        :return: station x, y, z coordinates
+        """
+        return tuple(float(value) for value in self.get_list("stations", station))
+
+    def get_base_frequency(self, key, back_end="SDR"):
+        """
+
+        :param key: line key, f<line> for SDR and specie for DBBC
+        :param back_end: back end type SDR or DBBC
+        :return: base frequency and specie
+        """
+        values = self.get_list("base_frequencies_" + back_end, key)
+        if len(values) > 1:
+            return float(values[0]), values[1]
+        return float(values[0]), key
+
+
+def load_config(config_file_path):
+    """
+
+    :param config_file_path: configuration file path
+    :return: configuration loaded once per process for each configuration file
+    """
+    if config_file_path not in CONFIGS:
+        CONFIGS[config_file_path] = Config(config_file_path)
+    return CONFIGS[config_file_path]
@@ -7,6 +7,7 @@ For definite (low, middle, high) output files for give sources compute spectral
 import sys
 import os
 import argparse
+from functools import lru_cache
 from matplotlib import rcParams
 from matplotlib.font_manager import FontProperties
 import matplotlib.pyplot as plt
@@ -18,9 +19,10 @@ PACKAGE_PARENT = '..'
 SCRIPT_DIR = os.path.dirname(os.path.realpath(os.path.join(os.getcwd(), os.path.expanduser(__file__))))
 sys.path.append(os.path.normpath(os.path.join(SCRIPT_DIR, PACKAGE_PARENT)))
 
-from parsers.configparser_ import ConfigParser
+from parsers.configparser_ import load_config
 
 
+@lru_cache(maxsize=None)
 def parse_arguments():
     """
 
@@ -51,7 +53,7 @@ def get_configs(section, key):
     :return: configuration file section key value
     """
     config_file_path = get_args("config")
-    config = ConfigParser(config_file_path)
+    config = load_config(config_file_path)
     return config.get_config(section, key)
 
 
@@ -61,7 +63,7 @@ def get_configs_items():
     :return: None
     """
     config_file_path = "../config/plot.cfg"
-    config = ConfigParser(config_file_path)
+    config = load_config(config_file_path)
     return config.get_items("main")
 
 
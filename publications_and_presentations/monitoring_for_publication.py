@@ -7,8 +7,7 @@ Create LATEX tables for publications
 import sys
 import os
 import argparse
-from datetime import datetime
-from functools import reduce
+from functools import lru_cache
 import matplotlib.pyplot as plt
 from matplotlib import rcParams
 from matplotlib.ticker import StrMethodFormatter
@@ -18,10 +17,12 @@ PACKAGE_PARENT = '..'
 SCRIPT_DIR = os.path.dirname(os.path.realpath(os.path.join(os.getcwd(), os.path.expanduser(__file__))))
 sys.path.append(os.path.normpath(os.path.join(SCRIPT_DIR, PACKAGE_PARENT)))
 
-from parsers.configparser_ import ConfigParser
-from utils.help import file_len, correct_numpy_read_data, convert_datetime_object_to_mjd
+from parsers.configparser_ import load_config
+from utils.monitoring_file import load_merged_monitoring_data, get_monitoring_rows
+from utils.variability import get_time_window, compute_indices
 
 
+@lru_cache(maxsize=None)
 def parse_arguments():
     """
 
@@ -45,7 +46,7 @@ def get_configs_items():
     :return: None
     """
     config_file_path = "../config/plot.cfg"
-    config = ConfigParser(config_file_path)
+    config = load_config(config_file_path)
     return config.get_items("main")
 
 
@@ -66,14 +67,11 @@ def get_configs(section, key):
     :return: configuration file section key value
     """
     config_file_path = get_args("config")
-    config = ConfigParser(config_file_path)
+    config = load_config(config_file_path)
     return config.get_config(section, key)
 
 
 def main():
-    both = False
-    new = False
-    old = False
     configuration_items = get_configs_items()
     for key, value in configuration_items.items():
         rcParams[key] = value
@@ -90,55 +88,14 @@ def main():
                            get_args("line")).replace(" ", "").split(",")
     components = [i for i in range(1, component_count + 1)]
 
-    if os.path.isfile(old_monitoring_file) and os.path.isfile(new_monitoring_file):
-        new_data = np.load(new_monitoring_file, allow_pickle=True)
-        new_x = new_data[0][0]
-        old_data = np.loadtxt(old_monitoring_file, dtype=str).reshape(
-            (file_len(old_monitoring_file), component_count + 1))
-        old_x = correct_numpy_read_data(old_data[:, [0]])
-        old_x = [convert_datetime_object_to_mjd(datetime.strptime(x, "%Y-%m-%d%H:%M:%S")) for x in old_x]
-        old_data[:, 0] = old_x
-        x = old_x + list(new_x)
-        old_data_tmp = []
-        for tmp in range(0, len(new_data)):
-            old_data_tmp.append([])
-        tmp2 = 0
-        for j in range(0, old_data.shape[1]):
-            for i in range(0, old_data.shape[0]):
-                old_data_tmp[tmp2].append(old_data[i][j])
-            old_data_tmp[tmp2] = np.array(old_data_tmp[tmp2]).reshape(old_data.shape[0], )
-            tmp2 += 1
-        old_data = np.array(old_data_tmp)
-        new_data[0] = new_data[0][0]
-        data = []
-
-        for tmp3 in range(0, old_data.shape[0]):
-            data_tmp = np.concatenate((old_data[tmp3], new_data[tmp3]), axis=0)
-            data.append(data_tmp)
-        data = np.array(data)
-        both = True
-
-    elif os.path.isfile(old_monitoring_file):
-        old_data = np.loadtxt(old_monitoring_file, dtype=str).reshape(
-            (file_len(old_monitoring_file), component_count + 1))
-        old_x = correct_numpy_read_data(old_data[:, [0]])
-        old_x = [convert_datetime_object_to_mjd(datetime.strptime(x, "%Y-%m-%d%H:%M:%S")) for x in old_x]
-        old_data[:, 0] = old_x
-        data = old_data
-        x = list(old_x)
-        old = True
-
-    else:
-        new_data = np.load(new_monitoring_file, allow_pickle=True)
-        new_x = new_data[0][0]
-        data = new_data
-        x = list(new_x)
-        new = True
-
-    if int(get_args("start")) != -1 and int(get_args("stop")) != -1:
-        a = (np.abs(np.array(x) - int(get_args("start")))).argmin()
-        b = (np.abs(np.array(x) - int(get_args("stop")))).argmin()
-        x = x[a:b]
+    data = get_monitoring_rows(load_merged_monitoring_data(old_monitoring_file, new_monitoring_file, component_count,
+                                                           get_configs("paths", "cacheFilePath")))
+    x = list(data[0])
+
+    window = get_time_window(x, int(get_args("start")), int(get_args("stop")))
+    x = x[window]
+    flux = np.clip(data[1:, window], 0, None)
+    indices = compute_indices(flux)
 
     print("total time in years", (np.max(x) - np.min(x)) / 365)
     print("Nmbers of observations", len(x))
@@ -170,32 +127,15 @@ def main():
     ax1.plot([], [], ' ', label="km sec$^{-1}$")
     for component in components:
         index = components.index(component)
-        if old:
-            y = data[:, index + 1]
-        elif both:
-            y = data[index + 1, :]
-        else:
-            y = data[index + 1]
-
-        y = np.array([np.float128(yi) for yi in y]).clip(min=0)
-        if int(get_args("start")) != -1 and int(get_args("stop")) != -1:
-            y = y[a:b]
-        N = len(y)
+        y = flux[index]
+        N = indices["count"][index]
         ax1.scatter(x, y, color=colors[index], marker=symbols[index], label=str(velocity[index]))
         ax1.errorbar(x[0], y[0], yerr=1.5 + 0.05 * y[0], xerr=None, ls='none', ecolor='k')  # 1st poiont error bar
         result_org.append(y)
-        variances[component] = reduce(lambda x_, y_: x_ + y_, [((i - np.mean(y)) / np.std(y)) ** 2 for i in y])
-        variability_index[component] = ((np.max(y) - np.std(y)) - (np.min(y) + np.std(y))) \
-                                          / ((np.max(y) - np.std(y)) + (np.min(y) + np.std(y)))
+        variances[component] = indices["variance"][index]
+        variability_index[component] = indices["variability_index"][index]
         variances_normal[component] = variances[component] * (1 / N - 1)
-
-        fluctuation_index[component] = np.sqrt(
-            np.abs((N / reduce(lambda x_, y_: x_ + y_, [(1.5 + 0.05 * i) ** 2 for i in y])) *
-                   ((reduce(lambda x_, y_: x_ + y_,
-                            [i ** 2 * (1.5 + 0.05 * i) ** 2 for i in y]) -
-                     np.mean(y) * reduce(lambda x_, y_: x_ + y_,
-                                         [i * (1.5 + 0.05 * i) ** 2 for i in y]))
-                    / (N - 1)) - 1)) / np.mean(y)
+        fluctuation_index[component] = indices["fluctuation_index"][index]
 
         v = velocity[index]
         print("{:3} &  {:.3f} & {:.3f} & {:.3f}\\\\".
@@ -1,9 +1,7 @@
 import sys
 import os
 from collections import namedtuple
-from functools import reduce
 import argparse
-from datetime import datetime
 
 from astropy.io import ascii
 import numpy as np
@@ -13,8 +11,9 @@ PACKAGE_PARENT = '..'
 SCRIPT_DIR = os.path.dirname(os.path.realpath(os.path.join(os.getcwd(), os.path.expanduser(__file__))))
 sys.path.append(os.path.normpath(os.path.join(SCRIPT_DIR, PACKAGE_PARENT)))
 
-from parsers.configparser_ import ConfigParser
-from utils.help import file_len, correct_numpy_read_data, convert_datetime_object_to_mjd
+from parsers.configparser_ import load_config
+from utils.monitoring_file import load_merged_monitoring_data, get_monitoring_rows
+from utils.variability import compute_indices
 
 
 def get_configs(section, key):
@@ -25,7 +24,7 @@ def get_configs(section, key):
     :return: configuration file section key value
     """
     config_file_path = "../config/config.cfg"
-    config = ConfigParser(config_file_path)
+    config = load_config(config_file_path)
     return config.get_config(section, key)
 
 
@@ -45,77 +44,23 @@ def main(infile):
                     [-1], outlier=False) for i in range(0, len(sources))]
     old_monitoring_file_path = get_configs("paths", "oldMonitoringFilePath")
     new_monitoring_file_path = get_configs("paths", "monitoringFilePath")
+    cache_file_path = get_configs("paths", "cacheFilePath")
 
     for maser in masers:
         print("Executing for maser ", maser.name)
 
-        old = False
-        new = False
-        both = False
-
         new_monitoring_file = new_monitoring_file_path + "/" + maser.name + "_" + "6668" + ".npy"
         old_monitoring_file = old_monitoring_file_path + "/" + maser.name + ".dat"
 
-        new_data = None
-        old_data = None
         monitoring_data = None
-        if os.path.isfile(old_monitoring_file) and os.path.isfile(new_monitoring_file):
+        if os.path.isfile(old_monitoring_file) or os.path.isfile(new_monitoring_file):
             source_velocities = get_configs('velocities', maser.name + "_" + "6668").split(",")
             source_velocities = [si.strip() for si in source_velocities]
             component_count = len(
                 get_configs("velocities", maser.name + "_" + "6668").replace(" ", "").split(","))
             components = [i for i in range(1, component_count + 1)]
-            new_data = np.load(new_monitoring_file, allow_pickle=True)
-            new_x = new_data[0][0]
-            old_data = np.loadtxt(old_monitoring_file, dtype=str).reshape(
-                (file_len(old_monitoring_file), component_count + 1))
-            old_x = correct_numpy_read_data(old_data[:, [0]])
-            old_x = [convert_datetime_object_to_mjd(datetime.strptime(x, "%Y-%m-%d%H:%M:%S")) for x in old_x]
-            old_data[:, 0] = old_x
-            x_data = old_x + list(new_x)
-            old_data_tmp = []
-            for tmp in range(0, len(new_data)):
-                old_data_tmp.append([])
-            tmp2 = 0
-            for j in range(0, old_data.shape[1]):
-                for i in range(0, old_data.shape[0]):
-                    old_data_tmp[tmp2].append(old_data[i][j])
-                old_data_tmp[tmp2] = np.array(old_data_tmp[tmp2]).reshape(old_data.shape[0])
-                tmp2 += 1
-            old_data = np.array(old_data_tmp)
-            new_data[0] = new_data[0][0]
-            monitoring_data = []
-
-            for tmp3 in range(0, old_data.shape[0]):
-                data_tmp = np.concatenate((old_data[tmp3], new_data[tmp3]), axis=0)
-                monitoring_data.append(data_tmp)
-            monitoring_data = np.array(monitoring_data)
-            both = True
-
-        elif os.path.isfile(old_monitoring_file) and not os.path.isfile(new_monitoring_file):
-            source_velocities = get_configs('velocities', maser.name + "_" + "6668").split(",")
-            source_velocities = [si.strip() for si in source_velocities]
-            component_count = len(
-                get_configs("velocities", maser.name + "_" + "6668").replace(" ", "").split(","))
-            components = [i for i in range(1, component_count + 1)]
-            old_data = np.loadtxt(old_monitoring_file, dtype=str).reshape(
-                (file_len(old_monitoring_file), component_count + 1))
-            old_x = correct_numpy_read_data(old_data[:, [0]])
-            old_x = [convert_datetime_object_to_mjd(datetime.strptime(x, "%Y-%m-%d%H:%M:%S")) for x in old_x]
-            old_data[:, 0] = old_x
-            monitoring_data = old_data
-            x = list(old_x)
-            old = True
-
-        elif not os.path.isfile(old_monitoring_file) and os.path.isfile(new_monitoring_file):
-            source_velocities = get_configs('velocities', maser.name + "_" + "6668").split(",")
-            source_velocities = [si.strip() for si in source_velocities]
-            component_count = len(
-                get_configs("velocities", maser.name + "_" + "6668").replace(" ", "").split(","))
-            components = [i for i in range(1, component_count + 1)]
-            new_data = np.load(new_monitoring_file, allow_pickle=True)
-            monitoring_data = new_data
-            new = True
+            monitoring_data = get_monitoring_rows(load_merged_monitoring_data(old_monitoring_file, new_monitoring_file,
+                                                                              component_count, cache_file_path))
 
         else:
             components = []
@@ -126,58 +71,30 @@ def main(infile):
             if monitoring_data is not None:
                 largest_y_mean_index = -1
                 largest_y_mean = 0
+                flux = np.clip(monitoring_data[1:], 0, None)
+                indices = compute_indices(flux)
                 for component in components:
                     index = components.index(component)
-                    if old:
-                        y_data = monitoring_data[:, index + 1]
-                    elif both:
-                        y_data = monitoring_data[index + 1, :]
-                    else:
-                        y_data = monitoring_data[index + 1]
-                    y_data = np.array([np.float128(yi) for yi in y_data]).clip(min=0)
-
-                    if np.mean(y_data) > largest_y_mean:
-                        largest_y_mean = np.mean(y_data)
+                    y_data = flux[index]
+
+                    if indices["mean"][index] > largest_y_mean:
+                        largest_y_mean = indices["mean"][index]
                         largest_y_mean_index = index
                         maser.largest_y_mean_index[0] = index
 
-                    N = len(y_data)
-                    variability_index = ((np.max(y_data) - np.std(y_data)) -
-                                         (np.min(y_data) + np.std(y_data))) / \
-                                        ((np.max(y_data) - np.std(y_data)) +
-                                         (np.min(y_data) + np.std(y_data)))
-
-                    fluctuation_index = np.sqrt(np.abs((N / reduce(lambda x__, y__: x__ + y__,
-                                                            [(1.5 + 0.05 * i) ** 2 for i in y_data])) *
-                                                ((reduce(lambda x__, y__: x__ + y__,
-                                                         [i ** 2 * (1.5 + 0.05 * i) ** 2 for i in y_data]) -
-                                                  np.mean(y_data) * reduce(lambda x__, y__: x__ + y__,
-                                                                           [i * (1.5 + 0.05 * i) ** 2 for i
-                                                                            in y_data])) / (N - 1)) - 1)) / \
-                                        np.mean(y_data)
-
-                    if not np.isnan(fluctuation_index):
-                        maser.variability_indexes.append(np.float64(variability_index))
-                        maser.fluctuation_indexes.append(np.float64(fluctuation_index))
-                        maser.mean_of_y.append(np.float64(np.mean(y_data)))
+                    if not np.isnan(indices["fluctuation_index"][index]):
+                        maser.variability_indexes.append(np.float64(indices["variability_index"][index]))
+                        maser.fluctuation_indexes.append(np.float64(indices["fluctuation_index"][index]))
+                        maser.mean_of_y.append(np.float64(indices["mean"][index]))
                         maser.flux.extend(y_data)
-                    del y_data, variability_index, fluctuation_index
+                    del y_data
 
                 for component in components:
                     index2 = components.index(component)
                     if index2 == largest_y_mean_index:
-                        if old:
-                            y_data2 = monitoring_data[:, index2 + 1]
-                        elif both:
-                            y_data2 = monitoring_data[index2 + 1, :]
-                        else:
-                            y_data2 = monitoring_data[index2 + 1]
-                        y_data2 = np.array([np.float128(yi) for yi in y_data2]).clip(min=0)
-
                         if maser.distance != "*":
-                            maser.absolute_mean_of_y.append(np.float64(np.mean(y_data2)) *
+                            maser.absolute_mean_of_y.append(np.float64(indices["mean"][index2]) *
                                                             (np.float64(maser.distance) / 2) ** 2)
-                        del y_data2
 
                 del monitoring_data
             del new_monitoring_file, old_monitoring_file
@@ -1,8 +1,7 @@
 import sys
 import os
 import argparse
-from functools import reduce
-from datetime import datetime
+from functools import lru_cache
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib import rc
@@ -13,10 +12,12 @@ PACKAGE_PARENT = '..'
 SCRIPT_DIR = os.path.dirname(os.path.realpath(os.path.join(os.getcwd(), os.path.expanduser(__file__))))
 sys.path.append(os.path.normpath(os.path.join(SCRIPT_DIR, PACKAGE_PARENT)))
 
-from parsers.configparser_ import ConfigParser
-from utils.help import file_len, correct_numpy_read_data, convert_datetime_object_to_mjd
+from parsers.configparser_ import load_config
+from utils.monitoring_file import load_merged_monitoring_data, get_monitoring_rows
+from utils.variability import create_variability_table
 
 
+@lru_cache(maxsize=None)
 def parse_arguments():
     """
 
@@ -45,7 +46,7 @@ def get_configs_items(section):
     :return: None
     """
     config_file_path = get_args("config")
-    config = ConfigParser(config_file_path)
+    config = load_config(config_file_path)
     return config.get_items(section)
 
 
@@ -57,7 +58,7 @@ def get_configs(section, key):
     :return: configuration file section key value
     """
     config_file_path = get_args("config")
-    config = ConfigParser(config_file_path)
+    config = load_config(config_file_path)
     return config.get_config(section, key)
 
 
@@ -65,119 +66,31 @@ def main():
     rc('font', family='serif', style='normal', variant='normal', weight='normal', stretch='normal', size=20)
     old_monitoring_file_path = get_configs("paths", "oldMonitoringFilePath")
     new_monitoring_file_path = get_configs("paths", "monitoringFilePath")
+    cache_file_path = get_configs("paths", "cacheFilePath")
 
     all_sources = list(get_configs_items("sources").keys())
 
-    fluctuation_indexes = []
-    variability_indexes = []
-    mean_of_y = []
-    outliers = []
+    time_series = []
     for source in all_sources:
-        old = False
-        new = False
-        both = False
         new_monitoring_file = new_monitoring_file_path + "/" + source + "_" + get_args("line") + ".npy"
         old_monitoring_file = old_monitoring_file_path + "/" + source + ".dat"
-        new_data = None
-        old_data = None
-        data = None
 
-        if os.path.isfile(old_monitoring_file) and os.path.isfile(new_monitoring_file):
+        if os.path.isfile(old_monitoring_file) or os.path.isfile(new_monitoring_file):
             source_velocities = get_configs('velocities', source + "_" + get_args("line")).split(",")
             source_velocities = [si.strip() for si in source_velocities]
-            component_count = len(get_configs("velocities", source + "_" +
-                                              get_args("line")).replace(" ", "").split(","))
-            components = [i for i in range(1, component_count + 1)]
-            new_data = np.load(new_monitoring_file, allow_pickle=True)
-            new_x = new_data[0][0]
-            old_data = np.loadtxt(old_monitoring_file, dtype=str).reshape(
-                (file_len(old_monitoring_file), component_count + 1))
-            old_x = correct_numpy_read_data(old_data[:, [0]])
-            old_x = [convert_datetime_object_to_mjd(datetime.strptime(x, "%Y-%m-%d%H:%M:%S")) for x in old_x]
-            old_data[:, 0] = old_x
-            x = old_x + list(new_x)
-            old_data_tmp = []
-            for tmp in range(0, len(new_data)):
-                old_data_tmp.append([])
-            tmp2 = 0
-            for j in range(0, old_data.shape[1]):
-                for i in range(0, old_data.shape[0]):
-                    old_data_tmp[tmp2].append(old_data[i][j])
-                old_data_tmp[tmp2] = np.array(old_data_tmp[tmp2]).reshape(old_data.shape[0],)
-                tmp2 += 1
-            old_data = np.array(old_data_tmp)
-            new_data[0] = new_data[0][0]
-            data = []
-
-            for tmp3 in range(0, old_data.shape[0]):
-                data_tmp = np.concatenate((old_data[tmp3], new_data[tmp3]), axis=0)
-                data.append(data_tmp)
-            data = np.array(data)
-            both = True
-
-        elif os.path.isfile(old_monitoring_file) and not os.path.isfile(new_monitoring_file):
-            source_velocities = get_configs('velocities', source + "_" + get_args("line")).split(",")
-            source_velocities = [si.strip() for si in source_velocities]
-            component_count = len(get_configs("velocities", source + "_" +
-                                              get_args("line")).replace(" ", "").split(","))
-            components = [i for i in range(1, component_count + 1)]
-            old_data = np.loadtxt(old_monitoring_file, dtype=str).reshape(
-                (file_len(old_monitoring_file), component_count + 1))
-            old_x = correct_numpy_read_data(old_data[:, [0]])
-            old_x = [convert_datetime_object_to_mjd(datetime.strptime(x, "%Y-%m-%d%H:%M:%S")) for x in old_x]
-            old_data[:, 0] = old_x
-            data = old_data
-            x = list(old_x)
-            old = True
-
-        elif not os.path.isfile(old_monitoring_file) and os.path.isfile(new_monitoring_file):
-            source_velocities = get_configs('velocities', source + "_" + get_args("line")).split(",")
-            source_velocities = [si.strip() for si in source_velocities]
-            component_count = len(get_configs("velocities", source + "_" +
-                                              get_args("line")).replace(" ", "").split(","))
-            components = [i for i in range(1, component_count + 1)]
-            new_data = np.load(new_monitoring_file, allow_pickle=True)
-            data = new_data
-            new = True
+            data = get_monitoring_rows(load_merged_monitoring_data(old_monitoring_file, new_monitoring_file,
+                                                                   len(source_velocities), cache_file_path))
+            time_series.append((source, source_velocities, data))
+
+    variability_table = create_variability_table(time_series)
+    variability_table = variability_table[~np.isnan(variability_table["fluctuation_index"])]
+    fluctuation_indexes = list(variability_table["fluctuation_index"])
+    variability_indexes = list(variability_table["variability_index"])
+    mean_of_y = list(variability_table["mean"])
+    outliers = [[row["variability_index"], row["fluctuation_index"],
+                 get_configs("Full_source_name", row["source"]) + " " + row["velocity"]]
+                for row in variability_table if row["fluctuation_index"] > 1]
 
-        else:
-            components = []
-            source_velocities = []
-            data = None
-
-        if len(components) > 0:
-            if data is not None:
-                for component in components:
-                    index = components.index(component)
-                    if old:
-                        y = data[:, index + 1]
-                    elif both:
-                        y = data[index + 1, :]
-                    else:
-                        y = data[index + 1]
-                    y = np.array([np.float128(yi) for yi in y]).clip(min=0)
-                    N = len(y)
-                    variability_index = ((np.max(y) - np.std(y)) - (np.min(y) + np.std(y))) /\
-                                        ((np.max(y) - np.std(y)) + (np.min(y) + np.std(y)))
-                    fluctuation_index = np.sqrt(np.abs((N / reduce(lambda x_, y_: x_ + y_,
-                                                                   [(1.5 + 0.05 * i) ** 2 for i in y]))
-                                                       * ((reduce(lambda x_, y_: x_ + y_,
-                                                                  [i ** 2 * (1.5 + 0.05 * i) ** 2 for i in y]) -
-                                                           np.mean(y) * reduce(lambda x_, y_: x_ + y_,
-                                                                               [i * (1.5 + 0.05 * i) ** 2 for i in y]))
-                                                          / (N - 1)) - 1)) / np.mean(y)
-                    if not np.isnan(fluctuation_index):
-                        variability_indexes.append(np.float64(variability_index))
-                        fluctuation_indexes.append(np.float64(fluctuation_index))
-                        mean_of_y.append(np.float64(np.mean(y)))
-                        if fluctuation_index > 1:
-                            source_name = get_configs("Full_source_name", source)
-                            outliers.append([variability_index, fluctuation_index, source_name + " " +
-                                             source_velocities[index]])
-
-                    del y, variability_index, fluctuation_index
-                del data
-        del new_monitoring_file, old_monitoring_file
     color = []
     for vi in variability_indexes:
         if vi < 0.5:
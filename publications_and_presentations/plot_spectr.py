@@ -1,6 +1,7 @@
 import sys
 import os
 import argparse
+from functools import lru_cache
 import h5py
 import matplotlib.pyplot as plt
 
@@ -9,9 +10,10 @@ SCRIPT_DIR = os.path.dirname(os.path.realpath(os.path.join(os.getcwd(), os.path.
 sys.path.append(os.path.normpath(os.path.join( SCRIPT_DIR, PACKAGE_PARENT)))
 
 
-from parsers.configparser_ import ConfigParser
+from parsers.configparser_ import load_config
 
 
+@lru_cache(maxsize=None)
 def parse_arguments():
     """
 
@@ -46,7 +48,7 @@ def get_configs(section, key):
     :return: configuration file section key value
     """
     config_file_path = get_args("config")
-    config = ConfigParser(config_file_path)
+    config = load_config(config_file_path)
     return config.get_config(section, key)
 
 
@@ -5,11 +5,11 @@
 create a plot for publications where spectra and monitoring plot are viewed side by side
 """
 import datetime
-import json
 
 import sys
 import os
 import argparse
+from functools import lru_cache
 
 from matplotlib import rcParams
 from matplotlib.font_manager import FontProperties
@@ -22,10 +22,13 @@ PACKAGE_PARENT = '..'
 SCRIPT_DIR = os.path.dirname(os.path.realpath(os.path.join(os.getcwd(), os.path.expanduser(__file__))))
 sys.path.append(os.path.normpath(os.path.join(SCRIPT_DIR, PACKAGE_PARENT)))
 
-from parsers.configparser_ import ConfigParser
-from utils.help import convert_datetime_object_to_mjd, file_len, correct_numpy_read_data
+from parsers.configparser_ import load_config
+from utils.help import convert_datetime_object_to_mjd
+from utils.monitoring_file import load_merged_monitoring_data, get_monitoring_rows
+from utils.result_store import ResultStore
 
 
+@lru_cache(maxsize=None)
 def parse_arguments():
     """
 
@@ -59,7 +62,7 @@ def get_configs(section, key):
     :return: configuration file section key value
     """
     config_file_path = get_args("config")
-    config = ConfigParser(config_file_path)
+    config = load_config(config_file_path)
     return config.get_config(section, key)
 
 
@@ -69,7 +72,7 @@ def get_configs_items():
     :return: None
     """
     config_file_path = "../config/plot.cfg"
-    config = ConfigParser(config_file_path)
+    config = load_config(config_file_path)
     return config.get_items("main")
 
 
@@ -108,54 +111,10 @@ def main():
     new_monitoring_file = get_configs("paths", "monitoringFilePath") + get_args("source") + "_" + get_args("line") + ".npy"
     old_monitoring_file = get_configs("paths", "oldMonitoringFilePath") + get_args("source") + ".dat"
 
-    if os.path.isfile(old_monitoring_file) and os.path.isfile(new_monitoring_file):
-        new_data = np.load(new_monitoring_file, allow_pickle=True)
-        new_x = new_data[0][0]
-        old_data = np.loadtxt(old_monitoring_file, dtype=str).reshape(
-            (file_len(old_monitoring_file), component_count + 1))
-        old_x = correct_numpy_read_data(old_data[:, [0]])
-        old_x = [convert_datetime_object_to_mjd(datetime.datetime.strptime(x, "%Y-%m-%d%H:%M:%S")) for x in old_x]
-        old_data[:, [0]] = old_x[0]
-        x = old_x + list(new_x)
-        print("Number of observations", len(x))
-        old_data_tmp = []
-        for tmp in range(0, len(new_data)):
-            old_data_tmp.append([])
-        tmp2 = 0
-        for j in range(0, old_data.shape[1]):
-            for i in range(0, old_data.shape[0]):
-                old_data_tmp[tmp2].append(old_data[i][j])
-            old_data_tmp[tmp2] = np.array(old_data_tmp[tmp2]).reshape(old_data.shape[0],)
-            tmp2 += 1
-        old_data = np.array(old_data_tmp)
-        new_data[0] = new_data[0][0]
-        data = []
-
-        for tmp3 in range(0, old_data.shape[0]):
-            data_tmp = np.concatenate((old_data[tmp3], new_data[tmp3]), axis=0)
-            data.append(data_tmp)
-
-        data = np.array(data)
-        old = True
-
-    elif os.path.isfile(old_monitoring_file):
-        old_data = np.loadtxt(old_monitoring_file, dtype=str).reshape(
-            (file_len(old_monitoring_file), component_count + 1))
-        old_x = correct_numpy_read_data(old_data[:, [0]])
-        old_x = [convert_datetime_object_to_mjd(datetime.datetime.strptime(x, "%Y-%m-%d%H:%M:%S")) for x in old_x]
-        old_data[:, [0]] = old_x[0]
-        data = old_data
-        x = list(old_x)
-        print("Number of observations", len(x))
-        old = True
-
-    else:
-        new_data = np.load(new_monitoring_file, allow_pickle=True)
-        new_x = new_data[0][0]
-        data = new_data
-        x = list(new_x)
-        print("Number of observations", len(x))
-        old = False
+    data = get_monitoring_rows(load_merged_monitoring_data(old_monitoring_file, new_monitoring_file, component_count,
+                                                           get_configs("paths", "cacheFilePath")))
+    x = list(data[0])
+    print("Number of observations", len(x))
 
     components = [i for i in range(1, component_count + 1)]
     symbols = ["*", "o", "v", "^", "<", ">", "1", "2", "3", "4"]
@@ -192,8 +151,9 @@ def main():
 
     ax2.plot([], [], ' ', label="km sec$^{-1}$")
 
-    with open(get_configs("paths", "resultFilePath") + "/" + get_args("source") + "_" + get_args("line") + ".json", "r") as result_data:
-        result_data = json.load(result_data)
+    result_store = ResultStore(get_configs("paths", "resultFilePath"))
+    result_data = result_store.get_results(get_args("source"), get_args("line"))
+    result_store.close()
 
     rt32_observation_dates = old_dates
 
@@ -209,7 +169,7 @@ def main():
         index = components.index(component)
         if len(get_args("not_show")) != 0:
             if index + 1 != 3:
-                y = data[:, index + 1].astype('float64')
+                y = data[index + 1].astype('float64')
                 ax2.plot(x, y, symbols[index], color=colors[index],
                           linewidth=0.5,
                           markersize=5,
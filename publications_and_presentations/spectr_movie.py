@@ -8,12 +8,11 @@ creates spectre movie
 import sys
 import os
 import argparse
+from functools import lru_cache
 import subprocess
-import json
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QIcon
 from PyQt5.QtWidgets import QApplication, QWidget, QGridLayout, QDesktopWidget, QLabel, QToolButton, QPushButton
-import h5py
 from astropy.time import Time
 import numpy as np
 import matplotlib.pyplot as plt
@@ -23,9 +22,12 @@ SCRIPT_DIR = os.path.dirname(os.path.realpath(os.path.join(os.getcwd(), os.path.
 sys.path.append(os.path.normpath(os.path.join(SCRIPT_DIR, PACKAGE_PARENT)))
 
 from utils.ploting_qt5 import Plot
-from parsers.configparser_ import ConfigParser
+from parsers.configparser_ import load_config
+from utils.result_store import ResultStore
+from utils.spectrum_cache import get_spectrum
 
 
+@lru_cache(maxsize=None)
 def parse_arguments():
     """
 
@@ -58,7 +60,7 @@ def get_configs(section, key):
     :return: configuration file section key value
     """
     config_file_path = get_args("config")
-    config = ConfigParser(config_file_path)
+    config = load_config(config_file_path)
     return config.get_config(section, key)
 
 
@@ -98,9 +100,9 @@ class SpectreTime(QWidget):
         self.y_lim = None
         self.previous_line = None
         self.first_plot = False
-        result_file = get_configs("paths", "resultFilePath") + "/" + self.source_name + "_" + get_args("line") + ".json"
-        with open(result_file) as result_data:
-            self.results = json.load(result_data)
+        result_store = ResultStore(get_configs("paths", "resultFilePath"))
+        self.results = result_store.get_results(self.source_name, get_args("line"))
+        result_store.close()
 
         self.spectre_plot = Plot()
         self.spectre_plot.creatPlot(self.grid, "Velocity (km sec$^{-1}$)", "Flux density (Jy)",
@@ -114,7 +116,7 @@ class SpectreTime(QWidget):
         :return: None
         """
         file_name = self.output_path + self.sorted_file_names[self.index]
-        data = h5py.File(file_name, 'r')['amplitude_corrected'][()]
+        data = get_spectrum(file_name, "amplitude_corrected")
         xdata = data[:, 0]
         ydata = data[:, 3]
 
@@ -177,7 +179,7 @@ class SpectreTime(QWidget):
         i = 0
         for file_name in self.sorted_file_names:
             print(file_name)
-            data = h5py.File(self.output_path + file_name, 'r')['amplitude_corrected'][()]
+            data = get_spectrum(self.output_path + file_name, "amplitude_corrected")
             plt.cla()
             x = data[:, [0]]
             y = data[:, [3]]
@@ -0,0 +1,220 @@
+#! /usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""
+Watch data directory, process and analyze new SDR iterations as they land
+"""
+import os
+import sys
+import time
+import argparse
+from functools import lru_cache
+import logging
+import coloredlogs
+from parsers.configparser_ import load_config
+from sdr_fs import get_scan_name
+from main import process_iteration_job
+from total_spectrum_analyzer import analyze_output_files
+from utils.processing_state import ProcessingState, get_file_fingerprint, is_sdr_stage_needed, \
+    PROCESSING_STATE_FILE_NAME, SDR_STAGE, ANALYSIS_STAGE
+from utils.result_store import ResultStore
+
+coloredlogs.install(level='PRODUCTION')
+LOGGER = logging.getLogger('Daemon')
+SCAN_PHASES = {"r0", "r1", "s0", "s1"}
+
+
+@lru_cache(maxsize=None)
+def parse_arguments():
+    """
+
+    :return: dict with passed args to script
+    """
+    parser = argparse.ArgumentParser(description='''Watch data directory and process new SDR iterations
+    without GUI.''', epilog="""Daemon.""")
+    parser.add_argument("-c", "--config", help="Configuration cfg file",
+                        type=str, default="config/config.cfg")
+    parser.add_argument("-i", "--interval", help="Seconds between data directory checks", type=float, default=60)
+    parser.add_argument("-o", "--once", help="Check data directory once and exit", action="store_true")
+    parser.add_argument("-v", "--version", action="version", version='%(prog)s - Version 1.0')
+    args = parser.parse_args()
+    return args
+
+
+def get_args(key):
+    """
+
+    :param key: argument key
+    :return: to script passed argument value
+    """
+    return str(parse_arguments().__dict__[key])
+
+
+def parse_iteration_dir(dir_name):
+    """
+
+    :param dir_name: iteration data directory name <source>_f<line>_<station>_<iteration>
+    :return: source, line, station, iteration or None if directory is not iteration directory
+    """
+    parts = dir_name.rsplit("_", 3)
+    if len(parts) != 4 or not parts[1].startswith("f") or not parts[3].isdigit():
+        return None
+    source, line, station, iteration = parts
+    return source, line[1:], station, iteration
+
+
+def is_iteration_complete(data_files):
+    """
+
+    :param data_files: data files of iteration
+    :return: True if all scans of iteration have r0, r1, s0 and s1 data files
+    """
+    phases_for_scan = dict()
+    for data_file in data_files:
+        if not data_file.endswith(".dat"):
+            continue
+        scan_name = get_scan_name(data_file)
+        phases_for_scan.setdefault(scan_name[:-2], set()).add(scan_name[-2:])
+
+    return len(phases_for_scan) > 0 and all(phases == SCAN_PHASES for phases in phases_for_scan.values())
+
+
+class IterationWatcher:
+    """
+    Stat based change detection of iteration data directories
+    """
+
+    def __init__(self, config_file_path):
+        self.config_file_path = config_file_path
+        self.config = load_config(config_file_path)
+        self.data_files_path = self.config.get_path("dataFilePath")
+        self.log_path = self.config.get_path("logPath") + "SDR/"
+        self.result_path = self.config.get_path("resultFilePath")
+        self.output_path = self.config.get_path("outputFilePath")
+        self.data_files_path_fingerprint = None
+        self.iteration_dirs = []
+        self.seen_fingerprints = dict()
+        self.failed_fingerprints = dict()
+        self.state = ProcessingState(self.result_path + PROCESSING_STATE_FILE_NAME)
+        self.result_store = ResultStore(self.result_path)
+
+    def get_iteration_dirs(self):
+        """
+
+        :return: iteration data directories, data directory is listed only when it is changed
+        """
+        fingerprint = get_file_fingerprint(self.data_files_path)
+        if fingerprint != self.data_files_path_fingerprint:
+            self.data_files_path_fingerprint = fingerprint
+            self.iteration_dirs = sorted(dir_name for dir_name in os.listdir(self.data_files_path)
+                                         if parse_iteration_dir(dir_name) is not None and
+                                         os.path.isdir(self.data_files_path + dir_name))
+        return self.iteration_dirs
+
+    def get_stages(self, source, line):
+        """
+
+        :param source: source
+        :param line: frequency
+        :return: SDR and analysis stages of source and line
+        """
+        self.state.sync_results(source, line, self.result_store)
+        self.state.sync_outputs(source, line, os.path.normpath(self.output_path + "/" + line + "/" + source))
+        return self.state.get_stages(source, line, SDR_STAGE), self.state.get_stages(source, line, ANALYSIS_STAGE)
+
+    def find_ready_iterations(self, require_stable=True):
+        """
+        Iteration is ready when its data files are complete and, if require_stable is set,
+        data files did not change since previous check
+
+        :param require_stable: skip iterations changed since previous check
+        :return: list of source, line, station, iteration, log file and fingerprint of ready iterations
+        """
+        ready_iterations = []
+        stages = dict()
+        for dir_name in self.get_iteration_dirs():
+            source, line, station, iteration = parse_iteration_dir(dir_name)
+            log_file = dir_name + ".log"
+            iteration_dir = self.data_files_path + dir_name + "/"
+            fingerprint = get_file_fingerprint(iteration_dir, self.log_path + log_file)
+            if "missing" in fingerprint or self.failed_fingerprints.get(dir_name) == fingerprint:
+                continue
+
+            if (source, line) not in stages:
+                stages[(source, line)] = self.get_stages(source, line)
+            sdr_stages, analyzed_iterations = stages[(source, line)]
+            if not is_sdr_stage_needed(sdr_stages.get((station, iteration)),
+                                       analyzed_iterations.get((station, iteration)), fingerprint):
+                continue
+
+            data_files = sorted(os.listdir(iteration_dir))
+            if not is_iteration_complete(data_files):
+                continue
+
+            # growing data files do not change directory modification time
+            data_fingerprint = get_file_fingerprint(*[iteration_dir + data_file for data_file in data_files])
+            previous_data_fingerprint = self.seen_fingerprints.get(dir_name)
+            self.seen_fingerprints[dir_name] = data_fingerprint
+            if require_stable and data_fingerprint != previous_data_fingerprint:
+                continue
+
+            ready_iterations.append((source, line, station, iteration, log_file, fingerprint))
+        return ready_iterations
+
+    def process_ready_iterations(self, require_stable=True):
+        """
+
+        :param require_stable: skip iterations changed since previous check
+        :return: number of processed iterations
+        """
+        if self.config.reload_if_changed():
+            LOGGER.info("Configuration file " + self.config_file_path + " is reloaded")
+            # failed iterations can succeed with changed configuration
+            self.failed_fingerprints = dict()
+
+        processed = 0
+        output_file_names = dict()
+        for source, line, station, iteration, log_file, fingerprint in self.find_ready_iterations(require_stable):
+            job = (source, line, station, iteration, log_file, self.config_file_path, True)
+            _, _, output_file_name, error = process_iteration_job(job)
+            if error is not None:
+                LOGGER.error("Processing of iteration " + iteration + " failed: " + error)
+                # failed iteration is tried again only when its data is changed
+                self.failed_fingerprints[source + "_f" + line + "_" + station + "_" + iteration] = fingerprint
+            else:
+                LOGGER.info("Iteration " + iteration + " of " + source + " " + line + " is processed")
+                self.state.mark_done(source, line, station, iteration, SDR_STAGE,
+                                     fingerprint, os.path.normpath(output_file_name))
+                output_file_names.setdefault(line, []).append(output_file_name)
+                processed += 1
+
+        for line in output_file_names:
+            errors = analyze_output_files(output_file_names[line], line, self.config_file_path)
+            for output_file_name, error in errors.items():
+                if error is not None:
+                    LOGGER.error("Analysis of output file " + output_file_name + " failed: " + error)
+        return processed
+
+
+def main():
+    """
+
+    :return: None
+    """
+    watcher = IterationWatcher(get_args("config"))
+    interval = float(get_args("interval"))
+    once = get_args("once") == "True"
+    LOGGER.info("Watching " + watcher.data_files_path)
+    while True:
+        # single check can not wait for data to settle
+        watcher.process_ready_iterations(require_stable=not once)
+        if once:
+            break
+        time.sleep(interval)
+    watcher.state.close()
+    watcher.result_store.close()
+
+
+if __name__ == "__main__":
+    main()
+    sys.exit(0)
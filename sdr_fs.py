@@ -9,24 +9,21 @@ import os
 import re
 import argparse
 from datetime import datetime
-from functools import reduce
+from functools import reduce, lru_cache
 import warnings
 import scipy.constants
 import numpy as np
 from astropy.time import Time
 import h5py
-from PyQt5.QtWidgets import QWidget, QApplication, QDesktopWidget, QGridLayout, QPushButton
-from PyQt5.QtGui import QIcon
 from ExperimentsLogReader.experimentsLogReader import LogReaderFactory, LogTypes
-from parsers.configparser_ import ConfigParser
-from utils.vlsr import lsr
+from parsers.configparser_ import load_config
+from utils.vlsr import lsr_batch, load_earth_velocity_table, EARTH_VELOCITY_TABLE_FILE_NAME
 from utils.help import find_nearest_index
-from utils.ploting_qt5 import Plot
+from utils.sdr_scan_reader import read_scan
 warnings.filterwarnings("ignore")
 
-output = []
-
 
+@lru_cache(maxsize=None)
 def parse_arguments():
     """
 
@@ -40,6 +37,7 @@ def parse_arguments():
     parser.add_argument("log_file", help="Experiment log file name", type=str)
     parser.add_argument("-c", "--config", help="Configuration cfg file", type=str,
                         default="config/config.cfg")
+    parser.add_argument("-b", "--batch", help="Process iteration without GUI", action="store_true")
     parser.add_argument("-v", "--version", action="version", version='%(prog)s - Version 1.0')
     args = parser.parse_args()
     return args
@@ -54,18 +52,6 @@ def get_args(key):
     return str(parse_arguments().__dict__[key])
 
 
-def get_configs(section, key):
-    """
-
-    :param section: configuration file section
-    :param key: configuration file sections key
-    :return: configuration file section key value
-    """
-    config_file_path = get_args("config")
-    config = ConfigParser(config_file_path)
-    return config.get_config(section, key)
-
-
 def dopler(observed_frequency, velocity_receiver, base_frequency):
     """
 
@@ -147,22 +133,17 @@ def rms(noise):
     return rms
 
 
-def frequency_shifting(p_sig_left, p_sig_right, p_ref_left, p_ref_right, p_sig_on_left,
-                       p_sig_on_right, p_ref_on_left, p_ref_on_right, frequency_a, logs, pair):
+def frequency_shifting_batch(scans, frequency_a, logs, pairs):
     """
 
-    :param p_sig_left: p_sig_left
-    :param p_sig_right: p_sig_right
-    :param p_ref_left: p_ref_left
-    :param p_ref_right: p_ref_right
-    :param p_sig_on_left: p_sig_on_left
-    :param p_sig_on_right: p_sig_on_right
-    :param p_ref_on_left: p_ref_on_left
-    :param p_ref_on_right: p_ref_on_right
+    :param scans: array with shape (pairs, phases, polarizations, channels),
+    phases are s0, r0, s1, r1 and polarizations are left, right
     :param frequency_a: frequency_a
     :param logs: logs
-    :param pair: pair
-    :return: frequency_shifting
+    :param pairs: pairs
+    :return: calibrated flux with shape (pairs, polarizations, channels), frequencies,
+    system temperatures with shape (pairs, 4) in order tsys_r_left, tsys_r_right, tsys_s_left, tsys_s_right
+    and mask of pairs with bad system temperature
     """
     df_div = float(logs["header"]["df_div,df"][0])
     band_with = float(logs["header"]["Fs,Ns,RBW"][0])
@@ -175,66 +156,94 @@ def frequency_shifting(p_sig_left, p_sig_right, p_ref_left, p_ref_right, p_sig_o
     s_i = int(l_spec / 2 - l_spec * avg_interval / 2)
     e_i = int(l_spec / 2 + l_spec * avg_interval / 2)
 
-    tsys_off_1_left = float(logs["header"]["Tcal"][0]) * ((p_ref_on_left + p_ref_left) -
-                                                          np.mean(p_ref_on_left[s_i:e_i] -
-                                                                  p_ref_left[s_i:e_i])) / \
-                      (2 * np.mean(p_ref_on_left[s_i:e_i] - p_ref_left[s_i:e_i]))
-    tsys_off_2_left = float(logs["header"]["Tcal"][1]) * ((p_sig_on_left + p_sig_left)
-                                                          - np.mean(p_sig_on_left[s_i:e_i]
-                                                                    - p_sig_left[s_i:e_i])) / \
-                      (2 * np.mean(p_sig_on_left[s_i:e_i] - p_sig_left[s_i:e_i]))
+    scans = np.asarray(scans, dtype=np.float64)
+    p_sig = scans[:, 0]
+    p_ref = scans[:, 1]
+    p_sig_on = scans[:, 2]
+    p_ref_on = scans[:, 3]
 
-    tsys_off_1_right = float(logs["header"]["Tcal"][0]) * ((p_ref_on_right + p_ref_right) -
-                                                           np.mean(p_ref_on_right[s_i:e_i]
-                                                                   - p_ref_right[s_i:e_i])) / \
-                       (2 * np.mean(p_ref_on_right[s_i:e_i] - p_ref_right[s_i:e_i]))
+    t_cal = [float(logs["header"]["Tcal"][0]), float(logs["header"]["Tcal"][1])]
+    t_cal_polarization = np.array(t_cal).reshape(1, 2, 1)
 
-    tsys_off_2_right = float(logs["header"]["Tcal"][1]) * ((p_sig_on_right + p_sig_right) -
-                                                           np.mean(p_sig_on_right[s_i:e_i]
-                                                                   - p_sig_right[s_i:e_i])) / \
-                       (2 * np.mean(p_sig_on_right[s_i:e_i] - p_sig_right[s_i:e_i]))
+    cal_ref = np.mean(p_ref_on[:, :, s_i:e_i] - p_ref[:, :, s_i:e_i], axis=2, keepdims=True)
+    cal_sig = np.mean(p_sig_on[:, :, s_i:e_i] - p_sig[:, :, s_i:e_i], axis=2, keepdims=True)
+    tsys_off_1 = t_cal[0] * ((p_ref_on + p_ref) - cal_ref) / (2 * cal_ref)
+    tsys_off_2 = t_cal[1] * ((p_sig_on + p_sig) - cal_sig) / (2 * cal_sig)
 
-    ta_1_caloff_left = tsys_off_1_left * (p_sig_left - p_ref_left) / p_ref_left  # non-cal phase
-    ta_1_caloff_right = tsys_off_1_right * \
-                        (p_sig_right - p_ref_right) / p_ref_right  # non-cal phase
+    ta_1_caloff = tsys_off_1 * (p_sig - p_ref) / p_ref  # non-cal phase
+    ta_1_calon = (tsys_off_1 + t_cal_polarization) * (p_sig_on - p_ref_on) / p_ref_on  # cal phase
+    ta_sig = (ta_1_caloff + ta_1_calon) / 2
 
-    ta_1_calon_left = (tsys_off_1_left + float(logs["header"]["Tcal"][0])) * \
-                      (p_sig_on_left - p_ref_on_left) / p_ref_on_left  # cal phase
-    ta_1_calon_right = (tsys_off_1_right + float(logs["header"]["Tcal"][1])) * \
-                       (p_sig_on_right - p_ref_on_right) / p_ref_on_right  # cal phase
+    ta_2_caloff = tsys_off_2 * (p_ref - p_sig) / p_sig  # non-cal phase
+    ta_2_calon = (tsys_off_2 + t_cal_polarization) * (p_ref_on - p_sig_on) / p_sig_on  # cal phase
+    ta_ref = (ta_2_caloff + ta_2_calon) / 2
 
-    ta_sig_left = (ta_1_caloff_left + ta_1_calon_left) / 2
-    ta_sig_right = (ta_1_caloff_right + ta_1_calon_right) / 2
+    ta = (np.roll(ta_sig, +n_shift, axis=2) + np.roll(ta_ref, -n_shift, axis=2)) / 2
 
-    ta_2_caloff_left = tsys_off_2_left * (p_ref_left - p_sig_left) / p_sig_left  # non-cal phase
-    ta_2_caloff_right = tsys_off_2_right * \
-                        (p_ref_right - p_sig_right) / p_sig_right  # non-cal phase
+    tsys = np.concatenate((np.mean(tsys_off_1[:, :, s_i:e_i], axis=2),
+                           np.mean(tsys_off_2[:, :, s_i:e_i], axis=2)), axis=1)
+    bad_tsys = np.any((tsys < 0) | (tsys > 300), axis=1)
 
-    ta_2_calon_left = (tsys_off_2_left + float(logs["header"]["Tcal"][0])) * \
-                      (p_ref_on_left - p_sig_on_left) / p_sig_on_left  # cal phase
-    ta_2_calon_right = (tsys_off_2_right + float(logs["header"]["Tcal"][1])) * \
-                       (p_ref_on_right - p_sig_on_right) / p_sig_on_right  # cal phase
+    elvation = np.array([(float(logs[pair[0][0]]["AzEl"][1]) + float(logs[pair[0][1]]["AzEl"][1]) + float(
+        logs[pair[1][0]]["AzEl"][1]) + float(logs[pair[1][1]]["AzEl"][1])) / 4 for pair in pairs])
 
-    ta_ref_left = (ta_2_caloff_left + ta_2_calon_left) / 2
-    ta_ref_right = (ta_2_caloff_right + ta_2_calon_right) / 2
+    g_el = logs["header"]["Elev_poly"]
+    g_el = [float(gel) for gel in g_el]
+    g_e_ltmp = [0, 0, 0]
+    g_e_ltmp[0] = g_el[2]
+    g_e_ltmp[1] = g_el[1]
+    g_e_ltmp[2] = g_el[0]
+    g_el = g_e_ltmp
 
-    ta_sig_left = np.roll(ta_sig_left, +n_shift)
-    ta_sig_right = np.roll(ta_sig_right, +n_shift)
+    dpfu = np.array([float(logs["header"]["DPFU"][0]), float(logs["header"]["DPFU"][1])])
+    gain = dpfu.reshape(1, 2, 1) * np.polyval(g_el, elvation).reshape(-1, 1, 1)
 
-    ta_ref_left = np.roll(ta_ref_left, -n_shift)
-    ta_ref_right = np.roll(ta_ref_right, -n_shift)
+    sf = ta[:, :, s_i:e_i] / gain
+    return sf, frequency_a[s_i:e_i], tsys, bad_tsys
 
-    ta_left = (ta_sig_left + ta_ref_left) / 2
-    ta_right = (ta_sig_right + ta_ref_right) / 2
 
-    tsys_r_left = np.mean(tsys_off_1_left[s_i:e_i])
-    tsys_r_right = np.mean(tsys_off_1_right[s_i:e_i])
+def frequency_shifting(p_sig_left, p_sig_right, p_ref_left, p_ref_right, p_sig_on_left,
+                       p_sig_on_right, p_ref_on_left, p_ref_on_right, frequency_a, logs, pair):
+    """
 
-    tsys_s_left = np.mean(tsys_off_2_left[s_i:e_i])
-    tsys_s_right = np.mean(tsys_off_2_right[s_i:e_i])
+    :param p_sig_left: p_sig_left
+    :param p_sig_right: p_sig_right
+    :param p_ref_left: p_ref_left
+    :param p_ref_right: p_ref_right
+    :param p_sig_on_left: p_sig_on_left
+    :param p_sig_on_right: p_sig_on_right
+    :param p_ref_on_left: p_ref_on_left
+    :param p_ref_on_right: p_ref_on_right
+    :param frequency_a: frequency_a
+    :param logs: logs
+    :param pair: pair
+    :return: frequency_shifting
+    """
+    scans = np.array([[[p_sig_left, p_sig_right], [p_ref_left, p_ref_right],
+                       [p_sig_on_left, p_sig_on_right], [p_ref_on_left, p_ref_on_right]]])
+    sf, frequency_a1, tsys, bad_tsys = frequency_shifting_batch(scans, frequency_a, logs, [pair])
+    tsys_r_left, tsys_r_right, tsys_s_left, tsys_s_right = tsys[0]
+
+    delete_scan_files = bool(bad_tsys[0])
+    if np.any(tsys[0] < 0):
+        print("System temperature is negative")
+
+    if np.any(tsys[0] > 300):
+        print("System temperature is bigger than 300")
+
+    return sf[0, 0], sf[0, 1], frequency_a1, \
+           tsys_r_left, tsys_r_right, tsys_s_left, tsys_s_right, delete_scan_files
 
-    tsyss = [tsys_r_left, tsys_r_right, tsys_s_left, tsys_s_right]
 
+def get_scan_files_for_pair(logs, pair, line, data_file_path):
+    """
+
+    :param logs: logs
+    :param pair: pair
+    :param line: frequency
+    :param data_file_path: SDR data file path
+    :return: data files of scan pair
+    """
     def get_iter_name(index):
         if len(index) == 3:
             return "00" + index
@@ -243,54 +252,35 @@ def frequency_shifting(p_sig_left, p_sig_right, p_ref_left, p_ref_right, p_sig_o
         else:
             return index
 
-    tmp = logs["header"]["source"] + "_f" + get_args("line") + "_" + \
+    tmp = logs["header"]["source"] + "_f" + line + "_" + \
           logs["header"]["station,id"][1] + "_" + \
           logs["header"]["exp_name"].split("_")[-1] + "_" + "no"
 
-    tmp2 = logs["header"]["source"] + "_f" + get_args("line") + "_" + \
+    tmp2 = logs["header"]["source"] + "_f" + line + "_" + \
            logs["header"]["station,id"][1] + "_" + \
-           logs["header"]["exp_name"].split( "_" )[-1]
-
-    scan_files_to_delete = [get_configs("paths", "dataFilePath") + tmp2 + "/" + tmp + get_iter_name(indextmp) + ".dat"
-                            for indextmp in (np.array(pair).flatten())]
-
-    delete_scan_files = False
-    if any(tsys < 0 for tsys in tsyss):
-        delete_scan_files = True
-        print("System temperature is negative")
-
-    if any(tsys > 300 for tsys in tsyss):
-        delete_scan_files = True
-        print("System temperature is bigger than 300")
+           logs["header"]["exp_name"].split("_")[-1]
 
-    if delete_scan_files:
-        for scan_file in scan_files_to_delete:
-            choice = input("Should this data file " + scan_file + " be deleted Y/n ")
-            if choice == "Y" or choice == "y":
-                try:
-                    os.remove(scan_file)
-                    print("Data file " + scan_file + " are deleted")
-                except OSError as error:
-                    print("Error: %s : %s" % (scan_file, error.strerror))
+    return [data_file_path + tmp2 + "/" + tmp + get_iter_name(indextmp) + ".dat"
+            for indextmp in (np.array(pair).flatten())]
 
-    elvation = (float(logs[pair[0][0]]["AzEl"][1]) + float(logs[pair[0][1]]["AzEl"][1]) + float(
-        logs[pair[1][0]]["AzEl"][1]) + float(logs[pair[1][1]]["AzEl"][1])) / 4
 
-    g_el = logs["header"]["Elev_poly"]
-    g_el = [float(gel) for gel in g_el]
-    g_e_ltmp = [0, 0, 0]
-    g_e_ltmp[0] = g_el[2]
-    g_e_ltmp[1] = g_el[1]
-    g_e_ltmp[2] = g_el[0]
-    g_el = g_e_ltmp
-
-    sf_left = ta_left / ((float(logs["header"]["DPFU"][0])) * np.polyval(g_el, elvation))
-    sf_right = ta_right / ((float(logs["header"]["DPFU"][1])) * np.polyval(g_el, elvation))
-
-    output.append([sf_left[s_i:e_i], sf_right[s_i:e_i]])
+def ask_to_delete_data_files(data_files):
+    """
 
-    return sf_left[s_i:e_i], sf_right[s_i:e_i], frequency_a[s_i:e_i], \
-           tsys_r_left, tsys_r_right, tsys_s_left, tsys_s_right, delete_scan_files
+    :param data_files: data files
+    :return: deleted data files
+    """
+    deleted_data_files = []
+    for data_file in data_files:
+        choice = input("Should this data file " + data_file + " be deleted Y/n ")
+        if choice == "Y" or choice == "y":
+            try:
+                os.remove(data_file)
+                print("Data file " + data_file + " are deleted")
+                deleted_data_files.append(data_file)
+            except OSError as error:
+                print("Error: %s : %s" % (data_file, error.strerror))
+    return deleted_data_files
 
 
 def get_scan_name(data_file_name):
@@ -303,31 +293,32 @@ def get_scan_name(data_file_name):
                                                             [0].split("_")[4])].lstrip('0')
 
 
-def get_data(data_file_name):
+def get_data(data_file_name, cache_dir=None):
     """
 
     :param data_file_name: data file name
+    :param cache_dir: directory for binary cache files
     :return: frequency, polarization left, polarization right
     """
-    frequency = np.loadtxt(data_file_name, usecols=(0,), unpack=True)
-    polarization_left = np.loadtxt(data_file_name, usecols=(1,), unpack=True)
-    polarization_right = np.loadtxt(data_file_name, usecols=(2,), unpack=True)
-    return frequency, polarization_left, polarization_right
+    data = read_scan(data_file_name, cache_dir)
+    return data[:, 0], data[:, 1], data[:, 2]
 
 
-class Analyzer(QWidget):
+class SdrIteration:
     """
-    GUI application
+    Frequency switching calibration of one SDR iteration
     """
 
-    def __init__(self):
-        super().__init__()
-        self.setWindowIcon(QIcon('viraclogo.png'))
-        self.setWindowTitle("SDR")
-        self.center()
-        self.index = 0
-        self.cuts = get_configs('cuts', get_args("source") + "_" + get_args("line")).split(";")
-        self.cuts = [c.split(",") for c in self.cuts]
+    def __init__(self, source, line, iteration_number, log_file,
+                 config_file_path="config/config.cfg", interactive=True):
+        self.source = source
+        self.line = line
+        self.iteration_number = iteration_number
+        self.log_file = log_file
+        self.config_file_path = config_file_path
+        self.interactive = interactive
+        self.config = load_config(config_file_path)
+        self.cuts = self.config.get_cuts(self.source, self.line)
         self.sf_left = list()
         self.sf_right = list()
         self.tsys_r_left_list = list()
@@ -337,16 +328,19 @@ class Analyzer(QWidget):
         self.ston_list_left = list()
         self.ston_list_right = list()
         self.ston_list_avg = list()
+        self.x = None
+        self.specie = None
+        self.scan_1 = None
         self.logs = LogReaderFactory.getLogReader(LogTypes.SDR,
-                                                  get_configs("paths", "logPath") + "SDR/" +
-                                                  get_args("log_file"),
-                                                  get_configs("paths", "prettyLogsPath") +
-                                                  get_args("source") + "_" +
-                                                  get_args("iteration_number")).getLogs()
+                                                  self.get_configs("paths", "logPath") + "SDR/" +
+                                                  self.log_file,
+                                                  self.get_configs("paths", "prettyLogsPath") +
+                                                  self.source + "_" +
+                                                  self.iteration_number).getLogs()
         self.station = self.logs["header"]["station,id"]
-        self.data_dir = get_configs("paths", "dataFilePath") + \
-                        get_args("source") + "_f" + get_args("line") + "_" + \
-                        self.station[1] + "_" + get_args("iteration_number") + "/"
+        self.data_dir = self.get_configs("paths", "dataFilePath") + \
+                        self.source + "_f" + self.line + "_" + \
+                        self.station[1] + "_" + self.iteration_number + "/"
         self.data_files = os.listdir(self.data_dir)
         data_files_scans_for_raw_data = []
 
@@ -359,71 +353,42 @@ class Analyzer(QWidget):
             if data_files_scans_for_raw_data.count(scan) != 4:
                 print("Scan " + scan + " do not have all data file")
                 bad_files = self.find_data_files_for_bad_scan(scan)
-                for bad_file in bad_files:
-                    choice = input("Should this data file " + self.data_dir + bad_file + " be deleted Y/n ")
-                    if choice == "Y" or choice == "y":
-                        try:
-                            os.remove(self.data_dir + bad_file)
-                            print("Data file " + self.data_dir + bad_file + " are deleted")
+                if self.interactive:
+                    deleted_files = ask_to_delete_data_files([self.data_dir + bad_file for bad_file in bad_files])
+                    for bad_file in bad_files:
+                        if self.data_dir + bad_file in deleted_files:
                             self.data_files.remove(bad_file)
-                        except OSError as error:
-                            print("Error: %s : %s" % (self.data_dir + bad_file, error.strerror))
+                else:
+                    for bad_file in bad_files:
+                        self.data_files.remove(bad_file)
 
         self.scan_pairs = self.create_scan_pairs()
 
-        self.grid = QGridLayout()
-        self.setLayout(self.grid)
-        self.grid.setSpacing(10)
-
-        self.plot_velocity__left = None
-        self.plot_velocity__right = None
-        self.plot_tsys = None
-        self.plot_ston = None
-        self.plot_start__left_a = None
-        self.plot_start__right_b = None
-        self.x = None
-        self.total__left = None
-        self.total__right = None
-
-        self.__UI__()
-
-    def find_data_files_for_bad_scan(self, bad_scan):
-        bad_files = []
-        for file in self.data_files:
-            if bad_scan == re.findall("[0-9]+", file.split(".")[0].split("_")[-1])[0].lstrip("0"):
-               bad_files.append(file)
-        return bad_files
-
-    def center(self):
+    def get_configs(self, section, key):
         """
 
-        :return: None
+        :param section: configuration file section
+        :param key: configuration file sections key
+        :return: configuration file section key value
         """
-        frame_geometry = self.frameGeometry()
-        centre_position = QDesktopWidget().availableGeometry().center()
-        frame_geometry.moveCenter(centre_position)
-        self.move(frame_geometry.topLeft())
+        return self.config.get_config(section, key)
 
-    def __UI__(self):
+    def find_data_files_for_bad_scan(self, bad_scan):
         """
 
-        :return: None
+        :param bad_scan: scan without all data files
+        :return: data files for scan
         """
-        if self.index != len(self.scan_pairs) - 1:  # cheking if there is not one pair
-            self.next_pair_button = QPushButton("Next pair", self)
-            self.next_pair_button.clicked.connect(self.next_pair)
-            self.grid.addWidget(self.next_pair_button, 4, 2)
-
-        self.skip_all_button = QPushButton("Skip to end", self)
-        self.skip_all_button.clicked.connect(self.skip_all)
-        self.grid.addWidget(self.skip_all_button, 5, 2)
-
-        self.plot_pair(self.index)
+        bad_files = []
+        for file in self.data_files:
+            if bad_scan == re.findall("[0-9]+", file.split(".")[0].split("_")[-1])[0].lstrip("0"):
+                bad_files.append(file)
+        return bad_files
 
     def create_scan_pairs(self):
         """
 
-        :return: None
+        :return: scan pairs
         """
         scan_names = [get_scan_name(file) for file in self.data_files]
         scans_numbers = list(set([int(re.findall("[0-9]+", s)[0]) for s in scan_names]))
@@ -436,194 +401,215 @@ class Analyzer(QWidget):
                  (str(scan) + "r" + "1", str(scan) + "s" + "1")))
         return scan_pairs
 
-    def next_pair(self):
+    def get_data_file_for_scan(self, scan_name):
         """
-        :return: None
+
+        :param scan_name: scan name
+        :return: file name for scan
         """
-        if self.index == len(self.scan_pairs) - 1:
-            pass
+        file_name = ""
 
-        else:
-            if self.plot_start__left_a or self.plot_start__right_b:
-                if self.plot_start__left_a:
-                    self.plot_start__left_a.removePolt()
-                if self.plot_start__right_b:
-                    self.plot_start__right_b.removePolt()
-                self.index = self.index + 1
-            self.plot_pair(self.index)
-
-    def skip_all(self):
+        for file in self.data_files:
+            if get_scan_name(file) == scan_name:
+                file_name = file
+                break
+
+        return file_name
+
+    def read_pair(self, pair):
         """
 
-        :return: None
+        :param pair: scan pair
+        :return: frequencies and fft shifted powers of s0, r0, s1, r1 scans
         """
-        self.index += 1
-        while self.index < len(self.scan_pairs):
-            pair = self.scan_pairs[self.index]
-
-            file1 = self.data_dir + self.get_data_file_for_scan(pair[0][1])  # s0
-            file2 = self.data_dir + self.get_data_file_for_scan(pair[0][0])  # r0
-            file3 = self.data_dir + self.get_data_file_for_scan(pair[1][1])  # s1
-            file4 = self.data_dir + self.get_data_file_for_scan(pair[1][0])  # r1
-
-            frequency_a = get_data(file1)[0]  # s0
-            p_sig_left = get_data(file1)[1]  # s0
-            p_sig_right = get_data(file1)[2]  # s0
-
-            p_ref_left = get_data(file2)[1]  # r0
-            p_ref_right = get_data(file2)[2]  # r0
-
-            p_sig_on_left = get_data(file3)[1]  # s1
-            p_sig_on_right = get_data(file3)[2]  # s1
-
-            p_ref_on_left = get_data(file4)[1]  # r1
-            p_ref_on_right = get_data(file4)[2]  # r1
-
-            # fft shift
-            p_sig_left = np.fft.fftshift(p_sig_left)  # r0
-            p_sig_right = np.fft.fftshift(p_sig_right)  # r0
-            p_ref_left = np.fft.fftshift(p_ref_left)  # s0
-            p_ref_right = np.fft.fftshift(p_ref_right)  # s0
-            p_sig_on_left = np.fft.fftshift(p_sig_on_left)  # r1
-            p_sig_on_right = np.fft.fftshift(p_sig_on_right)  # r1
-            p_ref_on_left = np.fft.fftshift(p_ref_on_left)  # s1
-            p_ref_on_right = np.fft.fftshift(p_ref_on_right)  # s1
-
-            sf_left, sf_right, frequency_a1, tsys_r_left, \
-            tsys_r_right, tsys_s_left, tsys_s_right, delete_scan_files = frequency_shifting(
-                p_sig_left, p_sig_right, p_ref_left, p_ref_right,
-                p_sig_on_left, p_sig_on_right, p_ref_on_left,
-                p_ref_on_right, frequency_a, self.logs, pair)
-
-            if not delete_scan_files:
-                self.sf_left.append(sf_left)
-                self.sf_right.append(sf_right)
-                self.x = frequency_a1
-
-                self.tsys_r_left_list.append(tsys_r_left)
-                self.tsys_r_right_list.append(tsys_r_right)
-                self.tsys_s_left_list.append(tsys_s_left)
-                self.tsys_s_right_list.append(tsys_s_right)
-
-                self.index += 1
+        file1 = self.data_dir + self.get_data_file_for_scan(pair[0][1])  # s0
+        file2 = self.data_dir + self.get_data_file_for_scan(pair[0][0])  # r0
+        file3 = self.data_dir + self.get_data_file_for_scan(pair[1][1])  # s1
+        file4 = self.data_dir + self.get_data_file_for_scan(pair[1][0])  # r1
+        cache_dir = self.get_configs("paths", "cacheFilePath") + "SDR/"
 
-            else:
-                self.scan_pairs.remove(pair)
+        frequency_a, p_sig_left, p_sig_right = get_data(file1, cache_dir)  # s0
+        frequency_b, p_ref_left, p_ref_right = get_data(file2, cache_dir)  # r0
+        frequency_c, p_sig_on_left, p_sig_on_right = get_data(file3, cache_dir)  # s1
+        frequency_d, p_ref_on_left, p_ref_on_right = get_data(file4, cache_dir)  # r1
 
-            if self.index == len(self.scan_pairs) - 1:
-                self.next_pair_button.setText('Move to total results')
-                self.next_pair_button.clicked.connect(self.plot_total_results)
+        # fft shift
+        p_sig_left = np.fft.fftshift(p_sig_left)  # s0
+        p_sig_right = np.fft.fftshift(p_sig_right)  # s0
+        p_ref_left = np.fft.fftshift(p_ref_left)  # r0
+        p_ref_right = np.fft.fftshift(p_ref_right)  # r0
+        p_sig_on_left = np.fft.fftshift(p_sig_on_left)  # s1
+        p_sig_on_right = np.fft.fftshift(p_sig_on_right)  # s1
+        p_ref_on_left = np.fft.fftshift(p_ref_on_left)  # r1
+        p_ref_on_right = np.fft.fftshift(p_ref_on_right)  # r1
 
-        self.plot_total_results()
+        return (frequency_a, p_sig_left, p_sig_right), (frequency_b, p_ref_left, p_ref_right), \
+               (frequency_c, p_sig_on_left, p_sig_on_right), (frequency_d, p_ref_on_left, p_ref_on_right)
 
-    def plot_total_results(self):
+    def compute_pair(self, pair):
         """
+        Iteration is not changed, so pairs can be computed in advance on other thread
 
-        :return: None
+        :param pair: scan pair
+        :return: read scans and result of frequency shifting
         """
+        scans = self.read_pair(pair)
+        (frequency_a, p_sig_left, p_sig_right), (_, p_ref_left, p_ref_right), \
+        (_, p_sig_on_left, p_sig_on_right), (_, p_ref_on_left, p_ref_on_right) = scans
 
-        if self.plot_start__left_a or self.plot_start__right_b:
-            self.grid.removeWidget(self.plot_start__left_a)
-            self.grid.removeWidget(self.plot_start__right_b)
+        return scans, frequency_shifting(p_sig_left, p_sig_right, p_ref_left, p_ref_right, p_sig_on_left,
+                                         p_sig_on_right, p_ref_on_left,
+                                         p_ref_on_right, frequency_a, self.logs, pair)
 
-            self.plot_start__left_a.hide()
-            self.plot_start__right_b.hide()
+    def calibrate_pair(self, pair, computed_pair=None):
+        """
 
-            self.plot_start__left_a.close()
-            self.plot_start__right_b.close()
+        :param pair: scan pair
+        :param computed_pair: result of compute_pair for pair or None to compute it now
+        :return: read scans and calibrated left and right polarization or None if pair is removed
+        """
+        if computed_pair is None:
+            computed_pair = self.compute_pair(pair)
+        scans, (sf_left, sf_right, frequency_a1, tsys_r_left, tsys_r_right, tsys_s_left, tsys_s_right,
+                delete_scan_files) = computed_pair
+
+        if delete_scan_files:
+            if self.interactive:
+                data_file_path = self.get_configs("paths", "dataFilePath")
+                ask_to_delete_data_files(get_scan_files_for_pair(self.logs, pair, self.line, data_file_path))
+            else:
+                print("Scan pair " + str(pair) + " is skipped")
+            self.scan_pairs.remove(pair)
+            return None
 
-            self.plot_start__left_a.removePolt()
-            self.plot_start__right_b.removePolt()
+        self.sf_left.append(sf_left)
+        self.sf_right.append(sf_right)
+        self.x = frequency_a1
 
-            del self.plot_start__left_a
-            del self.plot_start__right_b
+        self.tsys_r_left_list.append(tsys_r_left)
+        self.tsys_r_right_list.append(tsys_r_right)
+        self.tsys_s_left_list.append(tsys_s_left)
+        self.tsys_s_right_list.append(tsys_s_right)
+        return scans, sf_left, sf_right
 
-        if self.total__left or self.total__right:
-            self.grid.removeWidget(self.total__left)
-            self.grid.removeWidget(self.total__right)
-            self.total__left.hide()
-            self.total__right.hide()
-            self.total__left.close()
-            self.total__right.close()
-            self.total__left.removePolt()
-            self.total__right.removePolt()
-            del self.total__left
-            del self.total__right
+    def calibrate_pairs(self, pairs):
+        """
 
-        self.grid.removeWidget(self.next_pair_button)
-        self.next_pair_button.hide()
-        self.next_pair_button.close()
-        del self.next_pair_button
+        :param pairs: scan pairs
+        :return: None
+        """
+        pairs = list(pairs)
+        if len(pairs) == 0:
+            return
+
+        scans = None
+        frequency_a = None
+        for index, pair in enumerate(pairs):
+            (frequency, p_sig_left, p_sig_right), (_, p_ref_left, p_ref_right), \
+            (_, p_sig_on_left, p_sig_on_right), (_, p_ref_on_left, p_ref_on_right) = self.read_pair(pair)
+            if scans is None:
+                frequency_a = frequency
+                scans = np.empty((len(pairs), 4, 2, len(frequency)))
+            scans[index, 0, 0], scans[index, 0, 1] = p_sig_left, p_sig_right  # s0
+            scans[index, 1, 0], scans[index, 1, 1] = p_ref_left, p_ref_right  # r0
+            scans[index, 2, 0], scans[index, 2, 1] = p_sig_on_left, p_sig_on_right  # s1
+            scans[index, 3, 0], scans[index, 3, 1] = p_ref_on_left, p_ref_on_right  # r1
+
+        sf, frequency_a1, tsys, bad_tsys = frequency_shifting_batch(scans, frequency_a, self.logs, pairs)
+
+        for index, pair in enumerate(pairs):
+            if bad_tsys[index]:
+                print("System temperature is negative or bigger than 300 for scan pair " + str(pair))
+                if self.interactive:
+                    data_file_path = self.get_configs("paths", "dataFilePath")
+                    ask_to_delete_data_files(get_scan_files_for_pair(self.logs, pair, self.line, data_file_path))
+                else:
+                    print("Scan pair " + str(pair) + " is skipped")
+                self.scan_pairs.remove(pair)
+            else:
+                self.sf_left.append(sf[index, 0])
+                self.sf_right.append(sf[index, 1])
+                self.tsys_r_left_list.append(tsys[index, 0])
+                self.tsys_r_right_list.append(tsys[index, 1])
+                self.tsys_s_left_list.append(tsys[index, 2])
+                self.tsys_s_right_list.append(tsys[index, 3])
+
+        if not np.all(bad_tsys):
+            self.x = frequency_a1
 
-        for i in reversed(range(self.grid.count())):
-            self.grid.itemAt(i).widget().deleteLater()
+    def get_station_name(self):
+        """
 
+        :return: station name used in configuration and output file
+        """
         station = self.logs["header"]["station,id"][0]
         if station == "RT-32":
-            station = "IRBENE"
-        else:
-            station = "IRBENE16"
+            return "IRBENE"
+        return "IRBENE16"
 
-        station_coordinates = get_configs("stations", station)
-        station_coordinates = station_coordinates.replace(" ", "").split(",")
-        x = np.float64(station_coordinates[0])
-        y = np.float64(station_coordinates[1])
-        z = np.float64(station_coordinates[2])
+    def compute_velocities(self):
+        """
 
-        velocity_max = []
-        velocity_min = []
-        velocity_list = []
+        :return: velocities for each scan pair
+        """
+        x, y, z = (np.float64(coordinate) for coordinate in
+                   self.config.get_station_coordinates(self.get_station_name()))
+
+        source_cordinations = self.config.get_source_coordinates(self.source)
+        RA = source_cordinations[0]
+        DEC = source_cordinations[1]
+
+        ra = list()
+        dec = list()
+        ra.append(RA[0:2])
+        ra.append(RA[2:4])
+        ra.append(RA[4:len(RA)])
+
+        if DEC[0] == "-":
+            dec.append(DEC[0:3])
+            dec.append(DEC[3:5])
+            dec.append(DEC[5:len(DEC)])
+        else:
+            dec.append(DEC[0:2])
+            dec.append(DEC[2:4])
+            dec.append(DEC[4:len(DEC)])
 
+        ra_str = ra[0] + "h" + ra[1] + "m" + ra[2] + "s"
+        if int(dec[0]) > 0:
+            dec_str = "+" + dec[0] + "d" + dec[1] + "m" + dec[2] + "s"
+        else:
+            dec_str = dec[0] + "d" + dec[1] + "m" + dec[2] + "s"
+
+        dates = []
         for p in range(0, len(self.scan_pairs)):
             scan_number = self.scan_pairs[p][0][0]
-            scan_1 = self.logs[str(scan_number)]
-            string_time = scan_1["date"].replace("T", " ")
-            t = datetime.strptime(scan_1["date"], '%Y-%m-%dT%H:%M:%S')
-            time = t.isoformat()
-            date = Time(time, format='isot', scale='utc')
-
-            source_cordinations = get_configs("sources", get_args("source")).split(",")
-            source_cordinations = [sc.strip() for sc in source_cordinations]
-            RA = source_cordinations[0]
-            DEC = source_cordinations[1]
-
-            ra = list()
-            dec = list()
-            ra.append(RA[0:2])
-            ra.append(RA[2:4])
-            ra.append(RA[4:len(RA)])
-
-            if DEC[0] == "-":
-                dec.append(DEC[0:3])
-                dec.append(DEC[3:5])
-                dec.append(DEC[5:len(DEC)])
-            else:
-                dec.append(DEC[0:2])
-                dec.append(DEC[2:4])
-                dec.append(DEC[4:len(DEC)])
+            self.scan_1 = self.logs[str(scan_number)]
+            t = datetime.strptime(self.scan_1["date"], '%Y-%m-%dT%H:%M:%S')
+            dates.append(t.isoformat())
 
-            ra_str = ra[0] + "h" + ra[1] + "m" + ra[2] + "s"
-            if int(dec[0]) > 0:
-                dec_str = "+" + dec[0] + "d" + dec[1] + "m" + dec[2] + "s"
-            else:
-                dec_str = dec[0] + "d" + dec[1] + "m" + dec[2] + "s"
+        print("Vel Total params", ra_str, dec_str, dates[0], dates[0].replace("T", " "), x, y, z)
+        load_earth_velocity_table(self.get_configs("paths", "cacheFilePath") + EARTH_VELOCITY_TABLE_FILE_NAME)
+        vel_totals = lsr_batch(ra_str, dec_str, dates, x, y, z)
 
-            if p == 0:
-                print("Vel Total params", ra_str, dec_str, date, string_time, x, y, z)
-            vel_total = lsr(ra_str, dec_str, date, string_time, x, y, z)
+        base_frequency, self.specie = self.config.get_base_frequency("f" + self.line)
+        line_f = base_frequency * (10 ** 9)
 
-            line = get_configs('base_frequencies_SDR', "f" +
-                               get_args("line")).replace(" ", "").split(",")
-            line_f = float(line[0]) * (10 ** 9)
-            line_s = line[1]
-            specie = line_s
+        local_oscillator = float(self.logs["header"]["f_obs,LO,IF"][1])
+        velocity_list = [dopler((self.x + local_oscillator) * (10 ** 6), vel_total, line_f)
+                         for vel_total in vel_totals]
 
-            local_oscillator = float(self.logs["header"]["f_obs,LO,IF"][1])
-            velocities = dopler((self.x + local_oscillator) * (10 ** 6), vel_total, line_f)
-            velocity_list.append(velocities)
+        return velocity_list
 
-            velocity_max.append(np.max(velocities))
-            velocity_min.append(np.min(velocities))
+    def compute_total_results(self):
+        """
+
+        :return: averaged velocities, left and right polarization amplitudes,
+        scan numbers for system temperature and scan numbers for signal to noise
+        """
+        velocity_list = self.compute_velocities()
+        velocities = velocity_list[-1]
+        velocity_max = [np.max(v) for v in velocity_list]
+        velocity_min = [np.min(v) for v in velocity_list]
 
         velocities_avg = []
         y__left_avg = []
@@ -690,8 +676,6 @@ class Analyzer(QWidget):
             stone_avg = signal_to_noise_ratio(velocities, ((np.array(y__left_avg[s]) +
                                                             np.array(y__right_avg[s])) / 2), self.cuts)
 
-            #tmp_output_file_name = get_args("source") + "_" + get_args("iteration_number") + "_" + str(s) + ".txt"
-            #np.savetxt(tmp_output_file_name, np.array([y__left_avg[s], y__right_avg[s]]).reshape(len(y__left_avg[s]), 2))
             self.ston_list_left.append(ston_left)
             self.ston_list_right.append(ston_right)
             self.ston_list_avg.append(stone_avg)
@@ -700,26 +684,10 @@ class Analyzer(QWidget):
         velocities_avg = reduce(lambda x, y: x + y, velocities_avg)
         y__left_avg = reduce(lambda x, y: x + y, y__left_avg)
         y__right_avg = reduce(lambda x, y: x + y, y__right_avg)
-        velocities_avg = velocities_avg /number_of_scans
+        velocities_avg = velocities_avg / number_of_scans
         y__left_avg = y__left_avg / number_of_scans
         y__right_avg = y__right_avg / number_of_scans
 
-        self.plot_velocity__left = Plot()
-        self.plot_velocity__left.creatPlot(self.grid, 'Velocity (km sec$^{-1}$)',
-                                           'Flux density (Jy)',
-                                           "Left Polarization", (1, 0), "linear")
-        self.plot_velocity__left.plot(velocities_avg, y__left_avg, 'b')
-
-        self.plot_velocity__right = Plot()
-        self.plot_velocity__right.creatPlot(self.grid, 'Velocity (km sec$^{-1}$)',
-                                            'Flux density (Jy)',
-                                            "Right Polarization", (1, 1), "linear")
-        self.plot_velocity__right.plot(velocities_avg, y__right_avg, 'b')
-
-        self.plot_tsys = Plot()
-        self.plot_tsys.creatPlot(self.grid, 'Time', 'System temperature',
-                                 "System temperature in time", (3, 0), "linear")
-
         data_files = os.listdir(self.data_dir)
         time = list(set([int(t.split("_")[-1].split(".")[0]
                              [2:len(t.split("_")[-1].split(".")[0]) - 2])
@@ -735,43 +703,70 @@ class Analyzer(QWidget):
             while len(time) > len(self.tsys_r_left_list):
                 time.pop()
 
-        self.plot_tsys.plot(time, self.tsys_r_left_list, '*b', label="Tsys_r_left")
-        self.plot_tsys.plot(time, self.tsys_r_right_list, '*r', label="Tsys_r_right")
-        self.plot_tsys.plot(time, self.tsys_s_left_list, '*g', label="Tsys_s_left")
-        self.plot_tsys.plot(time, self.tsys_s_right_list, '*y', label="Tsys_s_right")
+        self.ston_list_left = [value for value in self.ston_list_left if str(value) != 'nan']
+        self.ston_list_right = [value for value in self.ston_list_right if str(value) != 'nan']
+        self.ston_list_avg = [value for value in self.ston_list_avg if str(value) != 'nan']
+
+        ston_time = list(time)
+        while len(ston_time) != len(self.ston_list_left):
+            ston_time.pop()
+
+        print("Average signal to noise for left polarization", np.mean(self.ston_list_left))
+        print("Average signal to noise for right polarization", np.mean(self.ston_list_right))
+        print("Average signal to noise for average polarization", np.mean(self.ston_list_avg))
+
+        non_signal_amplitude_left, _ = split_data_to_signal_and_noise(velocities_avg, y__left_avg, self.cuts)
+        non_signal_amplitude_right, _ = split_data_to_signal_and_noise(velocities_avg, y__right_avg, self.cuts)
+
+        print("Average rms for left polarization", rms((np.array(non_signal_amplitude_left) +
+                                                        np.array(non_signal_amplitude_right))/2))
+        print("Average rms for right polarization", rms(non_signal_amplitude_left))
+        print("Average rms for average polarization", rms(non_signal_amplitude_right))
+
+        return velocities_avg, y__left_avg, y__right_avg, time, ston_time
+
+    def get_output_file_name(self):
+        """
 
-        day = scan_1["date"].split("-")[2][0:2]
-        month = scan_1["date"].split("-")[1]
+        :return: output file name
+        """
+        day = self.scan_1["date"].split("-")[2][0:2]
+        month = self.scan_1["date"].split("-")[1]
         months = {"Jan": "1", "Feb": "2", "Mar": "3", "Apr": "4", "May": "5",
                   "Jun": "6", "Jul": "7", "Aug": "8", "Sep": "9", "Oct": "10",
                   "Nov": "11", "Dec": "12"}
 
         month = list(months.keys())[int(month) - 1]
-        year = scan_1["date"].split("-")[0]
-        hour = scan_1["date"].split("T")[1].split(":")[0]
-        minute = scan_1["date"].split("T")[1].split(":")[1]
-        second = scan_1["date"].split("T")[1].split(":")[2]
-
-        if not os.path.exists(get_configs("paths", "outputFilePath") + "/" + get_args("line")):
-            os.makedirs(get_configs("paths", "outputFilePath") + "/" + get_args("line"))
+        year = self.scan_1["date"].split("-")[0]
+        hour = self.scan_1["date"].split("T")[1].split(":")[0]
+        minute = self.scan_1["date"].split("T")[1].split(":")[1]
+        second = self.scan_1["date"].split("T")[1].split(":")[2]
 
         mjd = Time(datetime.strptime(day + "_" + month + "_" + year + "_" +
                                      hour + ":" + minute + ":" + second,
                                      "%d_%b_%Y_%H:%M:%S").isoformat(), format='isot').mjd
 
-        result_file_name = get_configs("paths", "outputFilePath") + "/" + \
-                           get_args("line") + "/" + get_args("source") + "/" +\
-                           get_args("source") + "_" + str(mjd) + "_" + \
-                           station + "_" + \
-                           get_args("iteration_number") + ".h5"
+        return self.get_configs("paths", "outputFilePath") + "/" + \
+               self.line + "/" + self.source + "/" + \
+               self.source + "_" + str(mjd) + "_" + \
+               self.get_station_name() + "_" + \
+               self.iteration_number + ".h5"
+
+    def write_output(self, velocities_avg, y__left_avg, y__right_avg, time):
+        """
 
-        if not os.path.exists(get_configs("paths", "outputFilePath") + "/" + get_args("line") + "/"):
-            os.makedirs(get_configs("paths", "outputFilePath") + "/" + get_args("line") + "/")
+        :param velocities_avg: averaged velocities
+        :param y__left_avg: averaged left polarization amplitudes
+        :param y__right_avg: averaged right polarization amplitudes
+        :param time: scan numbers for system temperature
+        :return: output file name
+        """
+        result_file_name = self.get_output_file_name()
 
-        if not os.path.exists(get_configs("paths", "outputFilePath") + "/" +
-                              get_args("line") + "/" + get_args("source") + "/"):
-            os.makedirs(get_configs("paths", "outputFilePath") + "/" +
-                        get_args("line") + "/" + get_args("source") + "/")
+        if not os.path.exists(self.get_configs("paths", "outputFilePath") + "/" +
+                              self.line + "/" + self.source + "/"):
+            os.makedirs(self.get_configs("paths", "outputFilePath") + "/" +
+                        self.line + "/" + self.source + "/", exist_ok=True)
 
         result_file = h5py.File(result_file_name, "w")
         print("output_file_name", result_file_name)
@@ -781,144 +776,46 @@ class Analyzer(QWidget):
 
         result_file.create_dataset("system_temperature", data=sys_temp_out)
 
-        self.ston_list_left = [value for value in self.ston_list_left if str(value) != 'nan']
-        self.ston_list_right = [value for value in self.ston_list_right if str(value) != 'nan']
-        self.ston_list_avg = [value for value in self.ston_list_avg if str(value) != 'nan']
-
-        time = list(time)
-        while len(time) != len(self.ston_list_left):
-            time.pop()
-
-        self.plot_ston = Plot()
-        self.plot_ston.creatPlot(self.grid, 'Pair', 'Ratio', "Signal to Noise", (3, 1), "linear")
-        self.plot_ston.plot(time, self.ston_list_left, '*r', label="left Polarization")
-        self.plot_ston.plot(time, self.ston_list_right, 'og', label="right Polarization")
-        self.plot_ston.plot(time, self.ston_list_avg, 'vb', label="AVG Polarization")
-
-        print("Average signal to noise for left polarization", np.mean(self.ston_list_left))
-        print("Average signal to noise for right polarization", np.mean(self.ston_list_right))
-        print("Average signal to noise for average polarization", np.mean(self.ston_list_avg))
-
-        non_signal_amplitude_left, _ = split_data_to_signal_and_noise(velocities_avg, y__left_avg, self.cuts)
-        non_signal_amplitude_right, _ = split_data_to_signal_and_noise(velocities_avg, y__right_avg, self.cuts)
-
-        print("Average rms for left polarization", rms((np.array(non_signal_amplitude_left) +
-                                                        np.array(non_signal_amplitude_right))/2))
-        print("Average rms for right polarization", rms(non_signal_amplitude_left))
-        print("Average rms for average polarization", rms(non_signal_amplitude_right))
-
-        self.grid.addWidget(self.plot_velocity__left, 0, 0)
-        self.grid.addWidget(self.plot_velocity__right, 0, 1)
-        self.grid.addWidget(self.plot_tsys, 2, 0)
-        self.grid.addWidget(self.plot_ston, 2, 1)
-
         total_results = np.transpose(np.array([np.transpose(velocities_avg),
                                                np.transpose(y__left_avg),
                                                np.transpose(y__right_avg)]))
 
         result_file.create_dataset("amplitude", data=total_results)
-        specie = [specie.encode("ascii", "ignore")]
-        result_file.create_dataset("specie", (len(specie),1),'S10', specie)
+        specie = [self.specie.encode("ascii", "ignore")]
+        result_file.create_dataset("specie", (len(specie), 1), 'S10', specie)
         result_file.close()
+        return result_file_name
 
-    def get_data_file_for_scan(self, scan_name):
-        """
-
-        :param scan_name: scan name
-        :return: file name for scan
-        """
-        file_name = ""
-
-        for file in self.data_files:
-            if get_scan_name(file) == scan_name:
-                file_name = file
-                break
-
-        return file_name
-
-    def plot_pair(self, index):
+    def process(self):
         """
 
-        :param index: index of scans
-        :return: None
+        :return: output file name
         """
-        pair = self.scan_pairs[index]
-        file1 = self.data_dir + self.get_data_file_for_scan(pair[0][1])  # s0
-        file2 = self.data_dir + self.get_data_file_for_scan(pair[0][0])  # r0
-        file3 = self.data_dir + self.get_data_file_for_scan(pair[1][1])  # s1
-        file4 = self.data_dir + self.get_data_file_for_scan(pair[1][0])  # r1
-
-        frequency_a, p_sig_left, p_sig_right = get_data(file1)  # s0
-        frequency_b, p_ref_left, p_ref_right = get_data(file2)  # r0
-        frequency_c, p_sig_on_left, p_sig_on_right = get_data(file3)  # s1
-        frequency_d, p_ref_on_left, p_ref_on_right = get_data(file4)  # r1
+        self.calibrate_pairs(self.scan_pairs)
 
-        # fft shift
-        p_sig_left = np.fft.fftshift(p_sig_left)  # s0
-        p_sig_right = np.fft.fftshift(p_sig_right)  # s0
-        p_ref_left = np.fft.fftshift(p_ref_left)  # r0
-        p_ref_right = np.fft.fftshift(p_ref_right)  # r0
-        p_sig_on_left = np.fft.fftshift(p_sig_on_left)  # s1
-        p_sig_on_right = np.fft.fftshift(p_sig_on_right)  # s1
-        p_ref_on_left = np.fft.fftshift(p_ref_on_left)  # r1
-        p_ref_on_right = np.fft.fftshift(p_ref_on_right)  # r1
+        velocities_avg, y__left_avg, y__right_avg, time, _ = self.compute_total_results()
+        return self.write_output(velocities_avg, y__left_avg, y__right_avg, time)
 
-        sf_left, sf_right, frequency_a1, tsys_r_left, tsys_r_right, tsys_s_left, tsys_s_right, delete_scan_files = \
-            frequency_shifting(p_sig_left, p_sig_right, p_ref_left, p_ref_right, p_sig_on_left,
-                               p_sig_on_right, p_ref_on_left,
-                               p_ref_on_right, frequency_a, self.logs, pair)
 
-        if not delete_scan_files:
-            self.sf_left.append(sf_left)
-            self.sf_right.append(sf_right)
-            self.x = frequency_a1
+def process_iteration(source, line, iteration_number, log_file, config_file_path, batch=False):
+    """
 
-            self.tsys_r_left_list.append(tsys_r_left)
-            self.tsys_r_right_list.append(tsys_r_right)
-            self.tsys_s_left_list.append(tsys_s_left)
-            self.tsys_s_right_list.append(tsys_s_right)
-
-            # plot1
-            self.plot_start__left_a = Plot()
-            self.plot_start__left_a.creatPlot(self.grid, 'Frequency Mhz',
-                                              'Amplitude', "Left Polarization", (1, 0), "linear")
-            self.plot_start__left_a.plot(frequency_a, p_sig_left, 'b', label=pair[0][1])
-            self.plot_start__left_a.plot(frequency_b, p_ref_left, 'g', label=pair[0][0])
-            self.plot_start__left_a.plot(frequency_c, p_sig_on_left, 'r', label=pair[1][1])
-            self.plot_start__left_a.plot(frequency_d, p_ref_on_left, 'y', label=pair[1][0])
-            self.grid.addWidget(self.plot_start__left_a, 0, 0)
-
-            # plot2
-            self.plot_start__right_b = Plot()
-            self.plot_start__right_b.creatPlot(self.grid, 'Frequency Mhz',
-                                               'Amplitude', "Right Polarization", (1, 1), "linear")
-            self.plot_start__right_b.plot(frequency_a, p_sig_right, 'b', label=pair[0][1])
-            self.plot_start__right_b.plot(frequency_b, p_ref_right, 'g', label=pair[0][0])
-            self.plot_start__right_b.plot(frequency_c, p_sig_on_right, 'r', label=pair[1][1])
-            self.plot_start__right_b.plot(frequency_d, p_ref_on_right, 'y', label=pair[1][0])
-            self.grid.addWidget(self.plot_start__right_b, 0, 1)
-
-            scan_name = re.findall("[0-9]+", pair[0][0])[0]
-
-            # plot3
-            self.total__left = Plot()
-            self.total__left.creatPlot(self.grid, 'Frequency Mhz',
-                                       'Flux density (Jy)', "", (4, 0), "linear")
-            self.total__left.plot(self.x, sf_left, 'b', label=scan_name)
-            self.grid.addWidget(self.total__left, 3, 0)
-
-            # plot4
-            self.total__right = Plot()
-            self.total__right.creatPlot(self.grid,
-                                        'Frequency Mhz', 'Flux density (Jy)', "", (4, 1), "linear")
-            self.total__right.plot(self.x, sf_right, 'b', label=scan_name)
-            self.grid.addWidget(self.total__right, 3, 1)
-        else:
-            self.scan_pairs.remove(pair)
+    :param source: source name
+    :param line: frequency
+    :param iteration_number: iteration number
+    :param log_file: experiment log file
+    :param config_file_path: configuration file path
+    :param batch: process iteration without GUI
+    :return: output file name in batch mode, None otherwise
+    """
+    if batch:
+        iteration = SdrIteration(source, line, iteration_number, log_file, config_file_path, interactive=False)
+        return iteration.process()
 
-        if index == len(self.scan_pairs) - 1:
-            self.next_pair_button.setText('Move to total results')
-            self.next_pair_button.clicked.connect(self.plot_total_results)
+    # GUI is imported only when needed, batch mode must work without PyQt5 and matplotlib
+    from sdr_fs_qt5 import run_analyzer
+    run_analyzer(source, line, iteration_number, log_file, config_file_path)
+    return None
 
 
 def main():
@@ -926,10 +823,9 @@ def main():
 
     :return: None
     """
-    q_app = QApplication(sys.argv)
-    application = Analyzer()
-    application.show()
-    sys.exit(q_app.exec_())
+    process_iteration(get_args("source"), get_args("line"), get_args("iteration_number"),
+                      get_args("log_file"), get_args("config"), get_args("batch") == "True")
+    sys.exit(0)
 
 
 if __name__ == "__main__":
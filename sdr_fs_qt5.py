@@ -0,0 +1,310 @@
+#! /usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""
+SDR output data processing tool GUI
+"""
+import sys
+import re
+from concurrent.futures import ThreadPoolExecutor
+from PyQt5.QtWidgets import QWidget, QApplication, QDesktopWidget, QGridLayout, QPushButton
+from PyQt5.QtGui import QIcon
+from sdr_fs import get_args, SdrIteration
+from utils.ploting_qt5 import Plot
+
+PREFETCH_PAIRS = 3
+
+
+class Analyzer(QWidget):
+    """
+    GUI application
+    """
+
+    def __init__(self, source, line, iteration_number, log_file, config_file_path):
+        super().__init__()
+        self.setWindowIcon(QIcon('viraclogo.png'))
+        self.setWindowTitle("SDR")
+        self.center()
+        self.index = 0
+        self.iteration = SdrIteration(source, line, iteration_number, log_file, config_file_path)
+        self.scan_pairs = self.iteration.scan_pairs
+        self.prefetch_executor = ThreadPoolExecutor(max_workers=1)
+        self.prefetched_pairs = dict()
+
+        self.grid = QGridLayout()
+        self.setLayout(self.grid)
+        self.grid.setSpacing(10)
+
+        self.plot_velocity__left = None
+        self.plot_velocity__right = None
+        self.plot_tsys = None
+        self.plot_ston = None
+        self.plot_start__left_a = None
+        self.plot_start__right_b = None
+        self.total__left = None
+        self.total__right = None
+
+        self.__UI__()
+
+    def center(self):
+        """
+
+        :return: None
+        """
+        frame_geometry = self.frameGeometry()
+        centre_position = QDesktopWidget().availableGeometry().center()
+        frame_geometry.moveCenter(centre_position)
+        self.move(frame_geometry.topLeft())
+
+    def __UI__(self):
+        """
+
+        :return: None
+        """
+        if self.index != len(self.scan_pairs) - 1:  # cheking if there is not one pair
+            self.next_pair_button = QPushButton("Next pair", self)
+            self.next_pair_button.clicked.connect(self.next_pair)
+            self.grid.addWidget(self.next_pair_button, 4, 2)
+
+        self.skip_all_button = QPushButton("Skip to end", self)
+        self.skip_all_button.clicked.connect(self.skip_all)
+        self.grid.addWidget(self.skip_all_button, 5, 2)
+
+        self.plot_pair(self.index)
+
+    def next_pair(self):
+        """
+        :return: None
+        """
+        if self.index == len(self.scan_pairs) - 1:
+            pass
+
+        else:
+            if self.plot_start__left_a or self.plot_start__right_b:
+                if self.plot_start__left_a:
+                    self.plot_start__left_a.removePolt()
+                if self.plot_start__right_b:
+                    self.plot_start__right_b.removePolt()
+                self.index = self.index + 1
+            self.plot_pair(self.index)
+
+    def prefetch_pairs(self, index):
+        """
+        Next pairs are read and calibrated on background thread while current pair is shown
+
+        :param index: index of first pair to prefetch
+        :return: None
+        """
+        for pair in self.scan_pairs[index:index + PREFETCH_PAIRS]:
+            if pair not in self.prefetched_pairs:
+                self.prefetched_pairs[pair] = self.prefetch_executor.submit(self.iteration.compute_pair, pair)
+
+    def stop_prefetch(self):
+        """
+
+        :return: None
+        """
+        for future in self.prefetched_pairs.values():
+            future.cancel()
+        self.prefetched_pairs.clear()
+        self.prefetch_executor.shutdown(wait=False)
+
+    def get_computed_pair(self, pair):
+        """
+
+        :param pair: scan pair
+        :return: prefetched result of compute_pair or None if pair was not prefetched
+        """
+        future = self.prefetched_pairs.pop(pair, None)
+        if future is None or future.cancel():
+            return None
+        try:
+            return future.result()
+        except Exception as error:
+            # pair is read again on main thread, so error is reported as without prefetch
+            print("Prefetch of scan pair " + str(pair) + " failed: " + str(error))
+            return None
+
+    def skip_all(self):
+        """
+
+        :return: None
+        """
+        self.stop_prefetch()
+        self.index += 1
+        self.iteration.calibrate_pairs(self.scan_pairs[self.index:])
+        self.index = len(self.scan_pairs)
+        self.plot_total_results()
+
+    def plot_total_results(self):
+        """
+
+        :return: None
+        """
+        self.stop_prefetch()
+
+        if self.plot_start__left_a or self.plot_start__right_b:
+            self.grid.removeWidget(self.plot_start__left_a)
+            self.grid.removeWidget(self.plot_start__right_b)
+
+            self.plot_start__left_a.hide()
+            self.plot_start__right_b.hide()
+
+            self.plot_start__left_a.close()
+            self.plot_start__right_b.close()
+
+            self.plot_start__left_a.removePolt()
+            self.plot_start__right_b.removePolt()
+
+            del self.plot_start__left_a
+            del self.plot_start__right_b
+
+        if self.total__left or self.total__right:
+            self.grid.removeWidget(self.total__left)
+            self.grid.removeWidget(self.total__right)
+            self.total__left.hide()
+            self.total__right.hide()
+            self.total__left.close()
+            self.total__right.close()
+            self.total__left.removePolt()
+            self.total__right.removePolt()
+            del self.total__left
+            del self.total__right
+
+        self.grid.removeWidget(self.next_pair_button)
+        self.next_pair_button.hide()
+        self.next_pair_button.close()
+        del self.next_pair_button
+
+        for i in reversed(range(self.grid.count())):
+            self.grid.itemAt(i).widget().deleteLater()
+
+        velocities_avg, y__left_avg, y__right_avg, time, ston_time = self.iteration.compute_total_results()
+        self.iteration.write_output(velocities_avg, y__left_avg, y__right_avg, time)
+
+        self.plot_velocity__left = Plot()
+        self.plot_velocity__left.creatPlot(self.grid, 'Velocity (km sec$^{-1}$)',
+                                           'Flux density (Jy)',
+                                           "Left Polarization", (1, 0), "linear")
+        self.plot_velocity__left.plot(velocities_avg, y__left_avg, 'b')
+
+        self.plot_velocity__right = Plot()
+        self.plot_velocity__right.creatPlot(self.grid, 'Velocity (km sec$^{-1}$)',
+                                            'Flux density (Jy)',
+                                            "Right Polarization", (1, 1), "linear")
+        self.plot_velocity__right.plot(velocities_avg, y__right_avg, 'b')
+
+        self.plot_tsys = Plot()
+        self.plot_tsys.creatPlot(self.grid, 'Time', 'System temperature',
+                                 "System temperature in time", (3, 0), "linear")
+        self.plot_tsys.plot(time, self.iteration.tsys_r_left_list, '*b', label="Tsys_r_left")
+        self.plot_tsys.plot(time, self.iteration.tsys_r_right_list, '*r', label="Tsys_r_right")
+        self.plot_tsys.plot(time, self.iteration.tsys_s_left_list, '*g', label="Tsys_s_left")
+        self.plot_tsys.plot(time, self.iteration.tsys_s_right_list, '*y', label="Tsys_s_right")
+
+        self.plot_ston = Plot()
+        self.plot_ston.creatPlot(self.grid, 'Pair', 'Ratio', "Signal to Noise", (3, 1), "linear")
+        self.plot_ston.plot(ston_time, self.iteration.ston_list_left, '*r', label="left Polarization")
+        self.plot_ston.plot(ston_time, self.iteration.ston_list_right, 'og', label="right Polarization")
+        self.plot_ston.plot(ston_time, self.iteration.ston_list_avg, 'vb', label="AVG Polarization")
+
+        self.grid.addWidget(self.plot_velocity__left, 0, 0)
+        self.grid.addWidget(self.plot_velocity__right, 0, 1)
+        self.grid.addWidget(self.plot_tsys, 2, 0)
+        self.grid.addWidget(self.plot_ston, 2, 1)
+
+    def plot_pair(self, index):
+        """
+
+        :param index: index of scans
+        :return: None
+        """
+        pair = self.scan_pairs[index]
+        calibrated_pair = self.iteration.calibrate_pair(pair, self.get_computed_pair(pair))
+
+        if calibrated_pair is not None:
+            scans, sf_left, sf_right = calibrated_pair
+            (frequency_a, p_sig_left, p_sig_right), (frequency_b, p_ref_left, p_ref_right), \
+            (frequency_c, p_sig_on_left, p_sig_on_right), (frequency_d, p_ref_on_left, p_ref_on_right) = scans
+
+            # plot1
+            self.plot_start__left_a = Plot()
+            self.plot_start__left_a.creatPlot(self.grid, 'Frequency Mhz',
+                                              'Amplitude', "Left Polarization", (1, 0), "linear")
+            self.plot_start__left_a.plot(frequency_a, p_sig_left, 'b', label=pair[0][1])
+            self.plot_start__left_a.plot(frequency_b, p_ref_left, 'g', label=pair[0][0])
+            self.plot_start__left_a.plot(frequency_c, p_sig_on_left, 'r', label=pair[1][1])
+            self.plot_start__left_a.plot(frequency_d, p_ref_on_left, 'y', label=pair[1][0])
+            self.grid.addWidget(self.plot_start__left_a, 0, 0)
+
+            # plot2
+            self.plot_start__right_b = Plot()
+            self.plot_start__right_b.creatPlot(self.grid, 'Frequency Mhz',
+                                               'Amplitude', "Right Polarization", (1, 1), "linear")
+            self.plot_start__right_b.plot(frequency_a, p_sig_right, 'b', label=pair[0][1])
+            self.plot_start__right_b.plot(frequency_b, p_ref_right, 'g', label=pair[0][0])
+            self.plot_start__right_b.plot(frequency_c, p_sig_on_right, 'r', label=pair[1][1])
+            self.plot_start__right_b.plot(frequency_d, p_ref_on_right, 'y', label=pair[1][0])
+            self.grid.addWidget(self.plot_start__right_b, 0, 1)
+
+            scan_name = re.findall("[0-9]+", pair[0][0])[0]
+
+            # plot3
+            self.total__left = Plot()
+            self.total__left.creatPlot(self.grid, 'Frequency Mhz',
+                                       'Flux density (Jy)', "", (4, 0), "linear")
+            self.total__left.plot(self.iteration.x, sf_left, 'b', label=scan_name)
+            self.grid.addWidget(self.total__left, 3, 0)
+
+            # plot4
+            self.total__right = Plot()
+            self.total__right.creatPlot(self.grid,
+                                        'Frequency Mhz', 'Flux density (Jy)', "", (4, 1), "linear")
+            self.total__right.plot(self.iteration.x, sf_right, 'b', label=scan_name)
+            self.grid.addWidget(self.total__right, 3, 1)
+
+        if index == len(self.scan_pairs) - 1:
+            self.next_pair_button.setText('Move to total results')
+            self.next_pair_button.clicked.connect(self.plot_total_results)
+        else:
+            self.prefetch_pairs(index + 1)
+
+    def closeEvent(self, event):
+        """
+
+        :param event: close event
+        :return: None
+        """
+        self.stop_prefetch()
+        super().closeEvent(event)
+
+
+def run_analyzer(source, line, iteration_number, log_file, config_file_path):
+    """
+
+    :param source: source name
+    :param line: frequency
+    :param iteration_number: iteration number
+    :param log_file: experiment log file
+    :param config_file_path: configuration file path
+    :return: Qt application exit code
+    """
+    q_app = QApplication.instance()
+    if q_app is None:
+        q_app = QApplication(sys.argv)
+    application = Analyzer(source, line, iteration_number, log_file, config_file_path)
+    application.show()
+    return q_app.exec_()
+
+
+def main():
+    """
+
+    :return: None
+    """
+    sys.exit(run_analyzer(get_args("source"), get_args("line"), get_args("iteration_number"),
+                          get_args("log_file"), get_args("config")))
+
+
+if __name__ == "__main__":
+    main()
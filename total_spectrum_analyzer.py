@@ -0,0 +1,524 @@
+#! /usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""
+sdr_fs data processing without GUI
+"""
+import sys
+import os
+import glob
+import argparse
+from functools import lru_cache
+from multiprocessing import Pool
+import h5py
+import numpy as np
+import peakutils
+from parsers.configparser_ import load_config
+from utils.gauss_fit import GaussFitter
+from utils.baseline import Baseline
+from utils.smoothing import smooth
+from utils.result_store import ResultStore
+
+
+@lru_cache(maxsize=None)
+def parse_arguments():
+    """
+
+    :return: dict with passed args to script
+    """
+    parser = argparse.ArgumentParser(description='''Process sdr_fs.py output files without GUI. ''',
+                                     epilog="""BATCH PLOTTER.""")
+    parser.add_argument("datafiles", help="output files or glob patterns of output files", type=str, nargs="+")
+    parser.add_argument("line", help="Observed frequency", type=int)
+    parser.add_argument("-c", "--config", help="Configuration cfg file",
+                        type=str, default="config/config.cfg")
+    parser.add_argument("-t", "--calibType", help="Type of calibration", default="SDR")
+    parser.add_argument("-tr", "--threshold",
+                        help="Set threshold for outlier filter", type=float, default=1.0)
+    parser.add_argument("-f", "--filter",
+                        help="Set the amount of times to filter data to remove noise spikes, "
+                             "higher than 5 makes little difference",
+                        type=int, default=0, choices=range(0, 11), metavar="[0-10]")
+    parser.add_argument("-j", "--jobs", help="Number of parallel processes", type=int, default=1)
+    parser.add_argument("-v", "--version", action="version", version='%(prog)s - Version 1.0')
+    args = parser.parse_args()
+    return args
+
+
+def get_args(key):
+    """
+
+    :param key: argument key
+    :return: to script passed argument value
+    """
+    return str(parse_arguments().__dict__[key])
+
+
+def get_data(data_file):
+    """
+
+    :param data_file: data file name
+    :return: values from script sdr_fs.py
+    """
+    input_data = h5py.File(data_file, 'r')
+    amplitude = input_data['amplitude'][()]
+    specie = input_data['specie'][()][0][0].decode("ascii")
+    input_data.close()
+    return amplitude, specie
+
+
+def is_outlier(points, threshold):
+    """
+
+    :param points: points
+    :param threshold: threshold
+    :return: mask for outliers
+    """
+    if len(points.shape) == 1:
+        points = points[:, None]
+
+    median = np.median(points, axis=0)
+    diff = np.sum((points - median) ** 2, axis=-1)
+    diff = np.sqrt(diff)
+    med_abs_deviation = np.median(diff)
+    modified_z_score = 0.6745 * diff / med_abs_deviation
+
+    return modified_z_score < threshold
+
+
+def rolling_mean(values, window):
+    """
+
+    :param values: array with points in rows
+    :param window: number of points in window
+    :return: centered rolling mean of columns, 0 where window does not fit in array
+    """
+    points_count = values.shape[0]
+    mean = np.zeros(values.shape)
+    if points_count < window:
+        return mean
+
+    cumulative_sum = np.cumsum(values, axis=0)
+    window_sum = cumulative_sum[window - 1:].copy()
+    window_sum[1:] -= cumulative_sum[:-window]
+    mean[window // 2: window // 2 + points_count - window + 1] = window_sum / window
+    return mean
+
+
+def signal_to_noise_ratio(frequency, amplitude, cuts):
+    """
+
+    :param frequency: frequency
+    :param amplitude: amplitude
+    :param cuts: signal region
+    :return: signal to noise ratio
+    """
+    cuts_index = list()
+    cuts_index.append(0)
+    for cut in cuts:
+        cuts_index.append((np.abs(frequency - float(cut[0]))).argmin())
+        cuts_index.append((np.abs(frequency - float(cut[1]))).argmin())
+    cuts_index.append(-1)
+    y_array = list()
+    i = 0
+    j = 1
+    while i != len(cuts_index):
+        y_array.append(amplitude[cuts_index[i]: cuts_index[j]])
+        i = i + 2
+        j = j + 2
+    non_signal_amplitude = list()
+    for point in y_array:
+        for point_one in point:
+            non_signal_amplitude.append(point_one)
+
+    non_signal_amplitude = np.array(non_signal_amplitude)
+    std = np.std(non_signal_amplitude)
+    ston = std * 3
+    return ston
+
+
+def set_gauss_fit(result, gauss_fit):
+    """
+
+    :param result: result of experiment
+    :param gauss_fit: GaussFitResult of average polarization
+    :return: None
+    """
+    gaussiana_amplitudes = [str(value) for value in gauss_fit.amplitudes]
+    gaussiana_mean = [str(value) for value in gauss_fit.means]
+    gaussiana_std = [str(value) for value in gauss_fit.stddevs]
+    if len(gaussiana_amplitudes) == 1:
+        # result files store parameters of single line without list
+        gaussiana_amplitudes, gaussiana_mean, gaussiana_std = \
+            gaussiana_amplitudes[0], gaussiana_mean[0], gaussiana_std[0]
+
+    result["areas"] = gauss_fit.areas.tolist()
+    result["gauss_amp"] = gaussiana_amplitudes
+    result["gauss_mean"] = gaussiana_mean
+    result["gauss_STD"] = gaussiana_std
+
+
+class SpectrumAnalysis:
+    """
+    Baseline removal, smoothing and monitoring result of one sdr_fs.py output file
+    """
+
+    def __init__(self, data_file_name, line, config_file_path,
+                 calib_type="SDR", threshold=1.0, filter_count=0):
+        self.config_file_path = config_file_path
+        self.config = load_config(config_file_path)
+        self.calib_type = calib_type
+        self.threshold = threshold
+        self.filter_count = filter_count
+        self.line = str(line)
+        self.source = os.path.basename(data_file_name).split(".")[0].split("_")[0]
+        if os.path.dirname(data_file_name):
+            self.data_file = data_file_name
+        else:
+            self.data_file = self.config.get_path("outputFilePath") + "/" + \
+                             self.line + "/" + \
+                             self.source + "/" + \
+                             data_file_name
+        self.data, self.specie = get_data(self.data_file)
+        self.xdata = self.data[:, 0]
+        self.ydata_left = self.data[:, 1]
+        self.ydata_right = self.data[:, 2]
+        self.cuts = self.config.get_cuts(self.source, self.line)
+        self.polynomial_order = 3
+        self.polyu1 = None
+        self.polyu9 = None
+        self.baseline_u1 = None
+        self.baseline_u9 = None
+        self.local_max_array_u1 = None
+        self.local_max_array_u9 = None
+        self.z1_not_smooht_data = None
+        self.z2_not_smooht_data = None
+        self.avg_y_not_smoohtData = None
+        self.z1_smooht_data = None
+        self.z2_smooht_data = None
+        self.avg_y_smooht_data = None
+
+        if self.filter_count > 0:
+            self.filter_outliers()
+
+        self.data_points = len(self.xdata)
+        self.m = 0
+        self.n = self.data_points
+        self.xdata = np.flip(self.xdata, 0)
+        self.ydata_left = np.flip(self.ydata_left, 0)
+        self.ydata_right = np.flip(self.ydata_right, 0)
+
+    def filter_outliers(self):
+        """
+        Outliers are replaced with rolling mean of neighbour points
+
+        :return: None
+        """
+        bad_point_range = self.config.get_int("parameters", "badPointRange")
+        # view of both polarizations, replaced points are visible in ydata_left and ydata_right
+        amplitudes = self.data[:, 1:3]
+        for _ in range(self.filter_count):
+            bad_points = ~is_outlier(self.data, self.threshold)
+            mean_amplitudes = rolling_mean(amplitudes, bad_point_range)
+            replace = bad_points[:, None] & (mean_amplitudes != 0)
+            amplitudes[replace] = mean_amplitudes[replace]
+
+    def shorten(self, m, n):
+        """
+
+        :param m: first channel of spectrum
+        :param n: last channel of spectrum
+        :return: None
+        """
+        self.m = m
+        self.n = n
+        self.xdata = self.xdata[self.m:self.n]
+        self.ydata_left = self.ydata_left[self.m:self.n]
+        self.ydata_right = self.ydata_right[self.m:self.n]
+
+    def remove_cuts(self):
+        """
+        Polynomial is fitted to spectrum without signal regions given by cuts
+
+        :return: velocities of points used in polynomial fit
+        """
+        baseline = Baseline(self.xdata, self.cuts, self.polynomial_order)
+        polyx = self.xdata[baseline.mask]
+        self.polyu1 = self.ydata_left[baseline.mask]
+        self.polyu9 = self.ydata_right[baseline.mask]
+
+        # both polarizations are fitted with one design matrix
+        baselines = baseline.compute(np.column_stack([self.ydata_left, self.ydata_right]))
+        self.baseline_u1 = baselines[:, 0]
+        self.baseline_u9 = baselines[:, 1]
+        return polyx
+
+    def compute_local_maximums(self):
+        """
+
+        :return: indexes of local maximums for left, right and average polarization
+        """
+        self.local_max_array_u1 = self.ydata_left - self.baseline_u1
+        self.local_max_array_u9 = self.ydata_right - self.baseline_u9
+        self.z1_not_smooht_data = self.local_max_array_u1
+        self.z2_not_smooht_data = self.local_max_array_u9
+        self.avg_y_not_smoohtData = (self.z1_not_smooht_data + self.z2_not_smooht_data) / 2
+
+        smooth_data = smooth(np.vstack([self.local_max_array_u1, self.local_max_array_u9]), "gaussian", 19, 3.0)
+        self.z1_smooht_data = smooth_data[0]
+        self.z2_smooht_data = smooth_data[1]
+        self.avg_y_smooht_data = (self.z1_smooht_data + self.z2_smooht_data) / 2
+
+        three_sigma_u1 = 3 * np.std(self.polyu1)
+        three_sigma_u9 = 3 * np.std(self.polyu9)
+        polyu_avg = (self.polyu1 + self.polyu9) / 2
+        three_sigma_uavg = 3 * np.std(polyu_avg)
+
+        smart_tres_u1 = 2.5 * three_sigma_u1 / np.max(self.z1_smooht_data)
+        smart_tres_u9 = 2.5 * three_sigma_u9 / np.max(self.z2_smooht_data)
+        smart_tres_uavg = 2.5 * three_sigma_uavg / np.max(self.avg_y_smooht_data)
+
+        indexes_for_ceb = peakutils.indexes(self.z1_smooht_data, thres=smart_tres_u1, min_dist=3)
+        indexes_for_ceb2 = peakutils.indexes(self.z2_smooht_data, thres=smart_tres_u9, min_dist=3)
+        indexes_for_avg = peakutils.indexes(self.avg_y_smooht_data, thres=smart_tres_uavg, min_dist=3)
+        return indexes_for_ceb, indexes_for_ceb2, indexes_for_avg
+
+    def get_experiment_name(self):
+        """
+
+        :return: experiment name used as key in result file
+        """
+        return ".".join([self.data_file.split("/")[-1].split(".")[0],
+                         self.data_file.split("/")[-1].split(".")[1]])
+
+    def get_gauss_lines(self):
+        """
+
+        :return: velocities of Gaussian lines of source
+        """
+        return list(self.config.get_gauss_lines(self.source, self.line))
+
+    def fit_gauss_lines(self, gauss_fitter=None):
+        """
+
+        :param gauss_fitter: fitter of batch of epochs sorted by time or None to fit this epoch alone
+        :return: GaussFitResult of average polarization
+        """
+        if gauss_fitter is None:
+            gauss_fitter = GaussFitter(self.get_gauss_lines())
+        return gauss_fitter.fit(self.xdata, self.avg_y_not_smoohtData)
+
+    def compute_result(self, gauss_fit=None):
+        """
+
+        :param gauss_fit: GaussFitResult of average polarization or None if Gaussian lines are fitted later
+        :return: result of experiment for result file
+        """
+        expername = self.get_experiment_name()
+        source_velocities = self.config.get_velocities(self.source, self.line)
+        index_range_for_local_maxima = self.config.get_int('parameters', "index_range_for_local_maxima")
+        mjd = expername.split("_")[1]
+        location = expername.split("_")[2]
+        iteration_number = expername.split("_")[3]
+
+        indexies_for_source_velocities = [0] * len(source_velocities)
+        for index in range(0, len(source_velocities)):
+            indexies_for_source_velocities[index] = (
+                np.abs(self.xdata - float(source_velocities[index]))).argmin()
+
+        max_amplitude_list_u1 = list()
+        max_amplitude_list_u9 = list()
+        max_amplitude_list_uavg = list()
+        for index in indexies_for_source_velocities:
+            max_amplitude_list_tmp_u1 = list()
+            max_amplitude_list_tmp_u9 = list()
+            max_amplitude_list_tmp_uavg = list()
+            for i in range(index - index_range_for_local_maxima,
+                           index + index_range_for_local_maxima):
+                max_amplitude_list_tmp_u1.append(self.z1_not_smooht_data[i])
+                max_amplitude_list_tmp_u9.append(self.z2_not_smooht_data[i])
+                max_amplitude_list_tmp_uavg.append(self.avg_y_not_smoohtData[i])
+            max_amplitude_list_u1.append(max_amplitude_list_tmp_u1)
+            max_amplitude_list_u9.append(max_amplitude_list_tmp_u9)
+            max_amplitude_list_uavg.append(max_amplitude_list_tmp_uavg)
+
+        max_apmlitudes_u1 = [np.max(value) for value in max_amplitude_list_u1]
+        max_apmlitudes_u9 = [np.max(value) for value in max_amplitude_list_u9]
+        max_apmlitudes_uavg = [np.max(value) for value in max_amplitude_list_uavg]
+
+        for maximum in range(0, len(max_apmlitudes_u1)):
+            max_apmlitudes_u1[maximum] = [source_velocities[maximum], max_apmlitudes_u1[maximum]]
+            max_apmlitudes_u9[maximum] = [source_velocities[maximum], max_apmlitudes_u9[maximum]]
+            max_apmlitudes_uavg[maximum] = \
+                [source_velocities[maximum], max_apmlitudes_uavg[maximum]]
+
+        result = dict()
+        result["modifiedJulianDays"] = mjd
+        result["location"] = location
+        result["Iteration_number"] = int(iteration_number)
+
+        result["polarizationU1"] = max_apmlitudes_u1
+        result["polarizationU9"] = max_apmlitudes_u9
+        result["polarizationAVG"] = max_apmlitudes_uavg
+        result["flag"] = False
+        if self.calib_type == "SDR":
+            result["type"] = "SDR"
+        else:
+            result["type"] = "DBBC"
+        if gauss_fit is not None:
+            set_gauss_fit(result, gauss_fit)
+
+        result["AVG_STON_LEFT"] = \
+            signal_to_noise_ratio(self.xdata, self.z1_not_smooht_data, self.cuts)
+        result["AVG_STON_RIGHT"] = \
+            signal_to_noise_ratio(self.xdata, self.z2_not_smooht_data, self.cuts)
+        result["AVG_STON_AVG"] = \
+            signal_to_noise_ratio(self.xdata, self.avg_y_not_smoohtData, self.cuts)
+        return result
+
+    def write_corrected_amplitudes(self):
+        """
+
+        :return: None
+        """
+        total_results = np.transpose([self.xdata, self.z1_smooht_data,
+                                      self.z2_smooht_data, self.avg_y_smooht_data])
+        total_results2 = np.transpose([self.xdata, self.z1_not_smooht_data,
+                                       self.z2_not_smooht_data, self.avg_y_not_smoohtData])
+        result_file = h5py.File(self.data_file, "a")
+        if "amplitude_corrected" in result_file:
+            amplitude_corrected = result_file["amplitude_corrected"]
+            amplitude_corrected_not_smooht = result_file["amplitude_corrected_not_smooht"]
+            amplitude_corrected[...] = total_results
+            amplitude_corrected_not_smooht[...] = total_results2
+        else:
+            result_file.create_dataset("amplitude_corrected", data=total_results)
+            result_file.create_dataset("amplitude_corrected_not_smooht", data=total_results2)
+        result_file.close()
+
+    def create_result(self):
+        """
+
+        :return: None
+        """
+        result_store = ResultStore(self.config.get_path("resultFilePath"))
+        result_store.update_results(self.source, self.line, {self.get_experiment_name(): self.compute_result(self.fit_gauss_lines())})
+        result_store.close()
+        self.write_corrected_amplitudes()
+
+    def process(self):
+        """
+        Result is not stored, results of many output files are stored together.
+        Gaussian lines are not fitted, they are fitted for all output files in order of epochs
+
+        :return: experiment name, result of experiment and velocity and average polarization for Gaussian fit
+        """
+        self.remove_cuts()
+        self.compute_local_maximums()
+        result = self.compute_result()
+        self.write_corrected_amplitudes()
+        return self.get_experiment_name(), result, (self.xdata, self.avg_y_not_smoohtData)
+
+
+def process_output_file_job(job):
+    """
+
+    :param job: output file, line, configuration file path, calibration type, threshold and filter count
+    :return: output file, source, experiment name, result, spectrum for Gaussian fit and error message or None
+    """
+    data_file_name = job[0]
+    try:
+        analysis = SpectrumAnalysis(*job)
+        expername, result, spectrum = analysis.process()
+    except Exception as error:
+        # one broken output file must not stop processing of the others
+        return data_file_name, None, None, None, None, str(error)
+    return data_file_name, analysis.source, expername, result, spectrum, None
+
+
+def fit_gauss_lines_in_time_order(job_results, line, config_file_path):
+    """
+    Each fit starts from previous epoch of the same source in this batch,
+    so results do not depend on number of processes or order of output files
+
+    :param job_results: results of process_output_file_job
+    :param line: frequency
+    :param config_file_path: configuration file path
+    :return: dict with output files as keys and error messages of failed fits as values
+    """
+    config = load_config(config_file_path)
+    gauss_fitters = dict()
+    errors = dict()
+    job_results = sorted([job_result for job_result in job_results if job_result[-1] is None],
+                         key=lambda job_result: (float(job_result[3]["modifiedJulianDays"]), job_result[0]))
+    for data_file_name, source, _, result, spectrum, _ in job_results:
+        try:
+            if source not in gauss_fitters:
+                gauss_fitters[source] = GaussFitter(config.get_gauss_lines(source, str(line)))
+            set_gauss_fit(result, gauss_fitters[source].fit(*spectrum))
+        except Exception as error:
+            errors[data_file_name] = str(error)
+    return errors
+
+
+def analyze_output_files(data_file_names, line, config_file_path, calib_type="SDR",
+                         threshold=1.0, filter_count=0, processes=1):
+    """
+
+    :param data_file_names: sdr_fs.py output file names
+    :param line: frequency
+    :param config_file_path: configuration file path
+    :param calib_type: type of calibration
+    :param threshold: threshold for outlier filter
+    :param filter_count: amount of times to filter data
+    :param processes: number of parallel processes
+    :return: dict with output files as keys and error messages or None as values
+    """
+    jobs = [(data_file_name, line, config_file_path, calib_type, threshold, filter_count)
+            for data_file_name in data_file_names]
+    if processes > 1 and len(jobs) > 1:
+        with Pool(processes=min(processes, len(jobs))) as pool:
+            job_results = pool.map(process_output_file_job, jobs)
+    else:
+        job_results = [process_output_file_job(job) for job in jobs]
+
+    gauss_errors = fit_gauss_lines_in_time_order(job_results, line, config_file_path)
+
+    # results are stored only by this process
+    results = dict()
+    errors = dict()
+    for data_file_name, source, expername, result, _, error in job_results:
+        errors[data_file_name] = error or gauss_errors.get(data_file_name)
+        if errors[data_file_name] is None:
+            results.setdefault(source, dict())[expername] = result
+
+    result_store = ResultStore(load_config(config_file_path).get_path("resultFilePath"))
+    for source in results:
+        result_store.update_results(source, line, results[source])
+    result_store.close()
+    return errors
+
+
+def main():
+    """
+
+    :return: None
+    """
+    data_file_names = []
+    for pattern in parse_arguments().datafiles:
+        # file names without directory are looked up in outputFilePath
+        data_file_names.extend(sorted(glob.glob(pattern)) or [pattern])
+
+    errors = analyze_output_files(data_file_names, get_args("line"), get_args("config"),
+                                  get_args("calibType"), float(get_args("threshold")),
+                                  int(get_args("filter")), int(get_args("jobs")))
+    for data_file_name, error in errors.items():
+        if error is not None:
+            print("Processing of output file " + data_file_name + " failed: " + error)
+        else:
+            print("Output file " + data_file_name + " is processed")
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Least squares baseline of spectra without signal regions
+"""
+import numpy as np
+
+
+def get_cuts_mask(velocities, cuts):
+    """
+
+    :param velocities: velocities of spectrum channels
+    :param cuts: signal regions as pairs of velocities
+    :return: boolean mask of channels outside of signal regions
+    """
+    cuts_index = [0]
+    for cut in cuts:
+        cuts_index.append((np.abs(velocities - float(cut[0]))).argmin())
+        cuts_index.append((np.abs(velocities - float(cut[1]))).argmin())
+    cuts_index.append(len(velocities))
+
+    mask = np.zeros(len(velocities), dtype=bool)
+    for start, stop in zip(cuts_index[::2], cuts_index[1::2]):
+        mask[start:stop] = True
+    return mask
+
+
+def polynomial_design_matrix(velocities, order):
+    """
+
+    :param velocities: velocities of spectrum channels
+    :param order: polynomial order
+    :return: design matrix with powers of velocities in columns
+    """
+    return np.vander(velocities, order + 1)
+
+
+def chebyshev_design_matrix(velocities, order):
+    """
+
+    :param velocities: velocities of spectrum channels
+    :param order: polynomial order
+    :return: design matrix with Chebyshev polynomials of velocities mapped to [-1, 1] in columns
+    """
+    velocity_min = np.min(velocities)
+    velocity_range = np.max(velocities) - velocity_min
+    if velocity_range == 0:
+        velocity_range = 1.0
+    return np.polynomial.chebyshev.chebvander(2 * (velocities - velocity_min) / velocity_range - 1, order)
+
+
+BASELINE_MODELS = {"polynomial": polynomial_design_matrix, "chebyshev": chebyshev_design_matrix}
+
+
+class Baseline:
+    """
+    Baseline model of one velocity grid, design matrix is factorized once and
+    used for all spectra on the same grid
+    """
+
+    def __init__(self, velocities, cuts, order=3, model="polynomial"):
+        if model not in BASELINE_MODELS:
+            raise ValueError("Unknown baseline model " + model)
+        self.velocities = np.asarray(velocities, dtype=float)
+        self.order = int(order)
+        self.model = model
+        self.mask = get_cuts_mask(self.velocities, cuts)
+        self.design_matrix = BASELINE_MODELS[model](self.velocities, self.order)
+
+        # columns are scaled for better conditioning, as in numpy.polyfit
+        fit_matrix = self.design_matrix[self.mask]
+        self.scale = np.sqrt((fit_matrix * fit_matrix).sum(axis=0))
+        self.scale[self.scale == 0] = 1.0
+        self.pseudo_inverse = np.linalg.pinv(fit_matrix / self.scale)
+
+    def fit(self, amplitudes):
+        """
+
+        :param amplitudes: amplitudes of channels, one spectrum or spectra in columns
+        :return: model coefficients, for many spectra in columns
+        """
+        amplitudes = np.asarray(amplitudes)
+        return np.dot(self.pseudo_inverse, amplitudes[self.mask]) / \
+            (self.scale if amplitudes.ndim == 1 else self.scale[:, None])
+
+    def evaluate(self, coefficients):
+        """
+
+        :param coefficients: model coefficients from fit
+        :return: baseline for all channels
+        """
+        return np.dot(self.design_matrix, coefficients)
+
+    def compute(self, amplitudes):
+        """
+
+        :param amplitudes: amplitudes of channels, one spectrum or spectra in columns
+        :return: baseline for all channels
+        """
+        return self.evaluate(self.fit(amplitudes))
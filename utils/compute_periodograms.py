@@ -0,0 +1,84 @@
+#! /usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""
+Compute Lomb-Scargle periodograms of all components of all sources into cacheFilePath
+"""
+import sys
+import os
+import argparse
+from functools import lru_cache
+from multiprocessing import Pool
+
+PACKAGE_PARENT = '..'
+SCRIPT_DIR = os.path.dirname(os.path.realpath(os.path.join(os.getcwd(), os.path.expanduser(__file__))))
+sys.path.append(os.path.normpath(os.path.join(SCRIPT_DIR, PACKAGE_PARENT)))
+
+from parsers.configparser_ import load_config
+from utils.result_store import ResultStore
+from utils.period_search import get_time_series, load_periodogram_job
+
+
+@lru_cache(maxsize=None)
+def parse_arguments():
+    """
+
+    :return: dict with passed args to script
+    """
+    parser = argparse.ArgumentParser(description='''Compute periodograms for monitoring period view. ''')
+    parser.add_argument("line", help="Observed frequency", type=int)
+    parser.add_argument("-s", "--sources", help="Sources, default all sources", type=str, nargs="*")
+    parser.add_argument("-n", "--not_flag", help="Leave out flagged observations", action="store_true")
+    parser.add_argument("-j", "--jobs", help="Number of parallel processes", type=int, default=os.cpu_count())
+    parser.add_argument("-c", "--config", help="Configuration cfg file",
+                        type=str, default="config/config.cfg")
+    parser.add_argument("-v", "--version", action="version", version='%(prog)s - Version 1.0')
+    args = parser.parse_args()
+    return args
+
+
+def get_args(key):
+    """
+
+    :param key: argument key
+    :return: to script passed argument value
+    """
+    return str(parse_arguments().__dict__[key])
+
+
+def main():
+    """
+
+    :return: None
+    """
+    config = load_config(get_args("config"))
+    line = get_args("line")
+    sources = parse_arguments().sources or list(config.get_items("sources").keys())
+    cache_path = config.get_path("cacheFilePath")
+    include_flagged = not parse_arguments().not_flag
+
+    velocities = config.get_items("velocities")
+    jobs = []
+    result_store = ResultStore(config.get_path("resultFilePath"))
+    for source in sources:
+        results = result_store.get_results(source, line)
+        if len(results) == 0 or source + "_" + line not in velocities:
+            continue
+        source_velocities = config.get_velocities(source, line)
+        for component_index, component in enumerate(source_velocities):
+            time, amplitude = get_time_series(results, component_index, include_flagged)
+            jobs.append((cache_path, source, line, component, time, amplitude))
+    result_store.close()
+
+    with Pool(processes=max(1, min(int(get_args("jobs")), len(jobs)))) as pool:
+        for source, component, periodogram, error in pool.imap_unordered(load_periodogram_job, jobs):
+            if error is None:
+                print(source, component, "best period {0:.2f} days".format(periodogram["best_period"]),
+                      "false alarm", periodogram["false_alarm"])
+            else:
+                print(source, component, "period search failed:", error)
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#! /usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""
+Create Earth velocity table used for Local Standard of Rest computation
+"""
+import sys
+import os
+import argparse
+from functools import lru_cache
+from astropy.time import Time
+
+PACKAGE_PARENT = '..'
+SCRIPT_DIR = os.path.dirname(os.path.realpath(os.path.join(os.getcwd(), os.path.expanduser(__file__))))
+sys.path.append(os.path.normpath(os.path.join(SCRIPT_DIR, PACKAGE_PARENT)))
+
+from parsers.configparser_ import load_config
+from utils.vlsr import create_earth_velocity_table, EARTH_VELOCITY_TABLE_FILE_NAME
+
+
+@lru_cache(maxsize=None)
+def parse_arguments():
+    """
+
+    :return: dict with passed args to script
+    """
+    parser = argparse.ArgumentParser(description='''Create Earth velocity table. ''')
+    parser.add_argument("start", help="start date in mjd", type=float)
+    parser.add_argument("stop", help="stop date in mjd", type=float)
+    parser.add_argument("-s", "--step", help="step between table rows in hours", type=float, default=1.0)
+    parser.add_argument("-c", "--config", help="Configuration cfg file",
+                        type=str, default="config/config.cfg")
+    parser.add_argument("-v", "--version", action="version", version='%(prog)s - Version 1.0')
+    args = parser.parse_args()
+    return args
+
+
+def get_args(key):
+    """
+
+    :param key: argument key
+    :return: to script passed argument value
+    """
+    return str(parse_arguments().__dict__[key])
+
+
+def get_configs(section, key):
+    """
+
+    :param section: configuration file section
+    :param key: configuration file sections key
+    :return: configuration file section key value
+    """
+    config_file_path = get_args("config")
+    config = load_config(config_file_path)
+    return config.get_config(section, key)
+
+
+def main():
+    cache_path = get_configs("paths", "cacheFilePath")
+    if not os.path.exists(cache_path):
+        os.makedirs(cache_path)
+
+    table_file_name = cache_path + EARTH_VELOCITY_TABLE_FILE_NAME
+    start_jd = Time(float(get_args("start")), format='mjd').jd
+    stop_jd = Time(float(get_args("stop")), format='mjd').jd
+    create_earth_velocity_table(table_file_name, start_jd, stop_jd, float(get_args("step")) / 24)
+    print("Earth velocity table " + table_file_name + " is created")
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""
+Level of detail for plots of long time series, only points which can be seen at screen resolution are drawn
+"""
+import numpy as np
+
+
+def decimate_min_max(x, y, x_min, x_max, bins):
+    """
+    Points outside of view are left out except nearest point on both sides,
+    from points in view the first, the last and the lowest and the highest point of each bin are kept
+
+    :param x: x values sorted in ascending order
+    :param y: y values
+    :param x_min: left limit of view
+    :param x_max: right limit of view
+    :param bins: number of bins in view, usually width of axes in pixels
+    :return: indexes of points to draw in ascending order
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    start = max(int(np.searchsorted(x, x_min, side="left")) - 1, 0)
+    stop = min(int(np.searchsorted(x, x_max, side="right")) + 1, len(x))
+    if stop - start <= 2 * bins or x_max <= x_min:
+        return np.arange(start, stop)
+
+    view_x = x[start:stop]
+    view_y = y[start:stop]
+    bin_indexes = np.clip(np.floor((view_x - x_min) / (x_max - x_min) * bins), -1, bins)
+    new_bin = np.diff(bin_indexes) != 0
+    segment_starts = np.concatenate([[0], np.flatnonzero(new_bin) + 1])
+    segments = np.concatenate([[0], np.cumsum(new_bin)])
+
+    indexes = [np.array([0, len(view_x) - 1])]
+    for reduce_function in [np.minimum, np.maximum]:
+        extremes = reduce_function.reduceat(view_y, segment_starts)
+        candidates = np.flatnonzero(view_y == extremes[segments])
+        _, first_candidates = np.unique(segments[candidates], return_index=True)
+        indexes.append(candidates[first_candidates])
+    return start + np.unique(np.concatenate(indexes))
@@ -7,8 +7,8 @@ Delete flagged observations
 import sys
 import os
 import argparse
+from functools import lru_cache
 import shutil
-import json
 
 from help import Experiment, get_iteration_from_output_file
 
@@ -16,9 +16,11 @@ PACKAGE_PARENT = '..'
 SCRIPT_DIR = os.path.dirname(os.path.realpath(os.path.join(os.getcwd(), os.path.expanduser(__file__))))
 sys.path.append(os.path.normpath(os.path.join( SCRIPT_DIR, PACKAGE_PARENT)))
 
-from parsers.configparser_ import ConfigParser
+from parsers.configparser_ import load_config
+from utils.result_store import ResultStore
 
 
+@lru_cache(maxsize=None)
 def parse_arguments():
     """
 
@@ -51,7 +53,7 @@ def get_configs(section, key):
     :return: configuration file section key value
     """
     config_file_path = get_args("config")
-    config = ConfigParser(config_file_path)
+    config = load_config(config_file_path)
     return config.get_config(section, key)
 
 
@@ -80,10 +82,8 @@ def main():
 
     source = get_args("source")
     line = get_args("line")
-    result_file_path = get_configs("paths", "resultFilePath")
-    result_file_name = result_file_path + source + "_" + line + ".json"
-    with open(result_file_name, "r") as result_file:
-        result_data = json.load(result_file)
+    result_store = ResultStore(get_configs("paths", "resultFilePath"))
+    result_data = result_store.get_results(source, line)
 
     experiments = [Experiment(**result_data[experiment]) for experiment in result_data]
     flagged_experiment_info = [{"iteration_number": experiment.Iteration_number, "station": experiment.location} for
@@ -109,9 +109,8 @@ def main():
         choice2 = input("Should this experiment  " + exper + " be deleted  from result file Y/n " )
         if choice2 == "Y" or choice2 == "y":
             del result_data[exper]
-            with open(result_file_name, "w") as result_file2:
-                result_file2.write(json.dumps(result_data, indent=2))
-            print("experiment  " + exper + " are deleted from result file " + result_file_name)
+            result_store.delete_results(source, line, [exper])
+            print("experiment  " + exper + " are deleted from results")
 
         if station == "IRBENE":
             st = "ir"
@@ -135,6 +134,7 @@ def main():
             except OSError as error:
                 print("Error: %s : %s" % (log_file, error.strerror))
 
+    result_store.close()
     sys.exit(0)
 
 
@@ -0,0 +1,239 @@
+"""
+Dynamic spectrum of source, spectra of all epochs regridded to common velocity grid in epoch x velocity array.
+Array is kept in cache file and only new or changed output files are read when it is updated
+"""
+import os
+import numpy as np
+import h5py
+from utils.processing_state import get_file_fingerprint
+from utils.spectrum_cache import get_spectrum
+
+STRING_DTYPE = h5py.special_dtype(vlen=str)
+
+
+def get_dynamic_spectrum_file_name(cache_path, source, line):
+    """
+
+    :param cache_path: directory for cache files
+    :param source: source
+    :param line: frequency
+    :return: dynamic spectrum file name
+    """
+    return os.path.join(cache_path, source + "_" + str(line) + "_dynamic_spectrum.h5")
+
+
+def get_output_file_mjd(file_name):
+    """
+
+    :param file_name: output file name <source>_<mjd>_<station>_<iteration>.h5
+    :return: modified Julian days of observation
+    """
+    return float(os.path.basename(file_name).split("_")[1])
+
+
+def read_output_spectrum(file_name):
+    """
+
+    :param file_name: output file name
+    :return: velocity and average polarization amplitude or None if output file has no corrected amplitude
+    """
+    data = get_spectrum(file_name)
+    if data is None:
+        return None
+    velocity = data[:, 0]
+    amplitude = data[:, 3]
+    if velocity[0] > velocity[-1]:
+        return velocity[::-1], amplitude[::-1]
+    return velocity, amplitude
+
+
+def create_velocity_grid(spectra, vmin=None, vmax=None):
+    """
+
+    :param spectra: list of velocity and amplitude of spectra
+    :param vmin: lowest velocity of grid or None to use lowest velocity of spectra
+    :param vmax: highest velocity of grid or None to use highest velocity of spectra
+    :return: velocity grid with channel width of first spectrum
+    """
+    step = np.median(np.abs(np.diff(spectra[0][0])))
+    if vmin is None:
+        vmin = min([velocity[0] for velocity, _ in spectra])
+    if vmax is None:
+        vmax = max([velocity[-1] for velocity, _ in spectra])
+    return np.arange(vmin, vmax + step / 2, step)
+
+
+def regrid_spectrum(velocity_grid, spectrum):
+    """
+
+    :param velocity_grid: common velocity grid
+    :param spectrum: velocity and amplitude or None
+    :return: amplitude on velocity grid, nan outside of spectrum
+    """
+    if spectrum is None:
+        return np.full(len(velocity_grid), np.nan)
+    velocity, amplitude = spectrum
+    return np.interp(velocity_grid, velocity, amplitude, left=np.nan, right=np.nan)
+
+
+def get_vrange_key(vmin, vmax):
+    """
+
+    :param vmin: lowest velocity or None
+    :param vmax: highest velocity or None
+    :return: velocity range stored in dynamic spectrum file
+    """
+    return str(vmin) + ":" + str(vmax)
+
+
+def write_dynamic_spectrum(dynamic_spectrum_file_name, output_files, vmin=None, vmax=None):
+    """
+    Dynamic spectrum file is replaced atomically
+
+    :param dynamic_spectrum_file_name: dynamic spectrum file name
+    :param output_files: output file names
+    :param vmin: lowest velocity or None
+    :param vmax: highest velocity or None
+    :return: None
+    """
+    spectra = [read_output_spectrum(output_file) for output_file in output_files]
+    if all([spectrum is None for spectrum in spectra]):
+        raise ValueError("Output files have no amplitude_corrected_not_smooht")
+    velocity_grid = create_velocity_grid([spectrum for spectrum in spectra if spectrum is not None], vmin, vmax)
+    tmp_file_name = dynamic_spectrum_file_name + "." + str(os.getpid()) + ".tmp"
+    with h5py.File(tmp_file_name, "w") as dynamic_spectrum:
+        dynamic_spectrum.attrs["vrange"] = get_vrange_key(vmin, vmax)
+        dynamic_spectrum.create_dataset("velocity", data=velocity_grid)
+        dynamic_spectrum.create_dataset("mjd", data=[get_output_file_mjd(output_file)
+                                                     for output_file in output_files], maxshape=(None,))
+        dynamic_spectrum.create_dataset("file_name", data=[os.path.basename(output_file)
+                                                           for output_file in output_files],
+                                        dtype=STRING_DTYPE, maxshape=(None,))
+        dynamic_spectrum.create_dataset("fingerprint", data=[get_file_fingerprint(output_file)
+                                                             for output_file in output_files],
+                                        dtype=STRING_DTYPE, maxshape=(None,))
+        dynamic_spectrum.create_dataset("flux", data=np.array([regrid_spectrum(velocity_grid, spectrum)
+                                                               for spectrum in spectra]).reshape(
+            (len(spectra), len(velocity_grid))), maxshape=(None, len(velocity_grid)),
+            chunks=(min(max(len(spectra), 1), 64), len(velocity_grid)))
+    os.replace(tmp_file_name, dynamic_spectrum_file_name)
+
+
+def get_strings(dataset):
+    """
+
+    :param dataset: string dataset
+    :return: list of str, newer h5py versions read variable length strings as bytes
+    """
+    return [value.decode() if isinstance(value, bytes) else value for value in dataset[()]]
+
+
+def open_dynamic_spectrum_file(dynamic_spectrum_file_name):
+    """
+
+    :param dynamic_spectrum_file_name: dynamic spectrum file name
+    :return: dynamic spectrum file opened for update or None if file does not exist or is damaged
+    """
+    if not os.path.isfile(dynamic_spectrum_file_name):
+        return None
+    try:
+        return h5py.File(dynamic_spectrum_file_name, "r+")
+    except OSError:
+        return None
+
+
+def update_dynamic_spectrum_file(dynamic_spectrum_file_name, output_files, vmin=None, vmax=None):
+    """
+    New output files are appended and changed output files are regridded again,
+    file is rebuilt if output files are removed or velocity range is changed
+
+    :param dynamic_spectrum_file_name: dynamic spectrum file name
+    :param output_files: output file names
+    :param vmin: lowest velocity or None
+    :param vmax: highest velocity or None
+    :return: None
+    """
+    output_files_by_name = {os.path.basename(output_file): output_file for output_file in output_files}
+    dynamic_spectrum = open_dynamic_spectrum_file(dynamic_spectrum_file_name)
+    if dynamic_spectrum is None:
+        write_dynamic_spectrum(dynamic_spectrum_file_name, output_files, vmin, vmax)
+        return
+
+    with dynamic_spectrum:
+        stored_file_names = get_strings(dynamic_spectrum["file_name"])
+        rebuild = dynamic_spectrum.attrs["vrange"] != get_vrange_key(vmin, vmax) or \
+            any([name not in output_files_by_name for name in stored_file_names])
+
+        if not rebuild:
+            velocity_grid = dynamic_spectrum["velocity"][()]
+            stored_fingerprints = get_strings(dynamic_spectrum["fingerprint"])
+            for row, name in enumerate(stored_file_names):
+                fingerprint = get_file_fingerprint(output_files_by_name[name])
+                if fingerprint != stored_fingerprints[row]:
+                    dynamic_spectrum["flux"][row] = regrid_spectrum(
+                        velocity_grid, read_output_spectrum(output_files_by_name[name]))
+                    dynamic_spectrum["fingerprint"][row] = fingerprint
+
+            stored_file_names = set(stored_file_names)
+            new_output_files = [output_files_by_name[name] for name in sorted(output_files_by_name)
+                                if name not in stored_file_names]
+            if len(new_output_files) > 0:
+                size = len(stored_file_names) + len(new_output_files)
+                for key in ["mjd", "file_name", "fingerprint", "flux"]:
+                    dynamic_spectrum[key].resize(size, axis=0)
+                dynamic_spectrum["mjd"][-len(new_output_files):] = [get_output_file_mjd(output_file)
+                                                                    for output_file in new_output_files]
+                dynamic_spectrum["file_name"][-len(new_output_files):] = [os.path.basename(output_file)
+                                                                          for output_file in new_output_files]
+                dynamic_spectrum["fingerprint"][-len(new_output_files):] = [get_file_fingerprint(output_file)
+                                                                            for output_file in new_output_files]
+                dynamic_spectrum["flux"][-len(new_output_files):] = np.array([
+                    regrid_spectrum(velocity_grid, read_output_spectrum(output_file))
+                    for output_file in new_output_files])
+
+    if rebuild:
+        write_dynamic_spectrum(dynamic_spectrum_file_name, output_files, vmin, vmax)
+
+
+def load_dynamic_spectrum(output_path, cache_path, source, line, vmin=None, vmax=None):
+    """
+
+    :param output_path: output file path
+    :param cache_path: directory for cache files
+    :param source: source
+    :param line: frequency
+    :param vmin: lowest velocity or None
+    :param vmax: highest velocity or None
+    :return: modified Julian days of epochs, velocity grid and flux density with epochs in rows sorted by time,
+    epochs without corrected amplitude are left out
+    """
+    output_dir = output_path + str(line) + "/" + source + "/"
+    output_files = sorted([output_dir + file_name for file_name in os.listdir(output_dir)
+                           if file_name.startswith(source + "_") and file_name.endswith(".h5")])
+    if not os.path.exists(cache_path):
+        os.makedirs(cache_path, exist_ok=True)
+
+    dynamic_spectrum_file_name = get_dynamic_spectrum_file_name(cache_path, source, line)
+    update_dynamic_spectrum_file(dynamic_spectrum_file_name, output_files, vmin, vmax)
+
+    with h5py.File(dynamic_spectrum_file_name, "r") as dynamic_spectrum:
+        mjd = dynamic_spectrum["mjd"][()]
+        velocity_grid = dynamic_spectrum["velocity"][()]
+        flux = dynamic_spectrum["flux"][()]
+
+    observed = ~np.all(np.isnan(flux), axis=1)
+    order = np.argsort(mjd[observed], kind="mergesort")
+    return mjd[observed][order], velocity_grid, flux[observed][order]
+
+
+def get_cell_edges(centers):
+    """
+
+    :param centers: sorted cell centers, e.g. velocity grid or epochs
+    :return: cell edges halfway between centers for mesh plot
+    """
+    centers = np.asarray(centers, dtype=float)
+    if len(centers) == 1:
+        return np.array([centers[0] - 0.5, centers[0] + 0.5])
+    middles = (centers[1:] + centers[:-1]) / 2
+    return np.concatenate([[2 * centers[0] - middles[0]], middles, [2 * centers[-1] - middles[-1]]])
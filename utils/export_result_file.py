@@ -0,0 +1,58 @@
+#! /usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""
+Export results of source and line from result store to legacy result file
+"""
+import sys
+import os
+import argparse
+from functools import lru_cache
+
+PACKAGE_PARENT = '..'
+SCRIPT_DIR = os.path.dirname(os.path.realpath(os.path.join(os.getcwd(), os.path.expanduser(__file__))))
+sys.path.append(os.path.normpath(os.path.join(SCRIPT_DIR, PACKAGE_PARENT)))
+
+from parsers.configparser_ import load_config
+from utils.result_store import ResultStore
+
+
+@lru_cache(maxsize=None)
+def parse_arguments():
+    """
+
+    :return: dict with passed args to script
+    """
+    parser = argparse.ArgumentParser(description='''Export results to result file <source>_<line>.json. ''')
+    parser.add_argument("source", help="source name", type=str)
+    parser.add_argument("line", help="Observed frequency", type=int)
+    parser.add_argument("-c", "--config", help="Configuration cfg file",
+                        type=str, default="config/config.cfg")
+    parser.add_argument("-v", "--version", action="version", version='%(prog)s - Version 1.0')
+    args = parser.parse_args()
+    return args
+
+
+def get_args(key):
+    """
+
+    :param key: argument key
+    :return: to script passed argument value
+    """
+    return str(parse_arguments().__dict__[key])
+
+
+def main():
+    """
+
+    :return: None
+    """
+    result_store = ResultStore(load_config(get_args("config")).get_path("resultFilePath"))
+    result_file_name = result_store.export_result_file(get_args("source"), get_args("line"))
+    result_store.close()
+    print("Results are exported to " + result_file_name)
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
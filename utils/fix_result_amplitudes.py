@@ -7,7 +7,7 @@ If output file is changed manually, run this script to change result file
 import sys
 import os
 import argparse
-import json
+from functools import lru_cache
 import h5py
 import numpy as np
 
@@ -16,10 +16,12 @@ PACKAGE_PARENT = '..'
 SCRIPT_DIR = os.path.dirname(os.path.realpath(os.path.join(os.getcwd(), os.path.expanduser(__file__))))
 sys.path.append(os.path.normpath(os.path.join(SCRIPT_DIR, PACKAGE_PARENT)))
 
-from parsers.configparser_ import ConfigParser
+from parsers.configparser_ import load_config
 from utils.help import get_iteration_from_output_file
+from utils.result_store import ResultStore
 
 
+@lru_cache(maxsize=None)
 def parse_arguments():
     """
 
@@ -52,7 +54,7 @@ def get_configs(section, key):
     :return: configuration file section key value
     """
     config_file_path = get_args("config")
-    config = ConfigParser(config_file_path)
+    config = load_config(config_file_path)
     return config.get_config(section, key)
 
 
@@ -96,9 +98,9 @@ def get_local_max(data_tmp, source_velocities, index_range_for_local_maxima):
     return (max_amplitudes_u1, max_amplitudes_u9, max_amplitudes_uavg)
 
 
-def change_result_amplitudes(output_files, result_file, output_file_path, source_velocities, index_range_for_local_maxima, source, type_of_observation, line):
-    with open(result_file) as result:
-        result_json = json.load(result)
+def change_result_amplitudes(output_files, result_store, output_file_path, source_velocities, index_range_for_local_maxima, source, type_of_observation, line):
+    result_json = result_store.get_results(source, line)
+    changed_results = dict()
 
     for output_file in output_files:
         iteration = get_iteration_from_output_file(output_file)
@@ -109,16 +111,14 @@ def change_result_amplitudes(output_files, result_file, output_file_path, source
             for key in result_json.keys():
                 if key.endswith( "_" + str( iteration ) ):
                     if result_json[key]["type"] == type_of_observation:
-                        result_json[key]["polarizationU1"] = max_apmlitudes_u1
-                        result_json[key]["polarizationU9"] = max_apmlitudes_u9
-                        result_json[key]["polarizationAVG"] = max_apmlitudes_uavg
+                        changed_results[key] = {"polarizationU1": max_apmlitudes_u1,
+                                                "polarizationU9": max_apmlitudes_u9,
+                                                "polarizationAVG": max_apmlitudes_uavg}
 
         else:
             print("Output " + output_file + " file has no amplitude_corrected_not_smooht colomm")
 
-    result_file = open(result_file, "w")
-    result_file.write(json.dumps(result_json, indent=2))
-    result_file.close()
+    result_store.update_results(source, line, changed_results)
 
 
 def main():
@@ -126,9 +126,10 @@ def main():
     result_file_path = get_configs('paths', "resultFilePath")
     source_velocities = get_configs('velocities', get_args("source") + "_" + get_args("line")).replace(" ", "").split(",")
     index_range_for_local_maxima = int( get_configs('parameters', "index_range_for_local_maxima"))
-    result_file = result_file_path + get_args("source") + "_" + get_args("line") + ".json"
+    result_store = ResultStore(result_file_path)
     output_files = os.listdir(output_file_path + get_args("line") + "/" + get_args("source"))
-    change_result_amplitudes(output_files, result_file, output_file_path, source_velocities, index_range_for_local_maxima, get_args("source"), get_args("type"), get_args("line"))
+    change_result_amplitudes(output_files, result_store, output_file_path, source_velocities, index_range_for_local_maxima, get_args("source"), get_args("type"), get_args("line"))
+    result_store.close()
 
     sys.exit()
 
@@ -0,0 +1,74 @@
+"""
+Journal of flag changes of monitoring observations, changes are written to result store in batches
+"""
+from utils.result_store import ResultStore
+
+
+def get_observation_key(station, iteration, date, time):
+    """
+
+    :param station: station of observation
+    :param iteration: iteration number
+    :param date: date of observation or None
+    :param time: time of observation or None
+    :return: key of observation
+    """
+    return str(station), str(iteration), date, time
+
+
+class FlagJournal:
+    """
+    Flag changes are kept in memory until flush, the last change of experiment wins
+    """
+
+    def __init__(self, result_path, source, line, results):
+        self.result_path = result_path
+        self.source = source
+        self.line = line
+        self.experiments = dict()
+        for experiment in results:
+            result = results[experiment]
+            key = get_observation_key(result.get("location"), result.get("Iteration_number"),
+                                      result.get("Date"), result.get("time"))
+            self.experiments.setdefault(key, []).append(experiment)
+        self.pending = dict()
+
+    def set_flag(self, station, iteration, date, time, flag):
+        """
+
+        :param station: station of observation
+        :param iteration: iteration number
+        :param date: date of observation or None
+        :param time: time of observation or None
+        :param flag: True to flag, False to un flag
+        :return: experiment names of observation
+        """
+        experiments = self.experiments.get(get_observation_key(station, iteration, date, time), [])
+        for experiment in experiments:
+            self.pending[experiment] = flag
+        return experiments
+
+    def has_pending(self):
+        """
+
+        :return: True if there are not written changes
+        """
+        return len(self.pending) > 0
+
+    def flush(self):
+        """
+        All pending changes are written in one transaction
+
+        :return: number of written changes
+        """
+        if not self.has_pending():
+            return 0
+
+        changed_results = {experiment: {"flag": self.pending[experiment]} for experiment in self.pending}
+        result_store = ResultStore(self.result_path)
+        try:
+            result_store.update_results(self.source, self.line, changed_results)
+        finally:
+            result_store.close()
+        self.pending.clear()
+        return len(changed_results)
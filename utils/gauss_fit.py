@@ -0,0 +1,116 @@
+"""
+Decomposition of spectrum into Gaussian lines
+"""
+from collections import namedtuple
+import numpy as np
+from scipy.optimize import least_squares
+
+GaussFitResult = namedtuple("GaussFitResult", ["amplitudes", "means", "stddevs", "areas",
+                                               "amplitude_errors", "mean_errors", "stddev_errors", "success"])
+
+
+def gauss_model(velocity, parameters):
+    """
+
+    :param velocity: velocities of spectrum channels
+    :param parameters: amplitude, mean and stddev of each line one after another
+    :return: sum of Gaussian lines
+    """
+    amplitudes, means, stddevs = np.reshape(parameters, (-1, 3)).T
+    return np.dot(amplitudes, np.exp(-0.5 * ((velocity - means[:, None]) / stddevs[:, None]) ** 2))
+
+
+def gauss_jacobian(velocity, parameters):
+    """
+
+    :param velocity: velocities of spectrum channels
+    :param parameters: amplitude, mean and stddev of each line one after another
+    :return: derivatives of sum of Gaussian lines by parameters, channels in rows
+    """
+    amplitudes, means, stddevs = np.reshape(parameters, (-1, 3)).T
+    distance = (velocity - means[:, None]) / stddevs[:, None]
+    exponent = np.exp(-0.5 * distance ** 2)
+    jacobian = np.empty((len(parameters), len(velocity)))
+    jacobian[0::3] = exponent
+    jacobian[1::3] = amplitudes[:, None] * exponent * distance / stddevs[:, None]
+    jacobian[2::3] = amplitudes[:, None] * exponent * distance ** 2 / stddevs[:, None]
+    return jacobian.T
+
+
+def get_initial_parameters(velocity, amplitude, gauss_lines, previous=None, stddev=0.05):
+    """
+    Amplitudes are always taken from spectrum, means and stddevs of lines change little between epochs
+
+    :param velocity: velocities of spectrum channels
+    :param amplitude: amplitudes of spectrum channels
+    :param gauss_lines: velocities of lines
+    :param previous: successful fit of previous epoch or None
+    :param stddev: stddev of lines without previous fit
+    :return: initial parameters
+    """
+    indexes = [(np.abs(velocity - float(line))).argmin() for line in gauss_lines]
+    amplitudes = [np.max(amplitude[max(index - 5, 0):index + 5]) for index in indexes]
+    if previous is not None and previous.success and len(previous.means) == len(gauss_lines):
+        means = previous.means
+        stddevs = previous.stddevs
+    else:
+        means = [float(line) for line in gauss_lines]
+        stddevs = [stddev] * len(gauss_lines)
+    return np.column_stack([amplitudes, means, stddevs]).ravel()
+
+
+def fit_gauss(velocity, amplitude, gauss_lines, previous=None, max_stddev=0.15):
+    """
+
+    :param velocity: velocities of spectrum channels
+    :param amplitude: amplitudes of spectrum channels
+    :param gauss_lines: velocities of lines
+    :param previous: successful fit of previous epoch used as warm start or None
+    :param max_stddev: upper bound of line stddev
+    :return: GaussFitResult with numeric arrays for each line
+    """
+    velocity = np.asarray(velocity, dtype=float)
+    amplitude = np.asarray(amplitude, dtype=float)
+    initial_parameters = get_initial_parameters(velocity, amplitude, gauss_lines, previous)
+    lower_bounds = np.tile([-np.inf, -np.inf, 0.0], len(gauss_lines))
+    upper_bounds = np.tile([np.inf, np.inf, max_stddev], len(gauss_lines))
+    # start must be strictly inside bounds
+    initial_parameters[2::3] = np.clip(initial_parameters[2::3], 1e-3 * max_stddev, 0.999 * max_stddev)
+
+    solution = least_squares(lambda parameters: gauss_model(velocity, parameters) - amplitude,
+                             initial_parameters, jac=lambda parameters: gauss_jacobian(velocity, parameters),
+                             bounds=(lower_bounds, upper_bounds), method="trf", x_scale="jac")
+
+    degrees_of_freedom = max(len(velocity) - len(initial_parameters), 1)
+    residual_variance = 2 * solution.cost / degrees_of_freedom
+    covariance = np.linalg.pinv(np.dot(solution.jac.T, solution.jac)) * residual_variance
+    errors = np.sqrt(np.abs(np.diag(covariance)))
+
+    amplitudes, means, stddevs = np.reshape(solution.x, (-1, 3)).T
+    areas = amplitudes * stddevs * np.sqrt(2 * np.pi)
+    return GaussFitResult(amplitudes, means, stddevs, areas,
+                          errors[0::3], errors[1::3], errors[2::3], bool(solution.success))
+
+
+class GaussFitter:
+    """
+    Gaussian decomposition of epochs of one source given in order of time, each fit starts from previous epoch.
+    Fitter is created for one batch, so results of batch do not depend on earlier fits
+    """
+
+    def __init__(self, gauss_lines, max_stddev=0.15):
+        self.gauss_lines = tuple(gauss_lines)
+        self.max_stddev = max_stddev
+        self.previous = None
+
+    def fit(self, velocity, amplitude):
+        """
+
+        :param velocity: velocities of spectrum channels
+        :param amplitude: amplitudes of spectrum channels
+        :return: GaussFitResult
+        """
+        result = fit_gauss(velocity, amplitude, self.gauss_lines, self.previous, self.max_stddev)
+        if result.success:
+            self.previous = result
+        return result
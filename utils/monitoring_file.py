@@ -0,0 +1,227 @@
+"""
+Typed monitoring file with one record for each observation
+"""
+import os
+import glob
+import numpy as np
+
+STATION_LENGTH = 16
+MJD_EPOCH = np.datetime64("1858-11-17T00:00:00", "s")
+
+
+def get_monitoring_dtype(component_count):
+    """
+
+    :param component_count: number of source velocity components
+    :return: dtype of monitoring record
+    """
+    return np.dtype([("mjd", "<f8"), ("station", "<U" + str(STATION_LENGTH)), ("iteration", "<i8"),
+                     ("u1", "<f8", (component_count,)), ("u9", "<f8", (component_count,)),
+                     ("avg", "<f8", (component_count,))])
+
+
+def get_monitoring_file_name(monitoring_path, source, line):
+    """
+
+    :param monitoring_path: monitoring file path
+    :param source: source
+    :param line: frequency
+    :return: monitoring file name
+    """
+    return monitoring_path + source + "_" + str(line) + ".npy"
+
+
+def create_monitoring_data(mjd, stations, iterations, u1, u9, avg):
+    """
+
+    :param mjd: modified Julian days of observations
+    :param stations: stations of observations
+    :param iterations: iteration numbers of observations
+    :param u1: left polarization flux density of components, observations in rows
+    :param u9: right polarization flux density of components, observations in rows
+    :param avg: average polarization flux density of components, observations in rows
+    :return: monitoring records
+    """
+    avg = np.asarray(avg, dtype=float)
+    if avg.ndim < 2:
+        avg = avg.reshape(len(mjd), -1 if len(mjd) > 0 else 0)
+    data = np.empty(len(mjd), dtype=get_monitoring_dtype(avg.shape[1]))
+    data["mjd"] = mjd
+    data["station"] = stations
+    data["iteration"] = iterations
+    data["u1"] = np.reshape(u1, avg.shape)
+    data["u9"] = np.reshape(u9, avg.shape)
+    data["avg"] = avg
+    return data
+
+
+def save_monitoring_data(file_name, data):
+    """
+    Monitoring file is replaced atomically, readers never see partly written file
+
+    :param file_name: monitoring file name
+    :param data: monitoring records
+    :return: None
+    """
+    tmp_file_name = file_name + "." + str(os.getpid()) + ".tmp.npy"
+    np.save(tmp_file_name, data)
+    os.replace(tmp_file_name, file_name)
+
+
+def convert_legacy_monitoring_data(legacy_data):
+    """
+
+    :param legacy_data: object array with dates wrapped in list and average flux density of each component
+    :return: monitoring records, station, iteration and polarizations other than average are not known
+    """
+    mjd = np.asarray(legacy_data[0][0], dtype=float)
+    avg = np.transpose([np.asarray(component, dtype=float) for component in legacy_data[1:]])
+    unknown = np.full(avg.shape, np.nan)
+    return create_monitoring_data(mjd, "", -1, unknown, unknown, avg)
+
+
+def load_monitoring_data(file_name, mmap_mode="r"):
+    """
+
+    :param file_name: monitoring file name
+    :param mmap_mode: memory map mode of numpy load
+    :return: monitoring records
+    """
+    try:
+        return np.load(file_name, mmap_mode=mmap_mode)
+    except ValueError:
+        # monitoring files of earlier versions are pickled object arrays
+        return convert_legacy_monitoring_data(np.load(file_name, allow_pickle=True))
+
+
+def get_monitoring_rows(data):
+    """
+
+    :param data: monitoring records
+    :return: array with modified Julian days in first row and average flux density of components in next rows
+    """
+    return np.vstack([data["mjd"], np.transpose(data["avg"])])
+
+
+def convert_old_monitoring_dates(dates):
+    """
+    Dates of old monitoring files have no separator between date and time, e.g. 2015-03-2111:45:02
+
+    :param dates: dates of old monitoring file
+    :return: modified Julian days
+    """
+    iso_dates = np.array([date[:10] + "T" + date[10:] for date in dates], dtype="datetime64[s]")
+    return (iso_dates - MJD_EPOCH) / np.timedelta64(1, "D")
+
+
+def load_old_monitoring_data(file_name, component_count):
+    """
+
+    :param file_name: old monitoring file name
+    :param component_count: number of source velocity components
+    :return: monitoring records, only average polarization flux density is known,
+    components missing in file are nan and extra are left out
+    """
+    old_data = np.loadtxt(file_name, dtype=str, ndmin=2)
+    avg = old_data[:, 1:].astype(float)
+    unknown = np.full(avg.shape, np.nan)
+    return resize_monitoring_data(create_monitoring_data(convert_old_monitoring_dates(old_data[:, 0]),
+                                                         "", -1, unknown, unknown, avg), component_count)
+
+
+def get_file_key(file_name):
+    """
+
+    :param file_name: file name
+    :return: size and modification time of file or 'none' if file does not exist
+    """
+    if not os.path.isfile(file_name):
+        return "none"
+    stat = os.stat(file_name)
+    return str(stat.st_size) + "_" + str(stat.st_mtime_ns)
+
+
+def get_merged_cache_file_name(old_monitoring_file, new_monitoring_file, cache_dir):
+    """
+
+    :param old_monitoring_file: old monitoring file name
+    :param new_monitoring_file: monitoring file name
+    :param cache_dir: directory for binary cache files
+    :return: cache file name for current size and modification time of both files
+    """
+    return os.path.join(cache_dir, "merged_" + os.path.basename(new_monitoring_file)[:-4] + "_" +
+                        get_file_key(old_monitoring_file) + "_" + get_file_key(new_monitoring_file) + ".npy")
+
+
+def resize_monitoring_data(data, component_count):
+    """
+    Monitoring file can be written when source had other number of velocity components in configuration
+
+    :param data: monitoring records
+    :param component_count: number of source velocity components
+    :return: monitoring records with component_count components, missing components are nan, extra are left out
+    """
+    data = np.asarray(data)
+    if data.dtype == get_monitoring_dtype(component_count):
+        return data
+
+    resized = np.empty(len(data), dtype=get_monitoring_dtype(component_count))
+    for key in ["mjd", "station", "iteration"]:
+        resized[key] = data[key]
+    count = min(component_count, data.dtype["avg"].shape[0])
+    for key in ["u1", "u9", "avg"]:
+        resized[key] = np.nan
+        resized[key][:, :count] = data[key][:, :count]
+    return resized
+
+
+def merge_monitoring_data(old_monitoring_file, new_monitoring_file, component_count):
+    """
+
+    :param old_monitoring_file: old monitoring file name
+    :param new_monitoring_file: monitoring file name
+    :param component_count: number of source velocity components
+    :return: monitoring records of old monitoring file followed by records of monitoring file
+    """
+    parts = []
+    if os.path.isfile(old_monitoring_file):
+        parts.append(load_old_monitoring_data(old_monitoring_file, component_count))
+    if os.path.isfile(new_monitoring_file) or len(parts) == 0:
+        parts.append(load_monitoring_data(new_monitoring_file))
+    return np.concatenate([resize_monitoring_data(part, component_count) for part in parts])
+
+
+def load_merged_monitoring_data(old_monitoring_file, new_monitoring_file, component_count, cache_dir=None):
+    """
+    Merged records are cached until old monitoring file or monitoring file is changed
+
+    :param old_monitoring_file: old monitoring file name
+    :param new_monitoring_file: monitoring file name
+    :param component_count: number of source velocity components
+    :param cache_dir: directory for binary cache files, if None cache is not used
+    :return: monitoring records of old monitoring file followed by records of monitoring file
+    """
+    if cache_dir is None:
+        return merge_monitoring_data(old_monitoring_file, new_monitoring_file, component_count)
+
+    cache_file_name = get_merged_cache_file_name(old_monitoring_file, new_monitoring_file, cache_dir)
+    if os.path.isfile(cache_file_name):
+        # configuration can be changed after cache file is written
+        return resize_monitoring_data(np.load(cache_file_name), component_count)
+
+    data = merge_monitoring_data(old_monitoring_file, new_monitoring_file, component_count)
+
+    if not os.path.exists(cache_dir):
+        os.makedirs(cache_dir, exist_ok=True)
+    save_monitoring_data(cache_file_name, data)
+
+    pattern = os.path.join(glob.escape(cache_dir),
+                           "merged_" + glob.escape(os.path.basename(new_monitoring_file)[:-4]) + "_*.npy")
+    for stale_file in glob.glob(pattern):
+        # temporary files of concurrent writers are kept
+        if stale_file != cache_file_name and not stale_file.endswith(".tmp.npy"):
+            try:
+                os.remove(stale_file)
+            except OSError:
+                pass
+    return data
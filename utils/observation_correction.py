@@ -7,7 +7,7 @@ Correct observation by given factor
 import sys
 import os
 import argparse
-import json
+from functools import lru_cache
 import h5py
 import numpy as np
 from help import Experiment, get_iteration_from_output_file
@@ -16,9 +16,11 @@ PACKAGE_PARENT = '..'
 SCRIPT_DIR = os.path.dirname(os.path.realpath(os.path.join(os.getcwd(), os.path.expanduser(__file__))))
 sys.path.append(os.path.normpath(os.path.join(SCRIPT_DIR, PACKAGE_PARENT)))
 
-from parsers.configparser_ import ConfigParser
+from parsers.configparser_ import load_config
+from utils.result_store import ResultStore
 
 
+@lru_cache(maxsize=None)
 def parse_arguments():
     """
 
@@ -54,7 +56,7 @@ def get_configs(section, key):
     :return: configuration file section key value
     """
     config_file_path = get_args("config")
-    config = ConfigParser(config_file_path)
+    config = load_config(config_file_path)
     return config.get_config(section, key)
 
 
@@ -74,11 +76,10 @@ def correct_output_file(output_dir, file, factor):
     output_data.close()
 
 
-def correct_result_file(result_file_name, iteration_to_fix, factor, station, type_of_back_end):
+def correct_result_file(result_store, source, line, iteration_to_fix, factor, station, type_of_back_end):
     iteration_to_fix = [str(i) for i in iteration_to_fix]
-
-    with open(result_file_name, "r") as result_file:
-        result_data = json.load(result_file)
+    result_data = result_store.get_results(source, line)
+    changed_results = dict()
 
     for experiment in result_data:
         if str(experiment.split("_")[-1]) in iteration_to_fix and \
@@ -91,10 +92,11 @@ def correct_result_file(result_file_name, iteration_to_fix, factor, station, typ
                                                                   factor
                 result_data[experiment]["polarizationAVG"][v][1] = result_data[experiment]["polarizationAVG"][v][1] * \
                                                                    factor
+            changed_results[experiment] = {"polarizationU1": result_data[experiment]["polarizationU1"],
+                                           "polarizationU9": result_data[experiment]["polarizationU9"],
+                                           "polarizationAVG": result_data[experiment]["polarizationAVG"]}
 
-    result_file = open(result_file_name, "w")
-    result_file.write(json.dumps(result_data, indent=2))
-    result_file.close()
+    result_store.update_results(source, line, changed_results)
 
 
 def main():
@@ -109,9 +111,8 @@ def main():
     line = get_args("line")
     station = get_args("station").upper()
     factor = float(get_args("factor"))
-    result_file_name = result_file_path + source + "_" + line + ".json"
-    with open(result_file_name, "r") as result_file:
-        result_data = json.load(result_file)
+    result_store = ResultStore(result_file_path)
+    result_data = result_store.get_results(source, line)
 
     output_dir = get_configs("paths", "outputFilePath") + "/" + get_args("line") + "/" + get_args("source") + "/"
     experiments = [Experiment(**result_data[experiment]) for experiment in result_data]
@@ -127,7 +128,8 @@ def main():
                 get_mjd_from_output_file(file) in mdj_for_experiments_to_fix:
             correct_output_file(output_dir, file,factor)
 
-    correct_result_file(result_file_name, iteration_to_fix, factor, station, type_of_back_end)
+    correct_result_file(result_store, source, line, iteration_to_fix, factor, station, type_of_back_end)
+    result_store.close()
     sys.exit()
 
 
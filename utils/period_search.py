@@ -0,0 +1,121 @@
+"""
+Lomb-Scargle period search of source components, periodograms and false alarm probability are cached
+"""
+import os
+import numpy as np
+from astropy.timeseries import LombScargle
+
+SAMPLES_PER_PEAK = 20
+
+
+def get_periodogram_file_name(cache_path, source, line, component, epoch_count):
+    """
+
+    :param cache_path: directory for cache files
+    :param source: source
+    :param line: frequency
+    :param component: velocity of component
+    :param epoch_count: number of observations in time series
+    :return: periodogram file name
+    """
+    return os.path.join(cache_path, source + "_" + str(line) + "_" + str(component) + "_" +
+                        str(epoch_count) + "_periodogram.npz")
+
+
+def get_time_series(results, component_index, include_flagged=True):
+    """
+
+    :param results: dict with experiment names as keys and results as values
+    :param component_index: index of component in source velocities
+    :param include_flagged: if False flagged experiments are left out
+    :return: modified Julian days sorted by time and average polarization flux density of component
+    """
+    experiments = [results[experiment] for experiment in results
+                   if include_flagged or not results[experiment]["flag"]]
+    experiments.sort(key=lambda experiment: float(experiment["modifiedJulianDays"]))
+    time = [float(experiment["modifiedJulianDays"]) for experiment in experiments]
+    amplitude = [experiment["polarizationAVG"][component_index][1] for experiment in experiments]
+    return time, amplitude
+
+
+def compute_periodogram(time, amplitude):
+    """
+
+    :param time: modified Julian days of observations sorted by time
+    :param amplitude: flux density of component
+    :return: dict with frequency, power, max power, false alarm probability of max power and best period in days
+    """
+    time = np.asarray(time, dtype=float)
+    amplitude = np.asarray(amplitude, dtype=float)
+    error = amplitude * 0.1
+    ls = LombScargle(time, amplitude, error, fit_mean=True)
+
+    date_deltas = np.abs(np.diff(time))
+    nyquist_factor = 2 * np.max(date_deltas)
+    minimum_frequency = 1 / (np.abs(time[-1] - time[0]) / 2)
+    maximum_frequency = 1 / (2 * np.min(date_deltas[date_deltas > 0]))
+
+    frequency, power = ls.autopower(method='fastchi2', normalization='model',
+                                    nyquist_factor=nyquist_factor,
+                                    minimum_frequency=minimum_frequency,
+                                    maximum_frequency=maximum_frequency,
+                                    samples_per_peak=SAMPLES_PER_PEAK)
+
+    false_alarm = ls.false_alarm_probability(power.max(), method="bootstrap",
+                                             nyquist_factor=nyquist_factor,
+                                             minimum_frequency=minimum_frequency,
+                                             maximum_frequency=maximum_frequency,
+                                             samples_per_peak=SAMPLES_PER_PEAK)
+
+    return {"frequency": frequency, "power": power, "max_power": power.max(), "false_alarm": false_alarm,
+            "best_period": 1. / frequency[np.argmax(power)]}
+
+
+def save_periodogram(file_name, periodogram):
+    """
+    Periodogram file is replaced atomically
+
+    :param file_name: periodogram file name
+    :param periodogram: dict returned by compute_periodogram
+    :return: None
+    """
+    tmp_file_name = file_name + "." + str(os.getpid()) + ".tmp.npz"
+    np.savez(tmp_file_name, **periodogram)
+    os.replace(tmp_file_name, file_name)
+
+
+def load_periodogram(cache_path, source, line, component, time, amplitude):
+    """
+
+    :param cache_path: directory for cache files
+    :param source: source
+    :param line: frequency
+    :param component: velocity of component
+    :param time: modified Julian days of observations sorted by time
+    :param amplitude: flux density of component
+    :return: dict with frequency, power, max power, false alarm probability of max power and best period in days
+    """
+    file_name = get_periodogram_file_name(cache_path, source, line, component, len(time))
+    if os.path.isfile(file_name):
+        with np.load(file_name) as periodogram_file:
+            return {key: periodogram_file[key] for key in periodogram_file.files}
+
+    periodogram = compute_periodogram(time, amplitude)
+    if not os.path.exists(cache_path):
+        os.makedirs(cache_path, exist_ok=True)
+    save_periodogram(file_name, periodogram)
+    return periodogram
+
+
+def load_periodogram_job(job):
+    """
+
+    :param job: cache path, source, line, component, time and amplitude
+    :return: source, component, periodogram and error message or None
+    """
+    cache_path, source, line, component, time, amplitude = job
+    try:
+        return source, component, load_periodogram(cache_path, source, line, component, time, amplitude), None
+    except Exception as error:
+        # one short time series must not stop search of the others
+        return source, component, None, str(error)
@@ -147,9 +147,16 @@ class Plot(FigureCanvas):
         for xy in zip(xvalues, yvalues):
             ax.annotate('(%.2f, %.1f)' % xy, xy=xy, textcoords='data')
 
-    def addCursor(self, labels):
-        cursor = mplcursors.cursor(self.graph, hover=True, highlight=True)
-        cursor.connect("add", lambda sel: sel.annotation.set_text(labels[sel.target.index]))
+    def addCursor(self, labels, get_label_index=None, artists=None):
+        if getattr(self, "cursor", None) is not None:
+            self.cursor.remove()
+        if artists is None:
+            artists = self.graph
+        if get_label_index is None:
+            get_label_index = lambda artist, index: index
+        self.cursor = mplcursors.cursor(artists, hover=True, highlight=True)
+        self.cursor.connect("add", lambda sel: sel.annotation.set_text(
+            labels[get_label_index(sel.artist, sel.target.index)]))
 
     def annotation(self, xvalue, yvalue, text):
         self.ax = self.figure.add_subplot(111)
@@ -0,0 +1,186 @@
+"""
+Persistent processing state index of SDR iterations
+"""
+import os
+import sqlite3
+import h5py
+
+PROCESSING_STATE_FILE_NAME = "processing_state.db"
+SDR_STAGE = "sdr"
+ANALYSIS_STAGE = "analysis"
+
+
+def get_file_fingerprint(*file_names):
+    """
+
+    :param file_names: files or directories
+    :return: fingerprint from size and modification time of files
+    """
+    fingerprint = []
+    for file_name in file_names:
+        try:
+            stat = os.stat(file_name)
+            fingerprint.append(str(stat.st_size) + ":" + str(stat.st_mtime_ns))
+        except OSError:
+            fingerprint.append("missing")
+    return ";".join(fingerprint)
+
+
+def get_station_code(station_name):
+    """
+
+    :param station_name: station name in output file and result file
+    :return: station code used in data directory names
+    """
+    if station_name == "IRBENE16":
+        return "ib"
+    return "ir"
+
+
+def is_sdr_stage_needed(sdr_stage, analysis_stage, fingerprint):
+    """
+
+    :param sdr_stage: SDR stage row of iteration or None
+    :param analysis_stage: analysis stage row of iteration or None
+    :param fingerprint: current fingerprint of iteration data directory and log file
+    :return: True if iteration must be calibrated
+    """
+    if analysis_stage is not None:
+        # flagged iterations are calibrated again
+        return analysis_stage[2]
+
+    if sdr_stage is not None and sdr_stage[0] in (None, fingerprint) and os.path.isfile(sdr_stage[1]):
+        return False
+    return True
+
+
+class ProcessingState:
+    """
+    SQLite index recording which processing stages are done for each iteration
+    """
+
+    def __init__(self, state_file_name):
+        self.state_file_name = state_file_name
+        self.connection = sqlite3.connect(state_file_name)
+        with self.connection:
+            self.connection.execute("CREATE TABLE IF NOT EXISTS stages ("
+                                    "source TEXT, line TEXT, station TEXT, iteration TEXT, stage TEXT, "
+                                    "fingerprint TEXT, output_file TEXT, flag INTEGER DEFAULT 0, "
+                                    "PRIMARY KEY (source, line, station, iteration, stage))")
+            self.connection.execute("CREATE TABLE IF NOT EXISTS synced_files ("
+                                    "file_name TEXT PRIMARY KEY, fingerprint TEXT)")
+
+    def close(self):
+        """
+
+        :return: None
+        """
+        self.connection.close()
+
+    def is_synced(self, file_name, fingerprint):
+        """
+
+        :param file_name: synced file or directory
+        :param fingerprint: current fingerprint of file
+        :return: True if index is synced with this version of file
+        """
+        row = self.connection.execute("SELECT fingerprint FROM synced_files WHERE file_name = ?",
+                                      (file_name,)).fetchone()
+        return row is not None and row[0] == fingerprint
+
+    def set_synced(self, file_name, fingerprint):
+        """
+
+        :param file_name: synced file or directory
+        :param fingerprint: fingerprint of synced file
+        :return: None
+        """
+        self.connection.execute("INSERT OR REPLACE INTO synced_files VALUES (?, ?)", (file_name, fingerprint))
+
+    def mark_done(self, source, line, station, iteration, stage, fingerprint=None, output_file=None, flag=False):
+        """
+
+        :param source: source
+        :param line: frequency
+        :param station: station code
+        :param iteration: iteration number
+        :param stage: processing stage
+        :param fingerprint: fingerprint of stage input files
+        :param output_file: stage output file
+        :param flag: iteration is flagged
+        :return: None
+        """
+        with self.connection:
+            self.connection.execute("INSERT OR REPLACE INTO stages VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                                    (source, str(line), station, str(iteration), stage,
+                                     fingerprint, output_file, int(flag)))
+
+    def get_stages(self, source, line, stage):
+        """
+
+        :param source: source
+        :param line: frequency
+        :param stage: processing stage
+        :return: dict with (station, iteration) keys and (fingerprint, output file, flag) values
+        """
+        rows = self.connection.execute("SELECT station, iteration, fingerprint, output_file, flag FROM stages "
+                                       "WHERE source = ? AND line = ? AND stage = ?",
+                                       (source, str(line), stage))
+        return {(station, iteration): (fingerprint, output_file, bool(flag))
+                for station, iteration, fingerprint, output_file, flag in rows}
+
+    def sync_results(self, source, line, result_store):
+        """
+        Analysis stage rows are rebuilt from result store
+
+        :param source: source
+        :param line: frequency
+        :param result_store: ResultStore
+        :return: None
+        """
+        rows = dict()
+        for experiment, (type_of_observation, flag) in result_store.get_flags(source, line).items():
+            if type_of_observation == "SDR":
+                station = get_station_code(experiment.split("_")[-2])
+                iteration = experiment.split("_")[-1]
+                rows[(station, iteration)] = rows.get((station, iteration), False) or flag
+
+        with self.connection:
+            self.connection.execute("DELETE FROM stages WHERE source = ? AND line = ? AND stage = ?",
+                                    (source, str(line), ANALYSIS_STAGE))
+            self.connection.executemany("INSERT INTO stages VALUES (?, ?, ?, ?, ?, NULL, NULL, ?)",
+                                        [(source, str(line), station, iteration, ANALYSIS_STAGE, int(flag))
+                                         for (station, iteration), flag in rows.items()])
+
+    def sync_outputs(self, source, line, output_dir):
+        """
+        Output files not yet in index are registered as done SDR stage when output directory is changed
+
+        :param source: source
+        :param line: frequency
+        :param output_dir: directory of sdr_fs.py output files for source and line
+        :return: None
+        """
+        fingerprint = get_file_fingerprint(output_dir)
+        if self.is_synced(output_dir, fingerprint):
+            return
+
+        known_output_files = {output_file for _, output_file, _ in self.get_stages(source, line, SDR_STAGE).values()}
+        rows = []
+        if os.path.isdir(output_dir):
+            for output_file in os.listdir(output_dir):
+                output_file_name = os.path.normpath(os.path.join(output_dir, output_file))
+                if not output_file.startswith(source) or output_file_name in known_output_files:
+                    continue
+
+                with h5py.File(output_file_name, "r") as input_data_file:
+                    if "amplitude" not in input_data_file:
+                        continue
+
+                station = get_station_code(output_file.split("_")[-2].split(".")[0])
+                iteration = output_file.split("_")[-1].split(".")[0]
+                rows.append((source, str(line), station, iteration, SDR_STAGE, None, output_file_name, 0))
+
+        with self.connection:
+            self.connection.executemany("INSERT OR IGNORE INTO stages VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self.set_synced(output_dir, fingerprint)
@@ -0,0 +1,197 @@
+"""
+SQLite store of monitoring results with export to legacy result files
+"""
+import os
+import json
+import sqlite3
+from contextlib import contextmanager
+from utils.processing_state import get_file_fingerprint
+
+RESULT_STORE_FILE_NAME = "results.db"
+
+
+class ResultStore:
+    """
+    Results of each experiment are kept in separate row, changes of one experiment do not rewrite others.
+    Legacy result file <source>_<line>.json is imported when it is changed by other tools
+    """
+
+    def __init__(self, result_path, timeout=60):
+        self.result_path = result_path
+        # transactions are started explicitly
+        self.connection = sqlite3.connect(result_path + RESULT_STORE_FILE_NAME, timeout=timeout, isolation_level=None)
+        with self.transaction():
+            self.connection.execute("CREATE TABLE IF NOT EXISTS results ("
+                                    "source TEXT, line TEXT, experiment TEXT, type TEXT, flag INTEGER, result TEXT, "
+                                    "PRIMARY KEY (source, line, experiment))")
+            self.connection.execute("CREATE TABLE IF NOT EXISTS legacy_files ("
+                                    "file_name TEXT PRIMARY KEY, fingerprint TEXT)")
+
+    def close(self):
+        """
+
+        :return: None
+        """
+        self.connection.close()
+
+    @contextmanager
+    def transaction(self):
+        """
+        Store is locked for writing from start of transaction, concurrent writers wait
+
+        :return: None
+        """
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self.connection.execute("ROLLBACK")
+            raise
+        self.connection.execute("COMMIT")
+
+    def get_result_file_name(self, source, line):
+        """
+
+        :param source: source
+        :param line: frequency
+        :return: legacy result file name
+        """
+        return self.result_path + source + "_" + str(line) + ".json"
+
+    def _set_result(self, source, line, experiment, result):
+        """
+
+        :param source: source
+        :param line: frequency
+        :param experiment: experiment name
+        :param result: result of experiment
+        :return: None
+        """
+        row = (result.get("type"), int(bool(result.get("flag"))), json.dumps(result), source, str(line), experiment)
+        # update keeps order of experiments
+        cursor = self.connection.execute("UPDATE results SET type = ?, flag = ?, result = ? "
+                                         "WHERE source = ? AND line = ? AND experiment = ?", row)
+        if cursor.rowcount == 0:
+            self.connection.execute("INSERT INTO results (type, flag, result, source, line, experiment) "
+                                    "VALUES (?, ?, ?, ?, ?, ?)", row)
+
+    def _get_result(self, source, line, experiment):
+        """
+
+        :param source: source
+        :param line: frequency
+        :param experiment: experiment name
+        :return: result of experiment or None
+        """
+        row = self.connection.execute("SELECT result FROM results WHERE source = ? AND line = ? AND experiment = ?",
+                                      (source, str(line), experiment)).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0])
+
+    def _set_legacy_fingerprint(self, file_name):
+        """
+
+        :param file_name: legacy result file name
+        :return: None
+        """
+        self.connection.execute("INSERT OR REPLACE INTO legacy_files VALUES (?, ?)",
+                                (file_name, get_file_fingerprint(file_name)))
+
+    def sync_legacy_file(self, source, line):
+        """
+        Experiments of legacy result file are merged into store when the file is changed by other tools,
+        experiments which are only in store are kept, so results not yet exported are not lost
+
+        :param source: source
+        :param line: frequency
+        :return: None
+        """
+        file_name = self.get_result_file_name(source, line)
+        if not os.path.isfile(file_name):
+            return
+
+        row = self.connection.execute("SELECT fingerprint FROM legacy_files WHERE file_name = ?",
+                                      (file_name,)).fetchone()
+        if row is not None and row[0] == get_file_fingerprint(file_name):
+            return
+
+        with open(file_name, "r") as result_data:
+            results = json.load(result_data)
+
+        with self.transaction():
+            for experiment in results:
+                self._set_result(source, line, experiment, results[experiment])
+            self._set_legacy_fingerprint(file_name)
+
+    def get_results(self, source, line):
+        """
+
+        :param source: source
+        :param line: frequency
+        :return: dict with experiment names as keys and results as values, the same as legacy result file
+        """
+        self.sync_legacy_file(source, line)
+        rows = self.connection.execute("SELECT experiment, result FROM results WHERE source = ? AND line = ? "
+                                       "ORDER BY rowid", (source, str(line)))
+        return {experiment: json.loads(result) for experiment, result in rows}
+
+    def get_flags(self, source, line):
+        """
+
+        :param source: source
+        :param line: frequency
+        :return: dict with experiment names as keys and (type, flag) values
+        """
+        self.sync_legacy_file(source, line)
+        rows = self.connection.execute("SELECT experiment, type, flag FROM results WHERE source = ? AND line = ?",
+                                       (source, str(line)))
+        return {experiment: (type_of_observation, bool(flag)) for experiment, type_of_observation, flag in rows}
+
+    def update_results(self, source, line, results):
+        """
+        Given keys of each experiment are changed, other keys are kept
+
+        :param source: source
+        :param line: frequency
+        :param results: dict with experiment names as keys and changed result keys as values
+        :return: None
+        """
+        self.sync_legacy_file(source, line)
+        with self.transaction():
+            for experiment in results:
+                result = self._get_result(source, line, experiment) or dict()
+                result.update(results[experiment])
+                self._set_result(source, line, experiment, result)
+
+    def delete_results(self, source, line, experiments):
+        """
+
+        :param source: source
+        :param line: frequency
+        :param experiments: experiment names
+        :return: None
+        """
+        self.sync_legacy_file(source, line)
+        with self.transaction():
+            self.connection.executemany("DELETE FROM results WHERE source = ? AND line = ? AND experiment = ?",
+                                        [(source, str(line), experiment) for experiment in experiments])
+
+    def export_result_file(self, source, line):
+        """
+        Legacy result file is replaced atomically
+
+        :param source: source
+        :param line: frequency
+        :return: legacy result file name
+        """
+        results = self.get_results(source, line)
+        file_name = self.get_result_file_name(source, line)
+        tmp_file_name = file_name + "." + str(os.getpid()) + ".tmp"
+        with open(tmp_file_name, "w") as output:
+            output.write(json.dumps(results, indent=2))
+
+        with self.transaction():
+            os.replace(tmp_file_name, file_name)
+            self._set_legacy_fingerprint(file_name)
+        return file_name
@@ -0,0 +1,75 @@
+"""
+Read SDR scan files with binary cache
+"""
+import os
+import glob
+import threading
+import numpy as np
+
+
+def get_cache_file_name(data_file_name, cache_dir):
+    """
+
+    :param data_file_name: SDR scan file name
+    :param cache_dir: directory for binary cache files
+    :return: cache file name for current size and modification time of scan file
+    """
+    stat = os.stat(data_file_name)
+    return os.path.join(cache_dir, os.path.basename(data_file_name) + "_" +
+                        str(stat.st_size) + "_" + str(stat.st_mtime_ns) + ".npy")
+
+
+def remove_stale_cache_files(data_file_name, cache_dir, cache_file_name):
+    """
+
+    :param data_file_name: SDR scan file name
+    :param cache_dir: directory for binary cache files
+    :param cache_file_name: valid cache file name
+    :return: None
+    """
+    pattern = os.path.join(glob.escape(cache_dir), glob.escape(os.path.basename(data_file_name)) + "_*.npy")
+    for stale_file in glob.glob(pattern):
+        if stale_file != cache_file_name:
+            try:
+                os.remove(stale_file)
+            except OSError:
+                pass
+
+
+def read_scan(data_file_name, cache_dir=None, mmap_mode=None):
+    """
+
+    :param data_file_name: SDR scan file name
+    :param cache_dir: directory for binary cache files, if None cache is not used
+    :param mmap_mode: numpy memory map mode for cache file
+    :return: array with columns frequency, polarization left, polarization right
+    """
+    if cache_dir is None:
+        return np.loadtxt(data_file_name, usecols=(0, 1, 2), ndmin=2)
+
+    cache_file_name = get_cache_file_name(data_file_name, cache_dir)
+    if os.path.isfile(cache_file_name):
+        return np.load(cache_file_name, mmap_mode=mmap_mode)
+
+    data = np.loadtxt(data_file_name, usecols=(0, 1, 2), ndmin=2)
+
+    # scans can be read by prefetch thread and main thread of one process at the same time
+    tmp_cache_file_name = cache_file_name + "." + str(os.getpid()) + "_" + str(threading.get_ident()) + ".tmp"
+    try:
+        if not os.path.exists(cache_dir):
+            os.makedirs(cache_dir, exist_ok=True)
+        with open(tmp_cache_file_name, "wb") as cache_file:
+            np.save(cache_file, data)
+        os.replace(tmp_cache_file_name, cache_file_name)
+    except OSError:
+        # cache is only optimization, unwritable or full cache directory must not stop processing
+        try:
+            os.remove(tmp_cache_file_name)
+        except OSError:
+            pass
+        return data
+    remove_stale_cache_files(data_file_name, cache_dir, cache_file_name)
+
+    if mmap_mode is not None:
+        return np.load(cache_file_name, mmap_mode=mmap_mode)
+    return data
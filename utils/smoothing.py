@@ -0,0 +1,87 @@
+"""
+Smoothing of spectra with cached convolution kernels
+"""
+from functools import lru_cache
+import numpy as np
+from scipy.ndimage import convolve1d
+from scipy.signal import fftconvolve
+
+# kernels longer than this are convolved with FFT
+FFT_KERNEL_SIZE = 64
+
+
+def gaussian_kernel(size, stddev):
+    """
+
+    :param size: number of kernel points
+    :param stddev: standard deviation in channels
+    :return: Gaussian kernel evaluated at channel centers
+    """
+    x = np.arange(size) - size // 2
+    return np.exp(-x ** 2 / (2.0 * stddev ** 2))
+
+
+def box_kernel(size, stddev):
+    """
+
+    :param size: number of kernel points
+    :param stddev: not used
+    :return: box kernel
+    """
+    return np.ones(size)
+
+
+def hanning_kernel(size, stddev):
+    """
+
+    :param size: number of kernel points
+    :param stddev: not used
+    :return: Hanning kernel without zero end points
+    """
+    return np.hanning(size + 2)[1:-1]
+
+
+KERNELS = {"gaussian": gaussian_kernel, "box": box_kernel, "hanning": hanning_kernel}
+
+
+@lru_cache(maxsize=None)
+def get_kernel(kernel="gaussian", size=19, stddev=3.0):
+    """
+
+    :param kernel: kernel name
+    :param size: number of kernel points, must be odd
+    :param stddev: standard deviation of Gaussian kernel in channels
+    :return: normalized kernel, read only as it is shared between calls
+    """
+    if kernel not in KERNELS:
+        raise ValueError("Unknown smoothing kernel " + kernel)
+    if size % 2 == 0:
+        raise ValueError("Kernel size must be odd")
+    kernel_array = KERNELS[kernel](size, stddev)
+    kernel_array = kernel_array / kernel_array.sum()
+    kernel_array.flags.writeable = False
+    return kernel_array
+
+
+def smooth(spectra, kernel="gaussian", size=19, stddev=3.0, axis=-1):
+    """
+    Spectra are extended with their edge values, the same as boundary 'extend' of astropy convolve
+
+    :param spectra: one spectrum or stack of spectra
+    :param kernel: kernel name
+    :param size: number of kernel points, must be odd
+    :param stddev: standard deviation of Gaussian kernel in channels
+    :param axis: channel axis of spectra
+    :return: smoothed spectra
+    """
+    spectra = np.asarray(spectra, dtype=float)
+    kernel_array = get_kernel(kernel, size, stddev)
+    if size <= FFT_KERNEL_SIZE:
+        return convolve1d(spectra, kernel_array, axis=axis, mode="nearest")
+
+    spectra = np.moveaxis(spectra, axis, -1)
+    pad_width = [(0, 0)] * (spectra.ndim - 1) + [(size // 2, size // 2)]
+    padded_spectra = np.pad(spectra, pad_width, mode="edge")
+    kernel_shape = (1,) * (spectra.ndim - 1) + (size,)
+    smoothed = fftconvolve(padded_spectra, kernel_array.reshape(kernel_shape), mode="valid")
+    return np.moveaxis(smoothed, -1, axis)
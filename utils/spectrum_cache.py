@@ -0,0 +1,37 @@
+"""
+Bounded cache of spectra read from output files, shared by views of one process
+"""
+import os
+from functools import lru_cache
+import h5py
+from utils.processing_state import get_file_fingerprint
+
+SPECTRUM_CACHE_SIZE = 256
+
+
+@lru_cache(maxsize=SPECTRUM_CACHE_SIZE)
+def read_spectrum(file_name, table, fingerprint):
+    """
+
+    :param file_name: absolute output file name
+    :param table: output file table
+    :param fingerprint: size and modification time of output file, changed file is read again
+    :return: read only array with columns velocity, polarization left, right and average or None if table is missing
+    """
+    with h5py.File(file_name, "r") as data_file:
+        if table not in data_file:
+            return None
+        data = data_file[table][()]
+    data.flags.writeable = False
+    return data
+
+
+def get_spectrum(file_name, table="amplitude_corrected_not_smooht"):
+    """
+    Least recently used spectra are dropped when cache is full
+
+    :param file_name: output file name
+    :param table: output file table
+    :return: read only array with columns velocity, polarization left, right and average or None if table is missing
+    """
+    return read_spectrum(os.path.abspath(file_name), table, get_file_fingerprint(file_name))
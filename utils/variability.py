@@ -0,0 +1,140 @@
+"""
+Variability and fluctuation index of source components computed for many time series at once
+"""
+import numpy as np
+from astropy.table import Table
+
+# flux density error model of monitoring observations in Jy
+ERROR_OFFSET = 1.5
+ERROR_FRACTION = 0.05
+
+
+def get_flux_errors(flux):
+    """
+
+    :param flux: flux density
+    :return: flux density errors
+    """
+    return ERROR_OFFSET + ERROR_FRACTION * flux
+
+
+def get_time_window(mjd, start=-1, stop=-1):
+    """
+
+    :param mjd: modified Julian days of observations
+    :param start: start date in MJD or -1
+    :param stop: stop date in MJD or -1
+    :return: slice of observations from nearest to start until nearest to stop
+    """
+    if start == -1 or stop == -1:
+        return slice(None)
+    mjd = np.asarray(mjd, dtype=float)
+    return slice(int(np.abs(mjd - start).argmin()), int(np.abs(mjd - stop).argmin()))
+
+
+def pad_time_series(series):
+    """
+
+    :param series: list of flux density arrays of different length
+    :return: array with time series in rows padded with nan at the end and number of observations in each row
+    """
+    counts = np.array([len(flux) for flux in series], dtype=int)
+    flux = np.full((len(series), counts.max() if len(series) > 0 else 0), np.nan)
+    for row, values in enumerate(series):
+        flux[row, :counts[row]] = values
+    return flux, counts
+
+
+def compute_indices(flux):
+    """
+    Observations are in last axis, nan values are not used, negative flux density is clipped to zero
+
+    :param flux: flux density of time series in rows
+    :return: dict with arrays count, mean, variance, variability_index and fluctuation_index for each time series
+    """
+    flux = np.clip(np.asarray(flux, dtype=float), 0, None)
+    valid = ~np.isnan(flux)
+    count = valid.sum(axis=-1)
+    # padding is zero in sums, flux density is not negative so zero padding does not change maximum
+    values = np.where(valid, flux, 0.0)
+    errors_squared = get_flux_errors(values) ** 2 * valid
+    weighted_values = values * errors_squared
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = values.sum(axis=-1) / count
+        squared_deviations = ((values - mean[..., None]) * valid) ** 2
+        std = np.sqrt(squared_deviations.sum(axis=-1) / count)
+        maximum = values.max(axis=-1)
+        minimum = np.where(valid, values, np.inf).min(axis=-1)
+
+        variance = squared_deviations.sum(axis=-1) / std ** 2
+        variability_index = ((maximum - std) - (minimum + std)) / ((maximum - std) + (minimum + std))
+        fluctuation_index = np.sqrt(np.abs((count / errors_squared.sum(axis=-1)) *
+                                           (((weighted_values * values).sum(axis=-1) -
+                                             mean * weighted_values.sum(axis=-1)) / (count - 1)) - 1)) / mean
+
+    return {"count": count, "mean": mean, "variance": variance,
+            "variability_index": variability_index, "fluctuation_index": fluctuation_index}
+
+
+def bootstrap_indices(flux, samples=1000, seed=None):
+    """
+    Observations of each time series are resampled with replacement
+
+    :param flux: flux density of time series in rows padded with nan at the end
+    :param samples: number of bootstrap samples
+    :param seed: seed of random generator
+    :return: dict with standard deviation of variability_index and fluctuation_index over samples
+    """
+    flux = np.asarray(flux, dtype=float)
+    counts = (~np.isnan(flux)).sum(axis=-1)
+    random_generator = np.random.RandomState(seed)
+    padding = np.arange(flux.shape[-1]) >= counts[:, None]
+
+    variability_indexes = np.empty((samples, flux.shape[0]))
+    fluctuation_indexes = np.empty((samples, flux.shape[0]))
+    for sample in range(0, samples):
+        indexes = (random_generator.random_sample(flux.shape) * counts[:, None]).astype(int)
+        resampled_flux = np.take_along_axis(flux, indexes, axis=-1)
+        resampled_flux[padding] = np.nan
+        indices = compute_indices(resampled_flux)
+        variability_indexes[sample] = indices["variability_index"]
+        fluctuation_indexes[sample] = indices["fluctuation_index"]
+
+    with np.errstate(invalid="ignore"):
+        return {"variability_index_error": np.nanstd(variability_indexes, axis=0),
+                "fluctuation_index_error": np.nanstd(fluctuation_indexes, axis=0)}
+
+
+def create_variability_table(time_series, start=-1, stop=-1, bootstrap_samples=0, seed=None):
+    """
+
+    :param time_series: list of (source, velocities, rows), rows have modified Julian days in first row and
+    flux density of components in next rows
+    :param start: start date in MJD or -1
+    :param stop: stop date in MJD or -1
+    :param bootstrap_samples: number of bootstrap samples for index errors, 0 if errors are not needed
+    :param seed: seed of random generator
+    :return: table with one row for each component of each source
+    """
+    sources = []
+    velocities = []
+    series = []
+    for source, source_velocities, rows in time_series:
+        window = get_time_window(rows[0], start, stop)
+        for index, velocity in enumerate(source_velocities):
+            sources.append(source)
+            velocities.append(velocity)
+            series.append(np.asarray(rows[index + 1], dtype=float)[window])
+
+    flux, _ = pad_time_series(series)
+    indices = compute_indices(flux)
+    table = Table([sources, velocities], names=("source", "velocity"))
+    for key in ["count", "mean", "variance", "variability_index", "fluctuation_index"]:
+        table[key] = indices[key]
+
+    if bootstrap_samples > 0:
+        errors = bootstrap_indices(flux, bootstrap_samples, seed)
+        for key in ["variability_index_error", "fluctuation_index_error"]:
+            table[key] = errors[key]
+    return table
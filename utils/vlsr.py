@@ -1,12 +1,90 @@
 """
  Compute Local Standard of Rest
 """
+import os
 import astropy.units as u
 import numpy as np
 from astropy.coordinates import SkyCoord, FK5, EarthLocation
 from astropy.time import Time
 from jplephem.spk import SPK
 
+KERNEL_FILE_NAME = "de435.bsp"
+EARTH_VELOCITY_TABLE_FILE_NAME = "earth_velocity_table.npz"
+KERNELS = {}
+EARTH_VELOCITY_TABLE = {}
+
+
+def get_kernel(kernel_file_name=KERNEL_FILE_NAME):
+    """
+
+    :param kernel_file_name: ephemeris kernel file name
+    :return: ephemeris kernel, kernel is opened once per process
+    """
+    if kernel_file_name not in KERNELS:
+        KERNELS[kernel_file_name] = SPK.open(kernel_file_name)
+    return KERNELS[kernel_file_name]
+
+
+def compute_earth_velocity(jd, kernel_file_name=KERNEL_FILE_NAME):
+    """
+
+    :param jd: julian dates
+    :param kernel_file_name: ephemeris kernel file name
+    :return: Earth velocity in km/day
+    """
+    kernel = get_kernel(kernel_file_name)
+    _, velocity = kernel[0, 3].compute_and_differentiate(jd)
+    _, velocity2 = kernel[3, 399].compute_and_differentiate(jd)
+    return velocity - velocity2
+
+
+def create_earth_velocity_table(table_file_name, start_jd, stop_jd, step=1 / 24,
+                                kernel_file_name=KERNEL_FILE_NAME):
+    """
+
+    :param table_file_name: table file name
+    :param start_jd: first julian date of table
+    :param stop_jd: last julian date of table
+    :param step: step between julian dates in days
+    :param kernel_file_name: ephemeris kernel file name
+    :return: None
+    """
+    jd = np.arange(start_jd, stop_jd + step, step)
+    velocity = compute_earth_velocity(jd, kernel_file_name)
+    with open(table_file_name, "wb") as table_file:
+        np.savez(table_file, jd=jd, velocity=velocity)
+
+
+def load_earth_velocity_table(table_file_name):
+    """
+
+    :param table_file_name: table file name
+    :return: True if table is loaded
+    """
+    if not os.path.isfile(table_file_name):
+        return False
+
+    if EARTH_VELOCITY_TABLE.get("file_name") != table_file_name:
+        with np.load(table_file_name) as table:
+            EARTH_VELOCITY_TABLE["jd"] = table["jd"]
+            EARTH_VELOCITY_TABLE["velocity"] = table["velocity"]
+        EARTH_VELOCITY_TABLE["file_name"] = table_file_name
+    return True
+
+
+def earth_velocity(jd):
+    """
+
+    :param jd: julian dates
+    :return: Earth velocity in km/day, interpolated from loaded table if table contains julian dates
+    """
+    if "jd" in EARTH_VELOCITY_TABLE:
+        table_jd = EARTH_VELOCITY_TABLE["jd"]
+        table_velocity = EARTH_VELOCITY_TABLE["velocity"]
+        if table_jd[0] <= np.min(jd) and np.max(jd) <= table_jd[-1]:
+            return np.array([np.interp(jd, table_jd, table_velocity[i]) for i in range(0, 3)])
+    return compute_earth_velocity(jd)
+
 
 @u.quantity_input(canon_velocity=(u.meter / u.second))
 def v_sun(source, apex="18h03m50.29s +30d00m16.8s",
@@ -36,11 +114,8 @@ def v_earth(source):
     :param source: observed source
     :return: Earth velocity
     """
-    kernel = SPK.open('de435.bsp')
     time = source.obstime.jd
-    _, velocity = kernel[0, 3].compute_and_differentiate(time)
-    _, velocity2 = kernel[3, 399].compute_and_differentiate(time)
-    velocity = velocity - velocity2
+    velocity = earth_velocity(time)
     source = source.cartesian
     return np.dot(((velocity * 1000 * u.meter / u.day).to(u.meter / u.second)).T, source.xyz)
 
@@ -86,6 +161,20 @@ def v_lsr(ra, dec, source, string_time, x, y, z):
     return v
 
 
+def v_sun_batch(source, apex="18h03m50.29s +30d00m16.8s",
+                canon_velocity=19.954 * 1000 * u.meter / u.second):
+    """
+
+    :param source: observed source with array of observation times
+    :param apex: apex
+    :param canon_velocity: canon velocity
+    :return: sun velocity for each observation time
+    """
+    sky_coord = SkyCoord(apex, equinox="J2000", frame=FK5)
+    sky_coord = sky_coord.transform_to(FK5(equinox=source.obstime))
+    return canon_velocity * np.dot(source.cartesian.xyz, sky_coord.cartesian.xyz)
+
+
 def lsr(ra, dec, date, string_time, x, y, z):
     """
 
@@ -105,3 +194,21 @@ def lsr(ra, dec, date, string_time, x, y, z):
     source.transform_to(source)
     V_lsr = v_lsr(ra, dec, source, string_time, x, y, z)
     return V_lsr
+
+
+def lsr_batch(ra, dec, dates, x, y, z):
+    """
+
+    :param ra: Right ascension
+    :param dec: Declination
+    :param dates: observation start times
+    :param x: x coordinate
+    :param y: y coordinate
+    :param z: z coordinate
+    :return: Local Standard of Rest for each observation start time
+    """
+    times = Time(dates, format='isot', scale='utc')
+    source = SkyCoord(ra=ra, dec=dec, frame=FK5, equinox='J2000.0', obstime=times)
+    V_lsr = v_sun_batch(source).value / 1000 + \
+            vobs(ra, dec, times, x, y, z) + v_earth(source).value / 1000
+    return V_lsr